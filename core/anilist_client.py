@@ -0,0 +1,252 @@
+"""HTTP client for the AniList GraphQL API.
+
+``requests.post`` opens a new TCP+TLS connection for every call and
+the caller re-parses and rewrites the full list even when nothing
+changed. ``AniListClient`` instead:
+
+* keeps one pooled ``requests.Session`` (keep-alive, gzip) for all calls
+* uses a short connect timeout and a separate read timeout, so an
+  unreachable network fails fast while a slow response still completes
+* hashes every response body and returns the previously parsed result
+  untouched when the hash matches (``AniListResponse.changed`` is False)
+* sends ``If-None-Match`` when the server handed out an ETag
+
+The endpoint URL is a constructor argument, so tests can point the
+client at a local GraphQL stand-in (see testing/anilist_client_check.py).
+"""
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+ANILIST_URL = "https://graphql.anilist.co"
+
+# (connect, read) in seconds: connecting should take well under a second,
+# a large MediaListCollection can take a few seconds to arrive
+DEFAULT_TIMEOUT = (3.05, 10.0)
+
+WATCHING_QUERY = """
+query ($username: String) {
+  MediaListCollection(userName: $username, type: ANIME, status: CURRENT) {
+    lists {
+      entries {
+        media {
+          id
+          title {
+            romaji
+            english
+          }
+          siteUrl
+          episodes
+          status
+        }
+        progress
+      }
+    }
+  }
+}
+"""
+
+
+# AniList media status -> the values used in anime_progress.json
+MEDIA_STATUS = {
+    "FINISHED": "finished",
+    "CANCELLED": "finished",
+    "RELEASING": "airing",
+    "HIATUS": "airing",
+    "NOT_YET_RELEASED": "upcoming",
+}
+
+
+class AniListError(Exception):
+    """Raised when AniList answers with GraphQL errors or an HTTP error."""
+
+    def __init__(self, message: str, status: Optional[int] = None,
+                 headers: Optional[Dict[str, str]] = None,
+                 errors: Optional[List[Dict[str, Any]]] = None, data: Any = None):
+        super().__init__(message)
+        self.status = status
+        self.headers = dict(headers or {})
+        self.errors = list(errors or [])  # GraphQL error objects
+        self.data = data                  # partial data sent alongside errors
+
+
+class AniListResponse(NamedTuple):
+    """Result of one GraphQL call."""
+    data: Any                # parsed "data" member (shared with earlier results if unchanged)
+    digest: str              # sha1 of the response body
+    changed: bool            # False if the body matched the previous response
+    headers: Dict[str, str]  # response headers (rate limits etc.)
+
+
+def parse_watching(data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Flatten a MediaListCollection response into the app's anime dicts."""
+    anime_list = []
+    collection = (data or {}).get("MediaListCollection") or {}
+    for media_list in collection.get("lists") or []:
+        for entry in media_list.get("entries") or []:
+            try:
+                media = entry.get("media") or {}
+                title = media.get("title") or {}
+                anime_list.append({
+                    "id": media.get("id", 0),
+                    "title": title.get("english") or title.get("romaji", "Unknown Title"),
+                    "url": media.get("siteUrl", ""),
+                    "episodes": media.get("episodes", 0),
+                    "progress": entry.get("progress", 0),
+                    "status": MEDIA_STATUS.get(media.get("status")),
+                })
+            except Exception as e:
+                print(f"⚠️  Error parsing anime entry: {e}")
+    return anime_list
+
+
+class AniListClient:
+    """Pooled, change-aware AniList GraphQL client. Thread-safe."""
+
+    def __init__(self, url: str = ANILIST_URL, token: Optional[str] = None,
+                 timeout: Tuple[float, float] = DEFAULT_TIMEOUT, pool_size: int = 4,
+                 session: Optional[requests.Session] = None):
+        """
+        Args:
+            url: GraphQL endpoint
+            token: Optional OAuth access token (needed for mutations)
+            timeout: (connect, read) timeouts in seconds
+            pool_size: Connections kept alive to the endpoint
+            session: Session to use instead of a new one
+        """
+        self.url = url
+        self.token = token
+        self.timeout = timeout
+        self.session = session or requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({
+            "Content-Type": "application/json",
+            "Accept": "application/json",
+            "Accept-Encoding": "gzip, deflate",
+        })
+        self._lock = threading.Lock()
+        # Request key -> (digest, etag, parsed data) of the last response
+        self._last: Dict[str, Tuple[str, Optional[str], Any]] = {}
+        self._watching: Dict[str, Tuple[str, List[Dict[str, Any]]]] = {}
+
+    @staticmethod
+    def _key(query: str, variables: Optional[Dict[str, Any]]) -> str:
+        blob = json.dumps([query, variables or {}], sort_keys=True)
+        return hashlib.sha1(blob.encode("utf-8")).hexdigest()
+
+    def query(self, query: str, variables: Optional[Dict[str, Any]] = None,
+              timeout: Optional[Tuple[float, float]] = None) -> AniListResponse:
+        """Run a GraphQL query or mutation.
+
+        Raises:
+            AniListError: On HTTP errors or GraphQL errors in the response
+            requests.RequestException: On network errors and timeouts
+        """
+        key = self._key(query, variables)
+        with self._lock:
+            previous = self._last.get(key)
+        headers = {}
+        if self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+        if previous is not None and previous[1]:
+            headers["If-None-Match"] = previous[1]
+
+        response = self.session.post(
+            self.url, json={"query": query, "variables": variables or {}},
+            headers=headers, timeout=timeout or self.timeout)
+        response_headers = dict(response.headers)
+
+        if response.status_code == 304 and previous is not None:
+            return AniListResponse(previous[2], previous[0], False, response_headers)
+        if response.status_code >= 400:
+            errors = None
+            try:
+                errors = response.json().get("errors")
+            except ValueError:
+                pass
+            raise AniListError(f"AniList returned HTTP {response.status_code}: "
+                               f"{response.text[:200]}", response.status_code, response_headers,
+                               errors)
+
+        body = response.content
+        digest = hashlib.sha1(body).hexdigest()
+        etag = response.headers.get("ETag")
+        if previous is not None and previous[0] == digest:
+            if etag != previous[1]:
+                with self._lock:
+                    self._last[key] = (digest, etag, previous[2])
+            return AniListResponse(previous[2], digest, False, response_headers)
+
+        payload = json.loads(body)
+        if payload.get("errors"):
+            message = "; ".join(e.get("message", str(e)) for e in payload["errors"])
+            raise AniListError(f"AniList error: {message}", response.status_code, response_headers,
+                               payload["errors"], payload.get("data"))
+        data = payload.get("data")
+        with self._lock:
+            self._last[key] = (digest, etag, data)
+        return AniListResponse(data, digest, True, response_headers)
+
+    def fetch_watching(self, username: str,
+                       send: Optional[Callable[..., AniListResponse]] = None
+                       ) -> Tuple[List[Dict[str, Any]], bool]:
+        """Fetch the user's CURRENT anime list.
+
+        Args:
+            username: AniList user name
+            send: Callable used instead of ``query`` to run the request,
+                e.g. ``AniListScheduler.request``
+
+        Returns:
+            ``(anime_list, changed)``; when ``changed`` is False the list is
+            the same object returned last time and needs no saving
+        """
+        response = (send or self.query)(WATCHING_QUERY, {"username": username})
+        with self._lock:
+            cached = self._watching.get(username)
+            if cached is not None and cached[0] == response.digest:
+                return cached[1], False
+        anime_list = parse_watching(response.data)
+        with self._lock:
+            self._watching[username] = (response.digest, anime_list)
+        return anime_list, True
+
+    def close(self) -> None:
+        """Close pooled connections."""
+        self.session.close()
+
+
+_client: Optional[AniListClient] = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> AniListClient:
+    """Return the shared AniListClient, creating it on first use.
+
+    The OAuth token for mutations is read from the ``ANILIST_TOKEN``
+    environment variable.
+    """
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = AniListClient(token=os.environ.get("ANILIST_TOKEN") or None)
+        return _client
+
+
+def set_client(client: Optional[AniListClient]) -> Optional[AniListClient]:
+    """Replace the shared client (e.g. one pointed at a local stand-in).
+
+    Returns:
+        The previous client
+    """
+    global _client
+    with _client_lock:
+        previous, _client = _client, client
+    return previous
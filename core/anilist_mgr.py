@@ -1,34 +1,153 @@
-from modules.anilist import fetch_anime_list, load_anime_list_from_cache, ANILIST_USERNAME
+import concurrent.futures
+import time
+from PyQt6.QtCore import QObject, QThread, pyqtSignal
+from modules.anilist import (fetch_anime_list, load_anime_list_from_cache, refresh_anime_cache,
+                            anime_cache_age, ANILIST_USERNAME, ANILIST_CACHE_TTL)
+from core.anilist_scheduler import BACKGROUND
 
-class AniListManager:
+
+def changed_entries(old_list, new_list):
+    """Return the entries of ``new_list`` that are new or differ from ``old_list``.
+
+    Entries are matched by AniList id (title for entries without one).
+    """
+    def key(anime):
+        return anime.get('id') or anime.get('title')
+
+    old = {key(a): a for a in old_list or []}
+    return [a for a in new_list if old.get(key(a)) != a]
+
+
+class RevalidateWorker(QThread):
+    """Fetch the watching list off the UI thread and update the cache file."""
+    fetched = pyqtSignal(list, bool)  # anime_list, changed
+    failed = pyqtSignal(str)
+
+    def __init__(self, username):
+        super().__init__()
+        self.username = username
+
+    def run(self):
+        try:
+            anime_list, changed = refresh_anime_cache(self.username, BACKGROUND)
+        except Exception as e:
+            self.failed.emit(str(e))
+            return
+        self.fetched.emit(anime_list, changed)
+
+
+class AniListManager(QObject):
     """
     Manager for handling AniList data fetching and caching.
-    Wraps the existing logic from modules.anilist.
+
+    Stale-while-revalidate: get_watching_list() answers from the cache
+    file immediately and, once the cache is older than the TTL, starts a
+    RevalidateWorker in the background. When the fetched list differs
+    from what was served, ``watching_list_changed`` is emitted with the
+    full list and the entries that are new or changed.
     """
-    def __init__(self, username=ANILIST_USERNAME):
+    watching_list_changed = pyqtSignal(list, list)  # anime_list, changed entries
+
+    def __init__(self, username=ANILIST_USERNAME, ttl=ANILIST_CACHE_TTL, clock=time.monotonic):
+        super().__init__()
         self.username = username
+        self.ttl = ttl
+        self.clock = clock
+        self.anime_list = []
+        self._validated_at = None  # clock() of the last successful fetch
+        self._worker = None
+
+    def is_stale(self):
+        """True if the served list is older than the TTL (or was never fetched)."""
+        if self._validated_at is not None:
+            return self.clock() - self._validated_at >= self.ttl
+        age = anime_cache_age()
+        return age is None or age >= self.ttl
 
     def get_watching_list(self, force_refresh=False):
         """
         Get the list of currently watching anime.
-        
+
         Args:
-            force_refresh (bool): If True, forces a fetch from the API.
-                                  If False, tries cache first (logic handled by modules.anilist).
-        
+            force_refresh (bool): If True, fetches from the API synchronously.
+                                  If False, returns the cache right away and
+                                  revalidates in the background when stale.
+
+        Returns:
+            list: List of anime dictionaries (empty until the first fetch
+                  completes if there is no cache yet).
+        """
+        if force_refresh:
+            # Blocking fetch; the cache file is only rewritten when the
+            # list actually changed
+            try:
+                anime_list, _ = refresh_anime_cache(self.username)
+                self._validated_at = self.clock()
+            except concurrent.futures.TimeoutError:
+                # Asking again would only wait again: serve the cache
+                print("⚠️  AniList refresh timed out, using cached list")
+                anime_list = load_anime_list_from_cache()
+            except Exception as e:
+                print(f"⚠️  Error refreshing AniList cache: {e}")
+                anime_list = fetch_anime_list(self.username, use_fallback=True)
+            self.anime_list = anime_list
+            return anime_list
+
+        if not self.anime_list:
+            self.anime_list = load_anime_list_from_cache()
+        self.revalidate_if_stale()
+        return self.anime_list
+
+    def revalidate_if_stale(self):
+        """Start a background revalidation if the TTL expired.
+
+        Returns:
+            bool: True if a revalidation is running
+        """
+        if self.is_stale():
+            return self.revalidate()
+        return self._worker is not None
+
+    def revalidate(self):
+        """Fetch the list in the background unless a fetch is already running.
+
         Returns:
-            list: List of anime dictionaries.
+            bool: True if a revalidation is running
         """
-        # The existing fetch_anime_list handles cache fallback if use_fallback=True.
-        # If force_refresh is False, we want to prefer cache if valid.
-        # However, fetch_anime_list logic is: try API, if fail -> fallback.
-        # It doesn't explicitly "prefer" cache unless we call load_cached_anime first.
-        
-        if not force_refresh:
-            # Try loading from cache first to be fast
-            cached = load_anime_list_from_cache()
-            if cached:
-                return cached
-        
-        # If no cache or forced refresh, fetch from API
-        return fetch_anime_list(self.username, use_fallback=True)
+        if self._worker is not None:
+            return True
+        print("🔄 Revalidating AniList watching list...")
+        self._worker = RevalidateWorker(self.username)
+        self._worker.fetched.connect(self._on_fetched)
+        self._worker.failed.connect(self._on_failed)
+        self._worker.finished.connect(self._on_worker_finished)
+        self._worker.start()
+        return True
+
+    def _on_fetched(self, anime_list, changed):
+        self._validated_at = self.clock()
+        if not changed and self.anime_list:
+            print("✅ AniList list unchanged")
+            return
+        changes = changed_entries(self.anime_list, anime_list)
+        # Removed entries show up only as a shorter list
+        if changes or len(anime_list) != len(self.anime_list):
+            print(f"📥 AniList list updated ({len(changes)} changed entries)")
+            self.anime_list = anime_list
+            self.watching_list_changed.emit(anime_list, changes)
+        else:
+            print("✅ AniList list unchanged")
+
+    def _on_failed(self, message):
+        # Keep serving the cache; the next staleness check retries
+        print(f"⚠️  AniList revalidation failed: {message}")
+
+    def _on_worker_finished(self):
+        self._worker = None
+
+    def wait(self, timeout_ms=None):
+        """Wait for a running revalidation (e.g. on shutdown)."""
+        worker = self._worker
+        if worker is not None:
+            return worker.wait() if timeout_ms is None else worker.wait(timeout_ms)
+        return True
@@ -0,0 +1,374 @@
+"""
+Rate-limit-aware scheduler for all AniList requests.
+
+AniList allows about 90 requests per minute (less while the API is
+degraded) and answers 429 with ``Retry-After`` beyond that. Every call
+goes through one dispatcher thread that:
+
+* sends interactive requests (the user is waiting) before background
+  ones (revalidation, progress sync)
+* keeps a local sliding-window budget sized from ``X-RateLimit-Limit``
+  and pauses when ``X-RateLimit-Remaining`` runs out, until
+  ``X-RateLimit-Reset``; the last ``reserve`` requests of a window are
+  kept for interactive requests
+* waits out ``Retry-After`` on 429 and re-sends instead of failing
+* batches compatible work: identical queued requests are sent once, and
+  queued ``Field`` requests of the same operation type are merged into
+  one aliased GraphQL document (e.g. several SaveMediaListEntry
+  mutations become one request); when a merged document fails with
+  errors that cannot be pinned on one field, its fields are re-sent one
+  by one
+
+Usage:
+    scheduler = get_scheduler()
+    response = scheduler.request(WATCHING_QUERY, {"username": name}, INTERACTIVE)
+    future = scheduler.submit_field(Field("mutation", "SaveMediaListEntry(...) { id }",
+                                          {"mediaId": 1}, {"mediaId": "Int"}))
+"""
+import collections
+import itertools
+import re
+import threading
+import time
+from concurrent.futures import CancelledError, Future, TimeoutError
+from typing import Any, Dict, List, NamedTuple, Optional, Union
+
+INTERACTIVE = 0
+BACKGROUND = 1
+
+_VARIABLE = re.compile(r"\$(\w+)")
+
+
+class Field(NamedTuple):
+    """One top-level GraphQL field that may share a document with others."""
+    operation: str             # "query" or "mutation"
+    selection: str             # field with arguments and sub-selection, using $variables
+    variables: Dict[str, Any]
+    types: Dict[str, str]      # variable name -> GraphQL type, e.g. {"mediaId": "Int"}
+
+
+class _Job(NamedTuple):
+    priority: int
+    seq: int
+    payload: Union[Field, tuple]  # Field or (query, variables)
+    future: Future
+
+
+def build_batch(fields: List[Field]) -> tuple:
+    """Merge fields of one operation type into an aliased document.
+
+    Returns:
+        ``(query, variables, aliases)`` with ``aliases[i]`` the result key
+        of ``fields[i]``
+    """
+    definitions, selections, variables, aliases = [], [], {}, []
+    for i, field in enumerate(fields):
+        alias = f"f{i}"
+        aliases.append(alias)
+        for name, value in field.variables.items():
+            variables[f"{name}_{i}"] = value
+            definitions.append(f"${name}_{i}: {field.types[name]}")
+        selection = _VARIABLE.sub(lambda m: f"${m.group(1)}_{i}", field.selection)
+        selections.append(f"  {alias}: {selection}")
+    header = f"{fields[0].operation} ({', '.join(definitions)})" if definitions else fields[0].operation
+    return f"{header} {{\n" + "\n".join(selections) + "\n}", variables, aliases
+
+
+class AniListScheduler:
+    """Single dispatcher for AniList requests with priorities and rate limits."""
+
+    def __init__(self, client=None, limit: int = 90, reserve: int = 5, batch_size: int = 10,
+                 max_retries: int = 3, clock=time.monotonic, wall_clock=time.time):
+        """
+        Args:
+            client: AniListClient that sends (default: the shared one)
+            limit: Requests per minute until the server reports its limit
+            reserve: Requests per window kept for interactive requests
+            batch_size: Most fields merged into one document
+            max_retries: Re-sends after 429 before the error is raised
+            clock: Monotonic time source
+            wall_clock: Epoch time source (for X-RateLimit-Reset)
+        """
+        self._client = client
+        self.limit = limit
+        self.reserve = reserve
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.clock = clock
+        self.wall_clock = wall_clock
+        self.remaining: Optional[int] = None  # last X-RateLimit-Remaining
+        self._remaining_at = 0.0
+        self.paused_until = 0.0
+        self.sent = 0
+        self._window = collections.deque()    # clock() of recent sends
+        self._jobs: List[_Job] = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+
+    @property
+    def client(self):
+        if self._client is None:
+            from core.anilist_client import get_client
+            self._client = get_client()
+        return self._client
+
+    # --- submitting -------------------------------------------------------
+
+    def _submit(self, payload, priority: int) -> Future:
+        future = Future()
+        with self._cond:
+            self._jobs.append(_Job(priority, next(self._seq), payload, future))
+            self._cond.notify()
+        self.start()
+        return future
+
+    def submit(self, query: str, variables: Optional[Dict[str, Any]] = None,
+               priority: int = BACKGROUND) -> Future:
+        """Queue a whole GraphQL document; the future yields an AniListResponse."""
+        return self._submit((query, dict(variables or {})), priority)
+
+    def submit_field(self, field: Field, priority: int = BACKGROUND) -> Future:
+        """Queue a batchable field; the future yields an AniListResponse
+        whose ``data`` is that field's result."""
+        return self._submit(field, priority)
+
+    def request(self, query: str, variables: Optional[Dict[str, Any]] = None,
+                priority: int = INTERACTIVE, timeout: Optional[float] = None):
+        """Run a document through the scheduler and wait for its response.
+
+        Raises:
+            concurrent.futures.TimeoutError: After ``timeout`` seconds; the
+                request is withdrawn unless it is already being sent
+        """
+        future = self.submit(query, variables, priority)
+        try:
+            return future.result(timeout)
+        except TimeoutError:
+            # Nobody reads a late answer: don't spend rate limit on it
+            future.cancel()
+            raise
+
+    # --- rate limiting ----------------------------------------------------
+
+    def _budget_wait(self, priority: int) -> float:
+        """Seconds until a request of ``priority`` may be sent (caller holds the lock)."""
+        now = self.clock()
+        if now < self.paused_until:
+            return self.paused_until - now
+        while self._window and now - self._window[0] >= 60.0:
+            self._window.popleft()
+        used = len(self._window)
+        allowed = self.limit if priority == INTERACTIVE else max(1, self.limit - self.reserve)
+        if (self.remaining is not None and priority != INTERACTIVE
+                and self.remaining <= self.reserve and now - self._remaining_at < 60.0):
+            # The server says its window is almost spent (possibly by
+            # other clients): background work waits for the next one
+            return max(0.05, 60.0 - (now - self._remaining_at))
+        if used < allowed:
+            return 0.0
+        if not self._window:
+            return 1.0
+        return max(0.05, 60.0 - (now - self._window[0]))
+
+    def _observe(self, headers: Dict[str, str], status: Optional[int] = None) -> float:
+        """Update the budget from response headers; return the 429 delay (0 if none)."""
+        lowered = {name.lower(): value for name, value in (headers or {}).items()}
+
+        def number(name):
+            try:
+                return float(lowered[name])
+            except (KeyError, TypeError, ValueError):
+                return None
+
+        limit = number("x-ratelimit-limit")
+        remaining = number("x-ratelimit-remaining")
+        reset = number("x-ratelimit-reset")
+        retry_after = number("retry-after")
+        with self._cond:
+            if limit:
+                self.limit = int(limit)
+            if remaining is not None:
+                self.remaining = int(remaining)
+                self._remaining_at = self.clock()
+                if remaining <= 0:
+                    delay = reset - self.wall_clock() if reset else 60.0
+                    self.paused_until = max(self.paused_until, self.clock() + max(delay, 1.0))
+            if status == 429:
+                delay = retry_after if retry_after is not None else 60.0
+                self.paused_until = max(self.paused_until, self.clock() + delay)
+                return delay
+        return 0.0
+
+    # --- dispatching ------------------------------------------------------
+
+    def _next_batch(self) -> Optional[List[_Job]]:
+        """Take the next job and everything that can share its request.
+
+        Returns:
+            The jobs to send (empty if their callers withdrew them), or
+            None once stopping
+        """
+        with self._cond:
+            while True:
+                if self._stopping:
+                    return None
+                # Drop requests their caller gave up on
+                self._jobs = [job for job in self._jobs if not job.future.cancelled()]
+                if self._jobs:
+                    self._jobs.sort(key=lambda job: (job.priority, job.seq))
+                    head = self._jobs[0]
+                    wait = self._budget_wait(head.priority)
+                    if wait <= 0:
+                        break
+                    self._cond.wait(wait)
+                else:
+                    self._cond.wait()
+            if isinstance(head.payload, Field):
+                batch = [job for job in self._jobs
+                         if isinstance(job.payload, Field)
+                         and job.payload.operation == head.payload.operation][:self.batch_size]
+            else:
+                batch = [job for job in self._jobs if job.payload == head.payload]
+            for job in batch:
+                self._jobs.remove(job)
+            # From here on a caller's cancel() can no longer withdraw them
+            batch = [job for job in batch if job.future.set_running_or_notify_cancel()]
+            if not batch:
+                return []
+            self._window.append(self.clock())
+            self.sent += 1
+            return batch
+
+    def _send(self, batch: List[_Job]) -> None:
+        from core.anilist_client import AniListError, AniListResponse
+
+        head = batch[0].payload
+        if isinstance(head, Field):
+            query, variables, aliases = build_batch([job.payload for job in batch])
+        else:
+            (query, variables), aliases = head, None
+
+        for attempt in itertools.count():
+            try:
+                response = self.client.query(query, variables)
+            except AniListError as e:
+                delay = self._observe(e.headers, e.status)
+                if e.status == 429 and attempt < self.max_retries:
+                    print(f"⏳ AniList rate limit hit; retrying in {delay:.0f}s")
+                    with self._cond:
+                        while not self._stopping and self.clock() < self.paused_until:
+                            self._cond.wait(self.paused_until - self.clock())
+                        if self._stopping:
+                            break
+                        self._window.append(self.clock())
+                        self.sent += 1
+                    continue
+                if aliases is None or len(batch) == 1:
+                    # The error belongs to the only request in the document
+                    for job in batch:
+                        job.future.set_exception(e)
+                    return
+                # Merged document: only errors whose path names an alias can
+                # be pinned on a field; the rest is re-sent field by field
+                # so one bad field cannot fail (or drop) its neighbours
+                def alias_of(err):
+                    return (err.get("path") or [None])[0]
+
+                tied = {}
+                for err in e.errors:
+                    if alias_of(err) in aliases:
+                        tied.setdefault(alias_of(err), []).append(err)
+                data = e.data or {}
+                untied = []
+                for job, alias in zip(batch, aliases):
+                    if alias in tied:
+                        job.future.set_exception(AniListError(
+                            str(e), e.status, e.headers, tied[alias]))
+                    elif data.get(alias) is not None:
+                        job.future.set_result(AniListResponse(data[alias], "", True, e.headers))
+                    else:
+                        untied.append(job)
+                for job in untied:
+                    self._send_alone(job)
+                return
+            except Exception as e:
+                for job in batch:
+                    job.future.set_exception(e)
+                return
+            self._observe(response.headers)
+            for i, job in enumerate(batch):
+                if aliases is None:
+                    job.future.set_result(response)
+                else:
+                    job.future.set_result(response._replace(data=(response.data or {}).get(aliases[i])))
+            return
+        for job in batch:
+            job.future.set_exception(CancelledError())
+
+    def _send_alone(self, job: _Job) -> None:
+        """Re-send one field of a failed merged document on its own."""
+        with self._cond:
+            while not self._stopping and self._budget_wait(job.priority) > 0:
+                self._cond.wait(self._budget_wait(job.priority))
+            if self._stopping:
+                job.future.set_exception(CancelledError())
+                return
+            self._window.append(self.clock())
+            self.sent += 1
+        self._send([job])
+
+    def _run(self) -> None:
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                break
+            if batch:
+                self._send(batch)
+        with self._cond:
+            jobs, self._jobs = self._jobs, []
+        for job in jobs:
+            job.future.cancel()
+
+    def start(self) -> None:
+        """Start the dispatcher thread (no-op if it is running)."""
+        with self._cond:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name="anilist-scheduler", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop dispatching; queued requests are cancelled."""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+
+_scheduler: Optional[AniListScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> AniListScheduler:
+    """Return the shared scheduler (sending with the shared client)."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = AniListScheduler()
+        return _scheduler
+
+
+def set_scheduler(scheduler: Optional[AniListScheduler]) -> Optional[AniListScheduler]:
+    """Replace the shared scheduler.
+
+    Returns:
+        The previous scheduler
+    """
+    global _scheduler
+    with _scheduler_lock:
+        previous, _scheduler = _scheduler, scheduler
+    return previous
@@ -0,0 +1,51 @@
+import time
+from PyQt6.QtCore import QObject, QTimer, Qt, pyqtSignal
+from utils.gestures import GestureEngine
+
+class GestureTimer(QObject):
+    """
+    Drives a GestureEngine from the Qt event loop.
+    Detections are fed in as they arrive; hold and sequence deadlines are
+    fired by a single-shot precise timer armed for the next deadline, so
+    they don't wait for the next camera frame.
+    Emits 'gesture' with every GestureEvent.
+    """
+    gesture = pyqtSignal(object)
+
+    def __init__(self, mode_table, clock=time.monotonic, parent=None):
+        super().__init__(parent)
+        self.clock = clock
+        self.engine = GestureEngine(mode_table)
+        self.engine.add_listener(self.gesture.emit)
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        # CoarseTimer (the default) may fire up to 5% late
+        self.timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self.timer.timeout.connect(self._on_timeout)
+        self.armed_for = None
+
+    def update(self, colors):
+        """Feed one detection (a color name, None or a set of colors)."""
+        self.engine.update(colors, self.clock())
+        self._rearm()
+
+    def set_mode_table(self, mode_table):
+        """Switch the engine to another mode's tables."""
+        self.engine.set_mode_table(mode_table)
+        self._rearm()
+
+    def _on_timeout(self):
+        self.engine.advance(self.clock())
+        self._rearm()
+
+    def _rearm(self):
+        deadline = self.engine.next_deadline()
+        if deadline == self.armed_for and (deadline is None or self.timer.isActive()):
+            return  # idle frame: nothing was scheduled or cancelled
+        self.armed_for = deadline
+        if deadline is None:
+            self.timer.stop()
+            return
+        # Round up so the deadline has passed when the timer fires
+        delay_ms = max(0, int((deadline - self.clock()) * 1000 + 0.999))
+        self.timer.start(delay_ms)
@@ -0,0 +1,232 @@
+"""
+Durable write-back queue for AniList progress updates.
+
+Progress changes are recorded locally at once and pushed to AniList by a
+background thread, so the remote never waits on the network and nothing
+is lost while offline:
+
+* ``enqueue_progress`` keeps only the latest progress per show, so a
+  binge of several "next episode" bumps becomes one ``SaveMediaListEntry``
+  mutation.
+* The pending set is written atomically to ``anilist_mutations.json``
+  on every change and reloaded on start, so it survives restarts.
+* Failed sends are retried with exponential backoff (honouring
+  ``Retry-After`` on 429). An update AniList rejects for good (a 4xx
+  whose errors name that update) is dropped with a warning.
+
+Mutations are sent through the shared AniListScheduler, which merges
+the pending shows into few requests. They need an OAuth token, read
+from the ``ANILIST_TOKEN`` environment variable by the shared client;
+without one, updates stay queued until a token is configured.
+"""
+import json
+import os
+import threading
+import time
+from concurrent.futures import CancelledError
+from pathlib import Path
+from typing import Callable, Dict, Optional, Union
+
+from core.anilist_scheduler import BACKGROUND, Field, get_scheduler
+
+QUEUE_FILE = "anilist_mutations.json"
+
+# Sent as scheduler Fields, so pending shows share one aliased mutation
+SAVE_PROGRESS_FIELD = "SaveMediaListEntry(mediaId: $mediaId, progress: $progress) { id progress }"
+SAVE_PROGRESS_TYPES = {"mediaId": "Int", "progress": "Int"}
+
+
+class MutationQueue:
+    """Collapsing, persistent queue of AniList progress mutations."""
+
+    def __init__(self, path: Union[str, Path] = QUEUE_FILE, scheduler=None,
+                 backoff: float = 2.0, max_backoff: float = 300.0,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            path: File holding the pending updates
+            scheduler: AniListScheduler to send through (default: the shared one)
+            backoff: First retry delay in seconds, doubled per failure
+            max_backoff: Longest retry delay in seconds
+            clock: Time source for retry scheduling
+        """
+        self.path = Path(path)
+        self.scheduler = scheduler or get_scheduler()
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.clock = clock
+        self.pending: Dict[int, int] = {}  # media id -> progress
+        self.failures = 0
+        self.next_attempt = 0.0
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"⚠️  Could not read {self.path}: {e}")
+            return
+        self.pending = {int(media_id): int(progress)
+                        for media_id, progress in data.get("pending", {}).items()}
+        if self.pending:
+            print(f"📤 {len(self.pending)} AniList update(s) waiting to be sent")
+
+    def _save(self) -> None:
+        # Caller holds the lock
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": 1, "pending": {str(k): v for k, v in self.pending.items()}}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+    def enqueue_progress(self, media_id: int, progress: int) -> None:
+        """Queue ``progress`` for a show, replacing any unsent value."""
+        if not media_id:
+            return
+        with self._lock:
+            if self.pending.get(media_id) == progress:
+                return
+            self.pending[media_id] = int(progress)
+            self._save()
+            # New work: try now instead of waiting out a backoff
+            self.next_attempt = 0.0
+        self.start()
+        self._wake.set()
+
+    def pending_progress(self) -> Dict[int, int]:
+        """Return a copy of the unsent progress per media id."""
+        with self._lock:
+            return dict(self.pending)
+
+    def flush(self) -> bool:
+        """Send every pending update once.
+
+        Returns:
+            bool: True if nothing is left pending
+        """
+        # Import here so a missing 'requests' only disables syncing
+        import requests
+        from core.anilist_client import AniListError
+
+        with self._lock:
+            batch = dict(self.pending)
+        # Submitted together, the scheduler merges them into few requests
+        futures = {media_id: self.scheduler.submit_field(
+                       Field("mutation", SAVE_PROGRESS_FIELD,
+                             {"mediaId": media_id, "progress": progress}, SAVE_PROGRESS_TYPES),
+                       BACKGROUND)
+                   for media_id, progress in batch.items()}
+        error, retry_after = None, None
+        for media_id, future in futures.items():
+            progress = batch[media_id]
+            try:
+                future.result()
+            except AniListError as e:
+                # Only a 4xx with GraphQL errors for this very field (the
+                # scheduler re-sends fields of a failed merged mutation
+                # one by one) is a permanent rejection
+                if (e.errors and e.status is not None and 400 <= e.status < 500
+                        and e.status not in (401, 429)):
+                    print(f"❌ AniList rejected progress {progress} for {media_id}, dropping: {e}")
+                    self._done(media_id, progress)
+                else:
+                    error, retry_after = e, e.headers.get("Retry-After")
+                continue
+            except (requests.exceptions.RequestException, CancelledError) as e:
+                error = e
+                continue
+            print(f"☁️  Synced AniList progress: {media_id} -> episode {progress}")
+            self._done(media_id, progress)
+        if error is not None:
+            self._failed(error, retry_after)
+            return False
+        with self._lock:
+            self.failures = 0
+            return not self.pending
+
+    def _done(self, media_id: int, progress: int) -> None:
+        with self._lock:
+            # A newer bump queued while sending stays pending
+            if self.pending.get(media_id) == progress:
+                del self.pending[media_id]
+                self._save()
+
+    def _failed(self, error: Exception, retry_after: Optional[str] = None) -> None:
+        with self._lock:
+            self.failures += 1
+            delay = min(self.max_backoff, self.backoff * 2 ** (self.failures - 1))
+            if retry_after:
+                try:
+                    delay = max(delay, float(retry_after))
+                except ValueError:
+                    pass
+            self.next_attempt = self.clock() + delay
+        print(f"⚠️  AniList sync failed ({error}); retrying in {delay:.1f}s")
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            with self._lock:
+                has_work = bool(self.pending)
+                delay = self.next_attempt - self.clock()
+            if not has_work:
+                self._wake.wait()
+            elif delay > 0:
+                self._wake.wait(delay)
+            else:
+                if not self.scheduler.client.token:
+                    print("⚠️  ANILIST_TOKEN not set; AniList updates stay queued")
+                    self._wake.clear()
+                    self._wake.wait()
+                    continue
+                self.flush()
+                continue
+            self._wake.clear()
+
+    def start(self) -> None:
+        """Start the background sender (no-op if it is running)."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name="anilist-sync", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop the background sender; pending updates stay on disk."""
+        self._stopping.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+
+_queue: Optional[MutationQueue] = None
+_queue_lock = threading.Lock()
+
+
+def get_mutation_queue() -> MutationQueue:
+    """Return the shared MutationQueue for QUEUE_FILE, loading it on first use."""
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = MutationQueue()
+        return _queue
+
+
+def set_mutation_queue(queue: Optional[MutationQueue]) -> Optional[MutationQueue]:
+    """Replace the shared queue.
+
+    Returns:
+        The previous queue
+    """
+    global _queue
+    with _queue_lock:
+        previous, _queue = _queue, queue
+    return previous
@@ -0,0 +1,302 @@
+"""
+Crash-safe store for the anime watching list and episode progress.
+
+The store keeps the list in memory, indexed by AniList id, and persists
+it in two files:
+
+* ``anime_progress.json`` - a versioned snapshot, always replaced with
+  write-to-temp + fsync + ``os.replace`` so a crash leaves either the old
+  or the new file, never a half-written one. The ``timestamp`` and
+  ``anime_list`` keys of the old cache format are kept, so older readers
+  still work.
+* ``anime_progress.json.journal`` - one JSON line per progress update,
+  appended and fsynced. An update costs one small append instead of
+  rewriting the whole list. The journal is folded into the snapshot
+  (compacted) every ``compact_every`` updates and whenever the list is
+  replaced from AniList.
+
+Journal records carry the snapshot generation they apply to, so records
+left over from a crash between writing a new snapshot and truncating the
+journal are ignored instead of overwriting fresher data. A torn last
+line (crash during append) is skipped.
+"""
+import json
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+PROGRESS_FILE = "anime_progress.json"
+SCHEMA_VERSION = 2  # 1: unversioned {"timestamp", "anime_list"} cache
+
+_URL_ID = re.compile(r"anilist\.co/anime/(\d+)")
+
+Key = Union[int, str]
+
+
+def normalize_entry(raw: Dict[str, Any], previous: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Convert an entry of any known shape into the current schema.
+
+    Unifies ``total_episodes``/``episodes``, derives a missing id from the
+    AniList URL and keeps a known ``status`` when the new data has none.
+
+    Args:
+        raw: Entry from the API, an old cache file or a caller
+        previous: Stored entry for the same show, if any
+    """
+    url = raw.get("url") or raw.get("siteUrl") or ""
+    anime_id = raw.get("id") or 0
+    if not anime_id:
+        match = _URL_ID.search(url)
+        anime_id = int(match.group(1)) if match else 0
+    episodes = raw.get("episodes")
+    if episodes is None:
+        episodes = raw.get("total_episodes")
+    status = raw.get("status")
+    if status is None and previous is not None:
+        status = previous.get("status")
+    return {
+        "id": int(anime_id),
+        "title": raw.get("title") or "Unknown Title",
+        "url": url,
+        "episodes": episodes if isinstance(episodes, int) and episodes > 0 else None,
+        "progress": int(raw.get("progress") or 0),
+        "status": status,
+    }
+
+
+def entry_key(entry: Dict[str, Any]) -> Key:
+    """Index key of a normalized entry: its AniList id, else its title."""
+    return entry["id"] or f"title:{entry['title'].lower()}"
+
+
+def _fsync_dir(path: Path) -> None:
+    # Make the rename itself durable (not supported on Windows)
+    if os.name == "nt":
+        return
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class ProgressStore:
+    """Indexed anime list with atomic snapshots and an append-only journal.
+
+    Thread-safe: the UI, the action worker and the AniList revalidation
+    thread may all use the shared instance.
+    """
+
+    def __init__(self, path: Union[str, Path] = PROGRESS_FILE, compact_every: int = 64):
+        """
+        Args:
+            path: Snapshot file; the journal is ``<path>.journal``
+            compact_every: Journal records after which the journal is
+                folded into a new snapshot
+        """
+        self.path = Path(path)
+        self.journal_path = self.path.with_name(self.path.name + ".journal")
+        self.compact_every = compact_every
+        self.timestamp: Optional[float] = None  # last replace from AniList
+        self.generation = 0
+        self._entries: Dict[Key, Dict[str, Any]] = {}  # insertion order = list order
+        self._titles: Dict[str, Key] = {}
+        self._journal_records = 0
+        self._lock = threading.RLock()
+        self.load()
+
+    # --- reading ---------------------------------------------------------
+
+    def load(self) -> None:
+        """(Re)load the snapshot and replay the journal."""
+        with self._lock:
+            self._entries.clear()
+            self._titles.clear()
+            self.timestamp = None
+            self.generation = 0
+            self._journal_records = 0
+            data: Any = None
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+            except FileNotFoundError:
+                pass
+            except (OSError, json.JSONDecodeError) as e:
+                print(f"⚠️  Could not read {self.path}: {e}")
+
+            if isinstance(data, dict):
+                version = data.get("version", 1)
+                if version > SCHEMA_VERSION:
+                    print(f"⚠️  {self.path} has schema {version}, newer than {SCHEMA_VERSION}")
+                self.timestamp = data.get("timestamp")
+                self.generation = data.get("generation", 0)
+                raw_list = data.get("anime_list", [])
+            elif isinstance(data, list):
+                raw_list = data  # oldest format: a bare list
+            else:
+                raw_list = []
+            for raw in raw_list:
+                self._put(normalize_entry(raw))
+            self._replay_journal()
+
+    def _replay_journal(self) -> None:
+        try:
+            with open(self.journal_path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return
+        end = data.rfind(b"\n") + 1
+        if end < len(data):
+            # Torn write at the end: cut it off so the next append starts
+            # on a fresh line
+            with open(self.journal_path, "r+b") as f:
+                f.truncate(end)
+        for line in data[:end].decode("utf-8").splitlines():
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if record.get("gen") != self.generation:
+                continue  # already part of the snapshot
+            key = record["key"]
+            if key in self._entries:
+                self._entries[key]["progress"] = record["progress"]
+            self._journal_records += 1
+
+    def _put(self, entry: Dict[str, Any]) -> None:
+        key = entry_key(entry)
+        self._entries[key] = entry
+        self._titles[entry["title"].lower()] = key
+
+    def anime_list(self) -> List[Dict[str, Any]]:
+        """Copies of all entries in list order."""
+        with self._lock:
+            return [dict(entry) for entry in self._entries.values()]
+
+    def get(self, anime_id: int) -> Optional[Dict[str, Any]]:
+        """Copy of the entry with this AniList id, or None."""
+        with self._lock:
+            entry = self._entries.get(anime_id)
+            return dict(entry) if entry is not None else None
+
+    def find(self, title: str) -> Optional[Dict[str, Any]]:
+        """Copy of the entry with this title (case-insensitive), or None."""
+        with self._lock:
+            key = self._titles.get(title.lower())
+            return dict(self._entries[key]) if key is not None else None
+
+    def age(self) -> Optional[float]:
+        """Seconds since the list was last replaced from AniList, or None."""
+        with self._lock:
+            if self.timestamp is None:
+                return None
+            return max(0.0, time.time() - self.timestamp)
+
+    # --- writing ---------------------------------------------------------
+
+    def set_progress(self, key: Key, progress: int) -> bool:
+        """Record a new episode progress for one show.
+
+        Args:
+            key: AniList id (or the key from ``entry_key``)
+            progress: Episodes watched
+
+        Returns:
+            bool: False if the show is not in the list
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False
+            if entry["progress"] == progress:
+                return True
+            entry["progress"] = int(progress)
+            record = {"gen": self.generation, "key": key, "progress": entry["progress"],
+                      "t": round(time.time(), 3)}
+            with open(self.journal_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self._journal_records += 1
+            if self._journal_records >= self.compact_every:
+                try:
+                    self.compact()
+                except OSError as e:
+                    # The update is safe in the journal; retried next time
+                    print(f"⚠️  Could not compact {self.path}: {e}")
+            return True
+
+    def replace_all(self, anime_list: Iterable[Dict[str, Any]],
+                    timestamp: Optional[float] = None) -> None:
+        """Replace the list (e.g. with fresh AniList data) and compact.
+
+        Status values already known for a show are kept when the new data
+        has none.
+        """
+        with self._lock:
+            old = self._entries
+            self._entries = {}
+            self._titles.clear()
+            for raw in anime_list:
+                entry = normalize_entry(raw)
+                self._put(normalize_entry(raw, old.get(entry_key(entry))))
+            self.timestamp = time.time() if timestamp is None else timestamp
+            self.compact()
+
+    def compact(self) -> None:
+        """Write a new snapshot atomically and start an empty journal."""
+        with self._lock:
+            # Adopted only once the snapshot is on disk: if writing it
+            # fails, new journal records must still match the old one
+            generation = self.generation + 1
+            data = {
+                "version": SCHEMA_VERSION,
+                "generation": generation,
+                "timestamp": self.timestamp,
+                "anime_list": list(self._entries.values()),
+            }
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_name(self.path.name + ".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+            self.generation = generation
+            _fsync_dir(self.path.parent)
+            # Records of older generations are ignored from here on, so a
+            # crash before this truncation is harmless
+            with open(self.journal_path, "w", encoding="utf-8"):
+                pass
+            self._journal_records = 0
+
+
+_store: Optional[ProgressStore] = None
+_store_lock = threading.Lock()
+
+
+def get_progress_store() -> ProgressStore:
+    """Return the shared ProgressStore for PROGRESS_FILE, loading it on first use."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ProgressStore()
+        return _store
+
+
+def set_progress_store(store: Optional[ProgressStore]) -> Optional[ProgressStore]:
+    """Replace the shared store (None loads PROGRESS_FILE again on next use).
+
+    Returns:
+        The previous store
+    """
+    global _store
+    with _store_lock:
+        previous, _store = _store, store
+    return previous
@@ -1,7 +1,7 @@
 import time
 import cv2
 from PyQt6.QtCore import QThread, pyqtSignal
-from utils.vision import detect_color
+from utils.vision import detect_color, compile_color_table
 
 class VisionWorker(QThread):
     """
@@ -10,14 +10,17 @@ class VisionWorker(QThread):
     """
     color_detected = pyqtSignal(str)
     
-    def __init__(self, roi, color_config, cooldown=1.0):
+    def __init__(self, roi, color_config, cooldown=1.0, color_table=None, clock=time.monotonic):
         super().__init__()
         self.roi = roi
         self.color_config = color_config
+        # A precompiled table (e.g. from the config snapshot) skips compiling
+        self.color_table = color_table or compile_color_table(color_config)
         self.cooldown = cooldown
+        self.clock = clock
         self.running = True
         self.cap = None
-        self.last_detection_time = 0
+        self.last_detection_time = None
         self.simulation_mode = False
 
     def run(self):
@@ -32,7 +35,7 @@ class VisionWorker(QThread):
         print(f"🟢 Vision Worker started. Mode: {'Simulation' if self.simulation_mode else 'Camera'}")
 
         while self.running:
-            current_time = time.time()
+            current_time = self.clock()
             
             if self.simulation_mode:
                 # In simulation mode, we read from stdin.
@@ -57,16 +60,32 @@ class VisionWorker(QThread):
             else:
                 ret, frame = self.cap.read()
                 if ret:
-                    color = detect_color(frame, self.roi, self.color_config)
+                    color = detect_color(frame, self.roi, self.color_table)
                     if color:
                         # Debounce logic
-                        if (current_time - self.last_detection_time) > self.cooldown:
+                        if (self.last_detection_time is None
+                                or current_time - self.last_detection_time > self.cooldown):
                             self.color_detected.emit(color)
                             self.last_detection_time = current_time
                 
                 # Sleep to reduce CPU usage (approx 20 FPS)
                 self.msleep(50)
 
+    def set_color_config(self, color_config):
+        """Swap in new color ranges without interrupting the capture loop.
+
+        Only colors whose configuration changed are recompiled. The new
+        table is published with a single attribute assignment, so the
+        frame being processed finishes with the old table and the next
+        one uses the new table.
+        """
+        self.color_table = compile_color_table(color_config, self.color_table)
+        self.color_config = color_config
+
+    def set_roi(self, roi):
+        """Swap in a new region of interest for the next frame."""
+        self.roi = roi
+
     def stop(self):
         self.running = False
         if self.cap:
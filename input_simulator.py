@@ -1,34 +1,16 @@
-import time
-import pyautogui
-from pynput.keyboard import Controller, Key
+from utils.input_backend import get_input
 
-keyboard = Controller()
-
-SPECIAL_KEYS = {
-    'space': Key.space,
-    'enter': Key.enter,
-    'esc': Key.esc,
-    'shift': Key.shift,
-    'ctrl': Key.ctrl,
-    'alt': Key.alt,
-    'tab': Key.tab,
-    'up': Key.up,
-    'down': Key.down,
-    'left': Key.left,
-    'right': Key.right
-}
-
-def get_special_key(key_str):
-    return SPECIAL_KEYS.get(key_str.lower(), key_str)
+# Every key, click and wait goes through the shared input backend
+# (utils.input_backend), so actions can be recorded and timed headless.
 
 def press_keys(keys):
-    keys = [get_special_key(k) for k in keys]
+    backend = get_input()
     for k in keys:
-        keyboard.press(k)
-        time.sleep(0.1)
+        backend.press(k)
+        backend.wait(0.1)
     for k in reversed(keys):
-        keyboard.release(k)
-        time.sleep(0.05)
+        backend.release(k)
+        backend.wait(0.05)
 
 def type_text(text):
     """Type text character by character with a small delay between each character.
@@ -36,62 +18,208 @@ def type_text(text):
     Args:
         text: The text string to type
     """
+    backend = get_input()
     for char in text:
-        keyboard.type(char)
-        time.sleep(0.05)  # Small delay between characters
+        backend.type(char)
+        backend.wait(0.05)  # Small delay between characters
 
 def mouse_click(x, y):
-    pyautogui.moveTo(x, y)
-    pyautogui.click()
+    backend = get_input()
+    backend.move(x, y)
+    backend.click()
+
+def run_macro(macro, cancel=None):
+    """Play a compiled macro (see utils.macros) as one event stream.
+    
+    Args:
+        macro: Tuple of MacroEvents from compile_macro
+        cancel: Optional threading.Event that stops the macro early
+    
+    Returns:
+        True if the macro ran to the end, False if it was cancelled or
+        a wait_for condition timed out
+    """
+    from utils.macros import CLICK, MOVE, PRESS, RELEASE, TYPE, WAIT_FOR
+    backend = get_input()
+    held = []
+    try:
+        for event in macro:
+            if event.kind == PRESS:
+                backend.press(event.value)
+                held.append(event.value)
+            elif event.kind == RELEASE:
+                backend.release(event.value)
+                held.remove(event.value)
+            elif event.kind == TYPE:
+                backend.type(event.value)
+            elif event.kind == MOVE:
+                backend.move(*event.value)
+            elif event.kind == CLICK:
+                backend.click(event.value)
+            elif event.kind == WAIT_FOR:
+                condition, timeout, interval = event.value
+                deadline = backend.clock() + timeout
+                while not condition():
+                    if backend.clock() >= deadline:
+                        print(f"⚠️ Macro stopped: condition not met within {timeout:g}s")
+                        return False
+                    if backend.wait(interval, cancel):
+                        return False
+            if event.delay > 0 and backend.wait(event.delay, cancel):
+                return False
+        return True
+    finally:
+        # Never leave a modifier stuck down when stopping midway
+        for key in reversed(held):
+            backend.release(key)
+
+def trigger_bookmarklet(name, cancel=None):
+    """Trigger a bookmarklet by name through the browser's bookmarks sidebar."""
+    from utils.macros import bookmarklet_macro
+    return run_macro(bookmarklet_macro(name), cancel)
 
-def trigger_bookmarklet(name):
-    """Trigger a bookmarklet by name using the browser's address bar or bookmark menu."""
-    # Ctrl+B to open bookmarks
-    press_keys(["ctrl", "b"])
-    time.sleep(0.3)
-    
-    # Type the bookmarklet name
-    type_text(name)
-    time.sleep(0.2)
-    
-    # Tab to focus on results
-    press_keys(["tab"])
-    time.sleep(0.5)
-    
-    # Up arrow to select first result
-    press_keys(["up"])
-    time.sleep(0.5)
-    
-    # Enter to execute bookmarklet
-    press_keys(["enter"])
-    time.sleep(0.2)
-    
-    # Ctrl+B to close bookmarks
-    press_keys(["ctrl", "b"])
+def grab_screen(region=None):
+    """Capture the screen, or a region of it, for template matching.
+    
+    Args:
+        region: Optional [x, y, width, height] to capture
+    
+    Returns:
+        A grayscale utils.capture.Screenshot
+    """
+    # Import here to avoid circular dependency
+    from utils.capture import get_capture
+    return get_capture().grab(region)
 
-def click_image(image_path, confidence=0.8, timeout=5):
+def locate_image(image_path, confidence=0.8, region=None):
+    """Find an image on screen once, returning its center or None."""
+    from utils.template_match import MATCHER
+    shot = grab_screen(region)
+    match = MATCHER.find(image_path, shot.image, confidence, offset=shot.offset)
+    return match.center if match else None
+
+def locate_first(steps, shot=None):
+    """Find the first of several images visible in one screenshot.
+    
+    A single grab covering every step's "region" is shared by all
+    templates (steps without a region share its downscaled copies too),
+    and steps are tried in order, so the search stops at the earliest
+    visible one.
+    
+    Args:
+        steps: Sequence of dicts with "image_path", "confidence" and
+            optionally "region"
+        shot: Screenshot to search; captured now if omitted
+    
+    Returns:
+        (index, center) of the first visible step, or None
+    """
+    from utils.capture import union
+    from utils.template_match import MATCHER, build_pyramid
+    if shot is None:
+        shot = grab_screen(union(step.get("region") for step in steps))
+    pyramid = None
+    for i, step in enumerate(steps):
+        region = step.get("region")
+        if region is None:
+            if pyramid is None:
+                pyramid = build_pyramid(shot.image)
+            view, view_pyramid = shot, pyramid
+        else:
+            view, view_pyramid = shot.crop(region), None
+        match = MATCHER.find(step["image_path"], view.image, step["confidence"],
+                             view_pyramid, offset=view.offset)
+        if match:
+            return i, match.center
+    return None
+
+def click_image(image_path, confidence=0.8, timeout=5, cancel=None, region=None):
     """Find and click an image on screen.
     
     Args:
         image_path: Path to the image file
         confidence: Match confidence (0.0 to 1.0)
         timeout: How long to wait for image in seconds
+        cancel: Optional threading.Event that stops the search early
+        region: Optional [x, y, width, height]; only this part of the
+            screen is captured and searched
     """
-    start_time = time.time()
+    backend = get_input()
+    start_time = backend.clock()
     print(f"🔍 Looking for image: {image_path} (Confidence: {confidence})")
     
-    while time.time() - start_time < timeout:
+    while True:
         try:
-            location = pyautogui.locateCenterOnScreen(image_path, confidence=confidence)
-            if location:
-                print(f"✅ Found image at {location}. Clicking...")
-                pyautogui.click(location)
-                return True
-        except Exception as e:
-            # ImageNotFoundException or other errors
-            pass
+            location = locate_image(image_path, confidence, region)
+        except (FileNotFoundError, ValueError) as e:
+            print(f"❌ {e}")
+            return False
+        if location:
+            print(f"✅ Found image at {location}. Clicking...")
+            backend.click(location)
+            return True
+        if backend.clock() - start_time >= timeout:
+            break
         
-        time.sleep(0.5)
+        # Matching is cheap now, so poll more often than before
+        if backend.wait(0.1, cancel):
+            print(f"⏹️ Stopped looking for: {image_path}")
+            return False
     
     print(f"❌ Image not found: {image_path}")
     return False
+
+def click_image_sequence(steps, timeout=None, cancel=None):
+    """Click a sequence of images, skipping steps that never show up.
+    
+    Every poll takes one screenshot and matches all remaining steps
+    against it. The earliest visible step is clicked at once and the
+    steps before it are skipped (no ad to close means the play button
+    is clicked straight away). The sequence shares one deadline
+    instead of waiting out each step's timeout in turn.
+    
+    Args:
+        steps: Sequence of dicts with "image_path", "confidence",
+            "wait_after" (seconds to pause after clicking) and
+            optionally "region" (see click_image)
+        timeout: Deadline for the whole sequence in seconds; defaults
+            to the sum of the steps' "timeout" values
+        cancel: Optional threading.Event that stops the sequence early
+    
+    Returns:
+        True once the last step was clicked
+    """
+    backend = get_input()
+    if timeout is None:
+        timeout = sum(step["timeout"] for step in steps)
+    deadline = backend.clock() + timeout
+    remaining = list(steps)
+    print(f"🔍 Looking for {len(remaining)} images (timeout: {timeout:g}s)")
+    
+    while remaining:
+        try:
+            found = locate_first(remaining)
+        except (FileNotFoundError, ValueError) as e:
+            print(f"❌ {e}")
+            return False
+        if found:
+            index, location = found
+            for skipped in remaining[:index]:
+                print(f"⏭️ Skipping step not on screen: {skipped['image_path']}")
+            step = remaining[index]
+            print(f"✅ Found {step['image_path']} at {location}. Clicking...")
+            backend.click(location)
+            remaining = remaining[index + 1:]
+            if not remaining:
+                return True
+            wait = step["wait_after"]
+        elif backend.clock() >= deadline:
+            break
+        else:
+            wait = 0.1
+        if backend.wait(wait, cancel):
+            print("⏹️ Image sequence stopped")
+            return False
+    
+    print(f"❌ Sequence interrupted. Could not find: {remaining[0]['image_path']}")
+    return False
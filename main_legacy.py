@@ -2,40 +2,66 @@ import sys
 import time
 import cv2
 import webbrowser
+from concurrent.futures import CancelledError
 from PyQt6.QtWidgets import QApplication
 from PyQt6.QtCore import QTimer
 
-from utils.config_loader import load_json, load_color_config
-from utils.vision import detect_color, load_anime_progress
+from utils.config_loader import ConfigError, ModeTable
+from utils.config_snapshot import load_config_cached
+from utils.gestures import EventType
+from utils.vision import detect_colors, load_anime_progress, compile_color_table
 from utils.actions import perform_action
+from utils.executor import ActionExecutor
+from utils.capture import set_capture
 from modules.overlay_window import OverlayWindow
 from modules.anime_selector import AnimeSelector
 from modules.anime_player import AnimePlayer
+from modules.anilist import update_episode_progress
+from core.mutation_queue import get_mutation_queue
+from core.gesture_timer import GestureTimer
 
 
-def load_mode_config(mode_name):
+def load_mode_config(config, mode_name):
+    """Return the precompiled tables for a mode (no disk access)."""
     try:
-        return load_json(f"config/modes/{mode_name}.json")
-    except Exception:
-        return {"actions": {}, "sequences": []}
+        return config.get_mode_table(mode_name)
+    except ConfigError:
+        return ModeTable.empty(mode_name)
+
+
+def open_url(url, cancel=None):
+    """Open ``url`` in the browser; runs on the executor, since starting
+    the browser can take a while."""
+    webbrowser.open(url)
 
 
 class ControllerState:
     def __init__(self):
         self.current_mode = "main"
-        self.sequence_history = []  # list[(color, timestamp)]
-        self.last_color = None
-        self.hold_start_time = None
         self.current_anime = None  # Track currently selected anime for navigation
 
 
+def apply_capture_backend(name):
+    """Switch the screen capture backend used by image actions."""
+    try:
+        backend = set_capture(name)
+        print(f"📷 Screen capture backend: {backend.name}")
+    except Exception as e:
+        print(f"⚠️ Capture backend '{name}' unavailable ({e}), using auto")
+        set_capture("auto")
+
+
 def main():
     # Initialize Qt application
     app = QApplication(sys.argv)
     
-    # Load configuration
-    GLOBAL_CONFIG = load_json("config/global.json")
-    color_config = load_color_config(GLOBAL_CONFIG)
+    # Load the compiled configuration (memory-mapped snapshot when valid)
+    config, color_table = load_config_cached()
+    GLOBAL_CONFIG = config.global_config
+    apply_capture_backend(GLOBAL_CONFIG.get("capture_backend", "auto"))
+    
+    # Open the camera before the slower UI and AniList setup
+    cap = cv2.VideoCapture(0)
     
     # Initialize overlay window
     overlay = OverlayWindow()
@@ -56,11 +82,18 @@ def main():
     
     # Initialize controller state
     state = ControllerState()
-    mode_config = load_mode_config(state.current_mode)
+    mode_config = load_mode_config(config, state.current_mode)
+    gestures = GestureTimer(mode_config)
+    # Actions run on a worker thread so detection never stalls on them
+    executor = ActionExecutor()
+    app.aboutToQuit.connect(lambda: executor.shutdown(wait=False))
+    # Push progress changes left over from an earlier (offline) session
+    mutation_queue = get_mutation_queue()
+    mutation_queue.start()
+    app.aboutToQuit.connect(lambda: mutation_queue.stop(timeout=1.0))
     overlay.update_mode(state.current_mode)
+    overlay.set_hold_source(gestures.engine.progress, gestures.clock)
     
-    # Initialize video capture
-    cap = cv2.VideoCapture(0)
     roi = GLOBAL_CONFIG["roi"]
     last_anime_update = 0
     ANIME_UPDATE_INTERVAL = 5  # seconds
@@ -72,18 +105,36 @@ def main():
     target_fps = GLOBAL_CONFIG.get("fps", 30)
     frame_delay = int(1000 / target_fps)  # Convert to milliseconds
 
+    def apply_config_changes(parts):
+        # Runs on the Qt thread between frames, so each swap is atomic
+        # with respect to update_frame
+        nonlocal roi, color_table, mode_config
+        if "global" in parts:
+            roi = config.global_config["roi"]
+            apply_capture_backend(config.global_config.get("capture_backend", "auto"))
+        if "colors" in parts:
+            color_table = compile_color_table(config.color_config, color_table)
+        if f"mode:{state.current_mode}" in parts:
+            mode_config = load_mode_config(config, state.current_mode)
+            gestures.set_mode_table(mode_config)
+
+    config.add_listener(apply_config_changes)
+    config_timer = QTimer()
+    config_timer.timeout.connect(config.poll_changes)
+    config_timer.start(1000)
+
     def update_frame():
-        nonlocal anime_list, last_anime_update, mode_config
+        nonlocal anime_list, last_anime_update
         
         ret, frame = cap.read()
         if not ret:
             return
 
-        # Detect current color inside ROI
-        color = detect_color(frame, roi, color_config)
+        # Detect every color inside ROI (two cards at once form a chord)
+        colors = detect_colors(frame, roi, color_table)
         
         # Update overlay with current color and mode
-        overlay.update_color(color if color else "None")
+        overlay.update_color("+".join(sorted(colors)) if colors else "None")
         
         # Update anime list in select mode
         if state.current_mode == 'select':
@@ -93,157 +144,130 @@ def main():
                 overlay.update_anime_list(anime_list)
                 last_anime_update = current_time
         
-        # Process color detection and mode switching
-        new_mode_config = process_color_detection(color, state, mode_config, overlay, anime_selector, anime_player)
-        if new_mode_config is not None:
-            mode_config = new_mode_config
+        # Only color changes do any work; holds fire from the gesture timer
+        gestures.update(colors)
         
         # Process Qt events to keep the UI responsive
         app.processEvents()
 
-    def process_color_detection(color, state, mode_config, overlay, anime_selector=None, anime_player=None):
-        now = time.time()
-
-        # Maintain sequence history (only store recent few seconds)
-        if color is not None:
-            state.sequence_history.append((color, now))
-            # Keep last 5 seconds of history to bound memory
-            state.sequence_history = [(c, t) for (c, t) in state.sequence_history if now - t <= 5.0]
-            
-        # Debug: Log current mode and detected color
-        if color and color != state.last_color:
-            print(f"🎨 Color detected: {color} | Current mode: {state.current_mode}")
+    def switch_mode(next_mode):
+        nonlocal mode_config
+        state.current_mode = next_mode
+        mode_config = load_mode_config(config, state.current_mode)
+        gestures.set_mode_table(mode_config)
+        overlay.update_mode(state.current_mode)
+        print(f"🔁 Mode switched to: {state.current_mode}")
 
-        # Check for color sequences (like red+yellow for selection)
-        sequences = mode_config.get("sequences", [])
-        for seq_config in sequences:
-            pattern = seq_config.get("pattern", [])
-            time_window = seq_config.get("time_window", 2.0)
-            
-            # Check if we have enough history for this pattern
-            if len(state.sequence_history) >= len(pattern):
-                # Get recent colors within time window
-                recent = [(c, t) for (c, t) in state.sequence_history if now - t <= time_window]
-                if len(recent) >= len(pattern):
-                    recent_colors = [c for (c, _) in recent[-len(pattern):]]
-                    
-                    # Check if pattern matches (in any order for 2-color sequences)
-                    pattern_matches = False
-                    if len(pattern) == 2:
-                        pattern_matches = (set(recent_colors) == set(pattern))
-                    else:
-                        pattern_matches = (recent_colors == pattern)
-                    
-                    if pattern_matches:
-                        action = seq_config.get("action", {})
-                        action_type = action.get("type")
-                        
-                        # Handle select action
-                        if action_type == "select" and anime_selector:
-                            selected_anime = anime_selector.select_current_anime()
-                            if selected_anime:
-                                # Store selected anime in state
-                                state.current_anime = selected_anime
-                                
-                                # Generate WCOFlix URL using AnimePlayer
-                                anime_title = selected_anime.get('title', '')
-                                next_episode = selected_anime.get('progress', 0) + 1
-                                
-                                # Use AnimePlayer to generate the URL
-                                wcoflix_url = anime_player.generate_anime_url(anime_title, next_episode)
-                                print(f"🎬 Opening: {anime_title} - Episode {next_episode}")
-                                print(f"🔗 URL: {wcoflix_url}")
-                                webbrowser.open(wcoflix_url)
-                                
-                                # Switch to anime mode if specified
-                                next_mode = action.get("next_mode")
-                                if next_mode:
-                                    state.current_mode = next_mode
-                                    new_mode_config = load_mode_config(state.current_mode)
-                                    overlay.update_mode(state.current_mode)
-                                    print(f"🔁 Mode switched to: {state.current_mode}")
-                                    state.sequence_history = []
-                                    state.last_color = None
-                                    state.hold_start_time = None
-                                    return new_mode_config
-                        
-                        # Handle next_episode action
-                        elif action_type == "next_episode":
-                            current_anime = state.current_anime
-                            if not current_anime:
-                                print("⚠️ No anime currently selected. Cannot play next episode.")
-                                state.sequence_history = []
-                                return None
+    def handle_gesture(event):
+        if event.type is EventType.PRESS:
+            print(f"🎨 Color detected: {event.color} | Current mode: {state.current_mode}")
+        elif event.type is EventType.SEQUENCE:
+            print(f"🎯 Sequence matched: {'→'.join(event.sequence.pattern)}")
+            handle_sequence(event.action)
+        elif event.type is EventType.HOLD:
+            run_action(event.action)
+        elif event.gesture is not None:
+            # Tap, double-tap, long-press or chord
+            print(f"👆 {event.type.value}: {'+'.join(event.gesture.colors)}")
+            run_action(event.action)
 
-                            anime_title = current_anime.get('title', '')
-                            current_ep = current_anime.get('progress', 0)
-                            status = current_anime.get('status', 'airing') # Default to airing if unknown
-                            
-                            print(f"📺 Processing next episode for: {anime_title} (Status: {status})")
-                            
-                            if status == "finished":
-                                # Consistent URL format - use direct generation
-                                next_episode = current_ep + 1
-                                wcoflix_url = anime_player.generate_anime_url(anime_title, next_episode)
-                                print(f"🎬 Opening Episode {next_episode}: {wcoflix_url}")
-                                webbrowser.open(wcoflix_url)
-                                
-                                # Update state
-                                state.current_anime['progress'] = next_episode
-                                # TODO: Save this progress to disk if needed
-                                
-                            else:
-                                # Airing/Inconsistent - use bookmarklet fallback
-                                bookmarklet_name = action.get("bookmarklet_name", "next episode")
-                                print(f"📚 Airing anime detected. Using bookmarklet: {bookmarklet_name}")
-                                
-                                # Import here to avoid circular dependency
-                                from input_simulator import trigger_bookmarklet
-                                trigger_bookmarklet(bookmarklet_name)
-                                
-                                # Optimistically update progress
-                                state.current_anime['progress'] = current_ep + 1
-                            
-                            # Clear sequence after handling
-                            state.sequence_history = []
-                            return None
+    def report_failure(future):
+        # Runs on the executor thread once an action finishes; jobs
+        # stopped early finish with CancelledError, which is no failure
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error is not None and not isinstance(error, CancelledError):
+            print(f"⚠️ Action failed: {error}")
 
-        # Debounce logic with per-action hold_time
-        if color == state.last_color:
-            if color is not None and state.hold_start_time is not None:
-                action_data = mode_config.get("actions", {}).get(color)
-                if action_data:
-                    hold_time = float(action_data.get("hold_time", 0))
-                    if hold_time <= 0 or (now - state.hold_start_time) >= hold_time:
-                        # Handle navigation in select mode
-                        if state.current_mode == 'select' and action_data.get('type') == 'navigate':
-                            if anime_selector:
-                                direction = 1 if action_data.get('direction') == 'down' else -1
-                                anime_selector.move_selection(direction)
-                                overlay.update_selection(anime_selector.selected_index)
-                        else:
-                            # Pass the overlay and anime_selector to perform_action for other actions
-                            next_mode = perform_action(action_data, overlay, anime_selector)
-                            # Mode switching if defined
-                            if next_mode:
-                                state.current_mode = next_mode
-                                new_mode_config = load_mode_config(state.current_mode)
-                                overlay.update_mode(state.current_mode)
-                                print(f"🔁 Mode switched to: {state.current_mode}")
-                                # Reset debounce after triggering
-                                state.hold_start_time = None
-                                state.last_color = None
-                                return new_mode_config
-                        # Reset debounce after triggering
-                        state.hold_start_time = None
-                        # Prevent repeated trigger until color changes or hold restarts
-                        state.last_color = None
+    def run_action(action):
+        # Handle navigation in select mode
+        if state.current_mode == 'select' and action.type == 'navigate':
+            direction = 1 if action.params['direction'] == 'down' else -1
+            anime_selector.move_selection(direction)
+            overlay.update_selection(anime_selector.selected_index)
+        elif action.type == 'navigate':
+            # Touches the selector and overlay, so stays on the UI thread
+            next_mode = perform_action(action, overlay, anime_selector)
+            if next_mode:
+                switch_mode(next_mode)
         else:
-            # Color changed
-            state.last_color = color
-            state.hold_start_time = now if color is not None else None
+            # Slow input actions run in the background; a mode switch
+            # cancels whatever the previous mode still had running
+            executor.submit(action, on_done=report_failure)
+            if action.next_mode:
+                switch_mode(action.next_mode)
+
+    def handle_sequence(action):
+        action_type = action.type
+
+        # Handle select action
+        if action_type == "select":
+            selected_anime = anime_selector.select_current_anime()
+            if selected_anime:
+                # Store selected anime in state
+                state.current_anime = selected_anime
+                
+                # Generate WCOFlix URL using AnimePlayer
+                anime_title = selected_anime.get('title', '')
+                next_episode = selected_anime.get('progress', 0) + 1
+                
+                # Use AnimePlayer to generate the URL
+                wcoflix_url = anime_player.generate_anime_url(anime_title, next_episode)
+                print(f"🎬 Opening: {anime_title} - Episode {next_episode}")
+                print(f"🔗 URL: {wcoflix_url}")
+                executor.call(open_url, wcoflix_url, key=("open_url", wcoflix_url),
+                              on_done=report_failure)
+                
+                # Switch to anime mode if specified
+                if action.next_mode:
+                    switch_mode(action.next_mode)
         
-        return None
+        # Handle next_episode action
+        elif action_type == "next_episode":
+            current_anime = state.current_anime
+            if not current_anime:
+                print("⚠️ No anime currently selected. Cannot play next episode.")
+                return
+
+            anime_title = current_anime.get('title', '')
+            current_ep = current_anime.get('progress', 0)
+            status = current_anime.get('status') or 'airing' # Default to airing if unknown
+            
+            print(f"📺 Processing next episode for: {anime_title} (Status: {status})")
+            
+            if status == "finished":
+                # Consistent URL format - use direct generation
+                next_episode = current_ep + 1
+                wcoflix_url = anime_player.generate_anime_url(anime_title, next_episode)
+                print(f"🎬 Opening Episode {next_episode}: {wcoflix_url}")
+                executor.call(open_url, wcoflix_url, key=("open_url", wcoflix_url),
+                              on_done=report_failure)
+                
+                # Update state, the progress store and (in the background) AniList
+                state.current_anime['progress'] = next_episode
+                update_episode_progress(anime_title, next_episode, anime_selector)
+                
+            else:
+                # Airing/Inconsistent - use bookmarklet fallback
+                bookmarklet_name = action.params["bookmarklet_name"]
+                print(f"📚 Airing anime detected. Using bookmarklet: {bookmarklet_name}")
+                
+                # Import here to avoid circular dependency
+                from input_simulator import trigger_bookmarklet
+                executor.call(trigger_bookmarklet, bookmarklet_name,
+                              key=("bookmarklet", bookmarklet_name), on_done=report_failure)
+                
+                # Optimistically update progress
+                state.current_anime['progress'] = current_ep + 1
+                update_episode_progress(anime_title, current_ep + 1, anime_selector)
+
+        # Any other action type runs like a color action: navigation on
+        # the UI thread, everything else on the executor
+        else:
+            run_action(action)
+
+    gestures.gesture.connect(handle_gesture)
     
     # Set up the timer and start the application
     timer.timeout.connect(update_frame)
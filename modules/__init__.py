@@ -7,6 +7,7 @@ from .anilist import (
     show_currently_watching,
     update_episode_progress,
     load_anime_list_from_cache,
+    refresh_anime_cache,
     save_anime_cache
 )
 
@@ -17,6 +18,7 @@ __all__ = [
     'show_currently_watching',
     'update_episode_progress',
     'load_anime_list_from_cache',
+    'refresh_anime_cache',
     'save_anime_cache'
 ]
 
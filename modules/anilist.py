@@ -1,6 +1,6 @@
 """AniList API integration for the color controller."""
-import os
-import time
+import concurrent.futures
+import functools
 import json
 try:
     import requests
@@ -22,32 +22,42 @@ except ImportError:
             with open(path, "r") as f:
                 return json_module.load(f)
 
+from core.anilist_scheduler import INTERACTIVE, get_scheduler
+from core.mutation_queue import get_mutation_queue
+from core.progress_store import PROGRESS_FILE, entry_key, get_progress_store
+
 # AniList Configuration
 ANILIST_USERNAME = "Ach00"  # Your AniList username
-ANILIST_CACHE_FILE = "anime_progress.json"
+ANILIST_CACHE_FILE = PROGRESS_FILE
 ANILIST_CACHE_TTL = 3600  # 1 hour in seconds
+ANILIST_INTERACTIVE_TIMEOUT = 10  # seconds a waiting user gives the scheduler
+
+
+def fetch_anime_list_changes(username, priority=INTERACTIVE):
+    """Fetch currently watching anime from AniList through the shared scheduler.
+
+    Args:
+        username (str): AniList user name
+        priority (int): INTERACTIVE if the user is waiting, else BACKGROUND
+
+    Returns:
+        tuple: (anime_list, changed) - ``changed`` is False when the response
+        is identical to the previous one, so callers can skip saving it
+
+    Raises:
+        requests.exceptions.RequestException: On network errors
+        AniListError: On HTTP or GraphQL errors
+        concurrent.futures.TimeoutError: If an INTERACTIVE request waited
+            longer than ANILIST_INTERACTIVE_TIMEOUT (e.g. behind a rate
+            limit pause)
+    """
+    # Import here so a missing 'requests' only disables the API
+    from core.anilist_client import get_client
+    # Background callers may wait out rate limits; a user may not
+    timeout = ANILIST_INTERACTIVE_TIMEOUT if priority == INTERACTIVE else None
+    send = functools.partial(get_scheduler().request, priority=priority, timeout=timeout)
+    return get_client().fetch_watching(username, send=send)
 
-# AniList GraphQL Query
-ANILIST_QUERY = """
-query ($username: String) {
-  MediaListCollection(userName: $username, type: ANIME, status: CURRENT) {
-    lists {
-      entries {
-        media {
-          id
-          title {
-            romaji
-            english
-          }
-          siteUrl
-          episodes
-        }
-        progress
-      }
-    }
-  }
-}
-"""
 
 def fetch_anime_list(username, use_fallback=True):
     """Fetch currently watching anime from AniList API with fallback to cache."""
@@ -57,35 +67,9 @@ def fetch_anime_list(username, use_fallback=True):
             return load_anime_list_from_cache()
         return []
     
+    from core.anilist_client import AniListError
     try:
-        url = "https://graphql.anilist.co"
-        response = requests.post(
-            url, 
-            json={"query": ANILIST_QUERY, "variables": {"username": username}},
-            timeout=10  # 10 second timeout
-        )
-        response.raise_for_status()
-        data = response.json()
-        
-        # Parse out relevant data
-        anime_list = []
-        for media_list in data.get("data", {}).get("MediaListCollection", {}).get("lists", []):
-            for entry in media_list.get("entries", []):
-                try:
-                    media = entry.get("media", {})
-                    title = media.get("title", {})
-                    
-                    anime_data = {
-                        "id": media.get("id", 0),
-                        "title": title.get("english") or title.get("romaji", "Unknown Title"),
-                        "url": media.get("siteUrl", ""),
-                        "episodes": media.get("episodes", 0),
-                        "progress": entry.get("progress", 0)
-                    }
-                    anime_list.append(anime_data)
-                except Exception as e:
-                    print(f"⚠️  Error parsing anime entry: {e}")
-                    continue
+        anime_list, _ = fetch_anime_list_changes(username)
                     
         if not anime_list and use_fallback:
             print("⚠️  No anime found in API response, trying cache...")
@@ -93,7 +77,13 @@ def fetch_anime_list(username, use_fallback=True):
             
         return anime_list
         
-    except requests.exceptions.RequestException as e:
+    except concurrent.futures.TimeoutError:
+        print(f"⚠️  AniList did not answer within {ANILIST_INTERACTIVE_TIMEOUT}s")
+        if use_fallback:
+            print("⚠️  Falling back to cached data...")
+            return load_anime_list_from_cache()
+        return []
+    except (requests.exceptions.RequestException, AniListError) as e:
         print(f"⚠️  Error fetching from AniList API: {e}")
         if use_fallback:
             print("⚠️  Falling back to cached data...")
@@ -105,60 +95,57 @@ def fetch_anime_list(username, use_fallback=True):
             return load_anime_list_from_cache()
         return []
 
+
+def refresh_anime_cache(username, priority=INTERACTIVE):
+    """Fetch the list from AniList and store it only if it changed.
+
+    Args:
+        username (str): AniList user name
+        priority (int): Scheduler priority, see fetch_anime_list_changes
+
+    Returns:
+        tuple: (anime_list, changed) - the list as stored in the progress store
+
+    Raises:
+        Same as fetch_anime_list_changes
+    """
+    store = get_progress_store()
+    anime_list, changed = fetch_anime_list_changes(username, priority)
+    if changed or store.timestamp is None:
+        # Bumps still waiting in the mutation queue are newer than what
+        # AniList returned; don't roll the local progress back to it
+        pending = get_mutation_queue().pending_progress()
+        anime_list = [dict(anime, progress=max(anime.get('progress') or 0, pending[anime['id']]))
+                      if anime.get('id') in pending else anime
+                      for anime in anime_list]
+        store.replace_all(anime_list)
+    return store.anime_list(), changed
+
 def load_anime_list_from_cache():
-    """Load anime list from the progress cache file."""
+    """Load anime list from the progress store."""
     try:
-        if not os.path.exists(ANILIST_CACHE_FILE):
-            print("⚠️  No cache file found")
-            return []
-            
-        with open(ANILIST_CACHE_FILE, 'r', encoding='utf-8') as f:
-            try:
-                data = json.load(f)
-            except json.JSONDecodeError:
-                print("⚠️  Error: Cache file is not valid JSON")
-                return []
-            
-        # If we have a cached list from a previous API call
-        if isinstance(data, dict) and "anime_list" in data:
-            anime_list = data["anime_list"]
-            # Ensure all entries have required fields
-            return [{
-                'title': a.get('title', 'Unknown Title'),
-                'progress': a.get('progress', 0),
-                'episodes': a.get('episodes', a.get('total_episodes', '?')),
-                'url': a.get('url', ''),
-                'id': a.get('id', 0)
-            } for a in anime_list]
-            
-        # If it's a direct list of anime (legacy format)
-        if isinstance(data, list):
-            return data
-            
-        return []
+        anime_list = get_progress_store().anime_list()
+        if not anime_list:
+            print("⚠️  No cached anime list found")
+        return anime_list
     except Exception as e:
         print(f"❌ Error loading from cache: {e}")
         return []
 
+def anime_cache_age():
+    """Seconds since the cache was last written from the API, or None if unknown."""
+    return get_progress_store().age()
+
 def load_cached_anime():
     """Load anime list from cache if it exists and is not expired."""
-    if not os.path.exists(ANILIST_CACHE_FILE):
-        return None
-        
-    with open(ANILIST_CACHE_FILE, 'r', encoding='utf-8') as f:
-        cache = json.load(f)
-        
-    if time.time() - cache["timestamp"] < ANILIST_CACHE_TTL:
-        return cache["anime_list"]
+    age = anime_cache_age()
+    if age is not None and age < ANILIST_CACHE_TTL:
+        return load_anime_list_from_cache()
     return None
 
 def save_anime_cache(anime_list):
-    """Save anime list to cache with current timestamp."""
-    with open(ANILIST_CACHE_FILE, 'w', encoding='utf-8') as f:
-        json.dump({
-            "timestamp": time.time(),
-            "anime_list": anime_list
-        }, f, ensure_ascii=False, indent=2)
+    """Save anime list to the progress store with current timestamp."""
+    get_progress_store().replace_all(anime_list)
 
 def update_episode_progress(anime_title, new_episode, anime_selector=None):
     """Update the episode progress for a specific anime.
@@ -179,36 +166,19 @@ def update_episode_progress(anime_title, new_episode, anime_selector=None):
                     anime['progress'] = new_episode
                     print(f"📝 Updated in-memory progress for {anime_title} to episode {new_episode}")
         
-        # Then update the cache file
-        if not os.path.exists(ANILIST_CACHE_FILE):
-            print("❌ No anime cache found")
+        # Then record it in the progress store (one journal append)
+        store = get_progress_store()
+        anime = store.find(anime_title)
+        if anime is None:
+            print(f"❌ Could not find anime in cache: {anime_title}")
             return False
-            
-        with open(ANILIST_CACHE_FILE, 'r+', encoding='utf-8') as f:
-            try:
-                cache = json.load(f)
-            except json.JSONDecodeError:
-                print("❌ Error: Invalid cache file format")
-                return False
-                
-            # Find and update the anime in cache
-            updated = False
-            for anime in cache.get("anime_list", []):
-                if anime.get("title", "").lower() == anime_title.lower():
-                    anime["progress"] = new_episode
-                    updated = True
-                    break
-                    
-            if updated:
-                # Save the updated cache
-                f.seek(0)
-                json.dump(cache, f, ensure_ascii=False, indent=2)
-                f.truncate()
-                print(f"✅ Updated {anime_title} to episode {new_episode} in cache")
-                return True
-            else:
-                print(f"❌ Could not find anime in cache: {anime_title}")
-                return False
+        store.set_progress(entry_key(anime), new_episode)
+        print(f"✅ Updated {anime_title} to episode {new_episode} in cache")
+        
+        # Push it to AniList in the background (collapsed with other bumps)
+        if anime['id']:
+            get_mutation_queue().enqueue_progress(anime['id'], new_episode)
+        return True
                 
     except Exception as e:
         print(f"❌ Error updating episode progress: {e}")
@@ -238,7 +208,7 @@ def show_currently_watching():
             validated_anime = {
                 'title': anime.get('title', 'Unknown Title'),
                 'progress': anime.get('progress', 0),
-                'episodes': anime.get('episodes', '?'),
+                'episodes': anime.get('episodes') or '?',
                 'url': anime.get('url', ''),
                 'id': anime.get('id', 0)
             }
@@ -163,7 +163,7 @@ class AnimeSelector:
             anime = self.anime_list[self.selected_index]
             title = anime.get('title', 'Unknown Title')
             progress = anime.get('progress', 0)
-            episodes = anime.get('episodes', anime.get('total_episodes', '?'))
+            episodes = anime.get('episodes') or '?'
             url = anime.get('url', 'https://anilist.co')
             
             print("\n" + "=" * 60)
@@ -11,7 +11,7 @@ from sim_anime_player import AnimePlayer
 from modules.overlay_window import OverlayWindow
 from sim_anime_selector import AnimeSelector
 from simulator import ColorSimulator
-from utils.config_loader import load_json
+from utils.config_loader import load_config, ConfigError, ModeTable
 
 class AnimeControllerApp:
     """Main application class for the Anime Controller."""
@@ -20,6 +20,8 @@ class AnimeControllerApp:
         """Initialize the application."""
         self.app = QApplication(sys.argv)
         self.current_mode = "main"
+        self.config = load_config(os.path.join(os.path.dirname(__file__), "..", "config"))
+        self.config.add_listener(self.apply_config_changes)
         self.mode_config = self.load_mode_config(self.current_mode)
         self.sim = ColorSimulator(self.mode_config)
         
@@ -39,10 +41,17 @@ class AnimeControllerApp:
         self.overlay.update_mode(self.current_mode)
     
     def load_mode_config(self, mode_name):
-        """Load configuration for a specific mode."""
-        config_dir = os.path.join(os.path.dirname(__file__), "..", "config")
-        path = os.path.join(config_dir, "modes", f"{mode_name}.json")
-        return load_json(path) or {"actions": {}, "sequences": []}
+        """Return the precompiled tables for a mode (no disk access)."""
+        try:
+            return self.config.get_mode_table(mode_name)
+        except ConfigError:
+            return ModeTable.empty(mode_name)
+    
+    def apply_config_changes(self, parts):
+        """Rebuild the simulator if the current mode was edited on disk."""
+        if f"mode:{self.current_mode}" in parts:
+            self.mode_config = self.load_mode_config(self.current_mode)
+            self.sim = ColorSimulator(self.mode_config)
     
     def update_overlay_anime_list(self):
         """Update the anime list in the overlay."""
@@ -55,7 +64,7 @@ class AnimeControllerApp:
                     formatted_list.append({
                         'title': anime.get('title', 'Unknown'),
                         'progress': anime.get('progress', 0),
-                        'episodes': anime.get('episodes', anime.get('total_episodes', '?'))
+                        'episodes': anime.get('episodes') or '?'
                     })
                 self.overlay.update_anime_list(formatted_list)
             else:
@@ -107,6 +116,7 @@ class AnimeControllerApp:
         while True:
             try:
                 user_input = input("\nEnter color or command: ").strip().lower()
+                self.config.poll_changes()
 
                 if user_input == 'exit':
                     break
@@ -190,7 +200,7 @@ class AnimeControllerApp:
                 # Show anime info
                 print(f"\n📺 {current_anime['title']}")
                 print(f"📺 Episode: {next_episode}")
-                print(f"📊 Progress: {current_anime.get('progress', 0)}/{current_anime.get('episodes', '?')} episodes")
+                print(f"📊 Progress: {current_anime.get('progress', 0)}/{current_anime.get('episodes') or '?'} episodes")
                 print("\n🔴 Next Episode  |  🟡 Show Progress")
     
     def handle_yellow_red_sequence(self):
@@ -6,6 +6,7 @@ from PyQt6.QtWidgets import (QWidget, QLabel, QVBoxLayout, QHBoxLayout,
                            QFrame, QGraphicsOpacityEffect, QScrollArea, QApplication)
 from PyQt6.QtCore import Qt, QTimer, QPropertyAnimation, QEasingCurve, QRect
 from PyQt6.QtGui import QColor
+from ui.hold_ring import HoldRing
 
 class OverlayWindow(QWidget):
     """Transparent overlay window for displaying anime list and status."""
@@ -99,9 +100,13 @@ class OverlayWindow(QWidget):
         self.color_label = QLabel("None")
         self.color_label.setStyleSheet("color: #ffffff; font-size: 14px; margin-left: 5px;")
         
+        # Hold progress ring (idle until set_hold_source is called)
+        self.hold_ring = HoldRing()
+        
         # Add to layout
         status_layout.addWidget(self.status_label)
         status_layout.addStretch()
+        status_layout.addWidget(self.hold_ring)
         status_layout.addWidget(self.color_indicator)
         status_layout.addWidget(self.color_label)
         layout.addWidget(self.status_container)
@@ -186,7 +191,7 @@ class OverlayWindow(QWidget):
         for idx, anime in enumerate(anime_list):
             title = anime.get('title', 'Unknown')
             progress = anime.get('progress', 0)
-            episodes = anime.get('episodes', '?')
+            episodes = anime.get('episodes') or '?'
             
             # Create container for each anime entry
             entry = QWidget()
@@ -291,6 +296,10 @@ class OverlayWindow(QWidget):
         self.status_label.setText(f"Status: {message}")
         QTimer.singleShot(3000, lambda: self.status_label.setText("Status: Ready"))
         
+    def set_hold_source(self, progress, clock):
+        """Show hold progress from a GestureEngine's HoldProgress."""
+        self.hold_ring.set_source(progress, clock)
+        
     def update_color(self, color_name):
         """Update the current color display."""
         self.current_color = color_name
@@ -1,49 +1,51 @@
 import time
-try:
-    from utils.actions import perform_action
-except ImportError:
-    from actions import perform_action
+from utils.actions import perform_action
+from utils.config_loader import ModeTable
+from utils.gestures import EventType, GestureEngine
 
 class ColorSimulator:
-    def __init__(self, mode_config, sequence_window=2.5):
+    def __init__(self, mode_config, sequence_window=2.5, clock=time.monotonic):
+        # Raw mode dicts are still accepted and compiled once here
+        if not isinstance(mode_config, ModeTable):
+            mode_config = ModeTable.from_dict(mode_config.get("mode_name", ""), mode_config)
         self.mode_config = mode_config
-        self.sequence_history = []
+        # Kept for compatibility; each sequence's own time_window applies
         self.sequence_window = sequence_window
+        self.clock = clock
+        self.engine = GestureEngine(mode_config)
+        self.engine.add_listener(self._on_event)
+        self._resolved = []
+
+    def _on_event(self, event):
+        # Color actions are handled by the caller; queue everything else
+        if event.type not in (EventType.PRESS, EventType.RELEASE, EventType.HOLD):
+            self._resolved.append(event)
 
     def record_color(self, color):
-        now = time.time()
-        self.sequence_history.append((color, now))
-        self.sequence_history = [
-            (c, t) for c, t in self.sequence_history if now - t < self.sequence_window
-        ]
+        """Record a detection: a color, None, or several colors at once."""
+        self.engine.update(color, self.clock())
 
-    def get_recent_sequence(self, length=2):
-        """Get the most recent sequence of colors and their timestamps."""
-        if len(self.sequence_history) < length:
-            return None, None
-        
-        colors = [c for c, _ in self.sequence_history[-length:]]
-        times = [t for _, t in self.sequence_history[-length:]]
-        return colors, times
-    
-    def check_sequences(self):
-        """Check if any configured sequences match the recent input."""
-        if "sequences" not in self.mode_config:
-            return False
+    def release(self):
+        """Record that no color is shown anymore."""
+        self.engine.update(None, self.clock())
+
+    def check_gestures(self):
+        """Run the actions of every sequence and gesture resolved so far.
 
-        for seq in self.mode_config["sequences"]:
-            if isinstance(seq, dict) and "pattern" in seq:
-                pattern = seq["pattern"]
-                seq_time = seq.get("time_window", self.sequence_window)
-                
-                colors, times = self.get_recent_sequence(len(pattern))
-                if not colors:
-                    continue
-                    
-                if colors == pattern and (times[-1] - times[0]) <= seq_time:
-                    print(f"🎯 Sequence matched: {'→'.join(pattern)}")
-                    if "action" in seq:
-                        perform_action(seq["action"])
-                    self.sequence_history.clear()
-                    return True
-        return False
+        A tap waiting for a possible double-tap, and a sequence that is
+        the prefix of a longer one, only resolve once their window has
+        passed, so scheduled deadlines are fired first.
+        """
+        self.engine.advance(self.clock())
+        resolved, self._resolved = self._resolved, []
+        for event in resolved:
+            if event.type is EventType.SEQUENCE:
+                print(f"🎯 Sequence matched: {'→'.join(event.sequence.pattern)}")
+            else:
+                print(f"👆 {event.type.value}: {'+'.join(event.gesture.colors)}")
+            perform_action(event.action)
+        return bool(resolved)
+
+    def check_sequences(self):
+        """Run the actions of resolved sequences and gestures (see check_gestures)."""
+        return self.check_gestures()
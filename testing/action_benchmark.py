@@ -0,0 +1,119 @@
+"""Time every configured action without a display.
+
+Runs each action of every mode in config/modes/ (and the bookmarklet
+macro behind next_episode actions) against a recording input backend
+with a virtual clock, a fake window manager and a synthetic screen that
+shows every template image the modes refer to. For each action it
+prints:
+
+* wall  - how long the action takes when run for real (its waits and
+          sleeps, measured on the virtual clock)
+* cpu   - real time spent computing (template matching etc.)
+* events - synthetic key/mouse events sent
+
+Usage:
+    python testing/action_benchmark.py [--max SECONDS]
+
+With --max, exits with status 1 if any action's wall time exceeds
+SECONDS, so slow macros can be caught as regressions.
+"""
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+from utils.actions import perform_action
+from utils.capture import FileCapture, set_capture
+from utils.config_loader import Config
+from utils.input_backend import WAIT, RecordingInputBackend, set_input
+from utils.window_service import FakeWindowBackend, WindowService, set_window_service
+
+
+def image_paths(action):
+    params = action.params
+    if action.type == "image_click":
+        yield params["image_path"]
+    elif action.type == "image_sequence":
+        for step in params["sequence"]:
+            yield step["image_path"]
+
+
+def synthetic_screen(paths):
+    """A 1080p screen showing every readable template, laid out on a grid."""
+    rng = np.random.default_rng(0)
+    screen = cv2.GaussianBlur(rng.integers(0, 255, (1080, 1920, 3), dtype=np.uint8), (0, 0), 3)
+    x, y, row = 40, 40, 0
+    for path in sorted(set(paths)):
+        image = cv2.imread(path)
+        if image is None:
+            continue
+        h, w = image.shape[:2]
+        if x + w > 1880:
+            x, y, row = 40, y + row + 40, 0
+        screen[y:y + h, x:x + w] = image
+        x, row = x + w + 40, max(row, h)
+    return screen
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--max", type=float, default=None,
+                        help="fail if any action takes longer than this many seconds")
+    args = parser.parse_args()
+    os.chdir(ROOT)
+
+    config = Config("config")
+    config.load_configs()
+    actions = [(mode, location, action)
+               for mode, table in sorted(config.mode_tables.items())
+               for location, action in table.iter_actions()]
+
+    windows = FakeWindowBackend(((0, 0, 1920, 1080), (1920, 0, 2560, 1440)))
+    browser = windows.open_window("New Tab — Mozilla Firefox", "firefox")
+    recorder = RecordingInputBackend(
+        on_open_url=lambda url: windows.set_title(browser, f"{url} — Mozilla Firefox"))
+    set_input(recorder)
+    set_window_service(WindowService(windows, clock=recorder.clock))
+    set_capture(FileCapture(image=synthetic_screen(
+        p for _, _, action in actions for p in image_paths(action))))
+
+    def measure(run):
+        recorder.clear()
+        start = time.perf_counter()
+        run()
+        cpu = time.perf_counter() - start
+        sent = sum(1 for e in recorder.events if e.kind != WAIT)
+        return recorder.elapsed(), cpu, sent
+
+    rows = []
+    for mode, location, action in actions:
+        label = f"{mode}.{location} ({action.type})"
+        rows.append((label, measure(lambda: perform_action(action))))
+        if action.type == "next_episode":
+            from input_simulator import trigger_bookmarklet
+            name = action.params["bookmarklet_name"]
+            rows.append((f"{label} macro '{name}'",
+                         measure(lambda: trigger_bookmarklet(name))))
+
+    slow = 0
+    print(f"\n{'action':<60} {'wall':>8} {'cpu':>9} {'events':>7}")
+    for label, (wall, cpu, sent) in rows:
+        over = args.max is not None and wall > args.max
+        slow += over
+        print(f"{'⚠️ ' if over else ''}{label:<60} {wall:>7.2f}s {cpu * 1000:>7.1f}ms {sent:>7}")
+    total = sum(wall for _, (wall, _, _) in rows)
+    print(f"\n⏱️ {len(rows)} actions, {total:.2f}s of waiting in total")
+    if slow:
+        print(f"❌ {slow} action(s) slower than {args.max:g}s")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,140 @@
+"""Check AniListClient against a local GraphQL stand-in.
+
+Starts a small HTTP/1.1 server on localhost that answers the watching
+query with gzip-compressed JSON (like graphql.anilist.co does) and
+counts TCP connections, then checks that the client:
+
+* reuses one keep-alive connection for repeated requests
+* decompresses gzip bodies
+* reports unchanged responses as ``changed=False`` and returns the same
+  parsed list without parsing it again
+* picks up changes and surfaces GraphQL errors as AniListError
+* sends If-None-Match and handles 304 Not Modified
+
+Usage:
+    python testing/anilist_client_check.py
+"""
+import gzip
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from core.anilist_client import AniListClient, AniListError
+
+
+def collection(progress):
+    return {"data": {"MediaListCollection": {"lists": [{"entries": [
+        {"media": {"id": 1, "title": {"romaji": "Sousou no Frieren", "english": "Frieren"},
+                   "siteUrl": "https://anilist.co/anime/1", "episodes": 28},
+         "progress": progress},
+    ]}]}}}
+
+
+class StandIn:
+    """Mutable state shared with the request handler."""
+    progress = 3
+    error = False
+    etags = False
+    connections = 0
+    requests = 0
+    last_headers = {}
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        StandIn.connections += 1
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        StandIn.requests += 1
+        StandIn.last_headers = dict(self.headers)
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        assert request["variables"] == {"username": "tester"}, request
+        if StandIn.error:
+            payload = {"data": None, "errors": [{"message": "User not found"}]}
+        else:
+            payload = collection(StandIn.progress)
+        body = json.dumps(payload).encode()
+        etag = '"%s"' % hashlib.sha1(body).hexdigest()
+        if StandIn.etags and self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        compressed = "gzip" in self.headers.get("Accept-Encoding", "")
+        if compressed:
+            body = gzip.compress(body)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        if compressed:
+            self.send_header("Content-Encoding", "gzip")
+        if StandIn.etags:
+            self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def main():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    client = AniListClient(url=f"http://127.0.0.1:{server.server_port}/")
+
+    anime, changed = client.fetch_watching("tester")
+    assert changed and anime[0]["title"] == "Frieren" and anime[0]["progress"] == 3, anime
+    assert "gzip" in StandIn.last_headers.get("Accept-Encoding", "")
+    print("✅ first fetch parsed (gzip)")
+
+    again, changed = client.fetch_watching("tester")
+    assert not changed and again is anime
+    print("✅ unchanged response not re-parsed")
+
+    StandIn.progress = 4
+    updated, changed = client.fetch_watching("tester")
+    assert changed and updated[0]["progress"] == 4
+    print("✅ change detected")
+
+    start = time.perf_counter()
+    for _ in range(50):
+        client.fetch_watching("tester")
+    per_call = (time.perf_counter() - start) / 50 * 1000
+    assert StandIn.connections == 1, StandIn.connections
+    print(f"✅ {StandIn.requests} requests over {StandIn.connections} connection "
+          f"({per_call:.2f}ms per unchanged fetch)")
+
+    StandIn.etags = True
+    client.fetch_watching("tester")
+    seen = StandIn.requests
+    anime, changed = client.fetch_watching("tester")
+    assert StandIn.last_headers.get("If-None-Match") and not changed
+    assert StandIn.requests == seen + 1 and anime[0]["progress"] == 4
+    print("✅ If-None-Match / 304 handled")
+
+    StandIn.error = True
+    try:
+        client.fetch_watching("tester")
+    except AniListError as e:
+        print(f"✅ GraphQL error raised: {e}")
+    else:
+        raise AssertionError("GraphQL error not raised")
+
+    client.close()
+    server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
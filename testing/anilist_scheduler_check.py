@@ -0,0 +1,140 @@
+"""Check the AniList request scheduler against a local GraphQL stand-in.
+
+The stand-in answers every request with X-RateLimit-* headers, can be
+held (to let requests pile up in the queue) and can answer 429 with
+Retry-After. The check verifies that the scheduler:
+
+* sends a queued interactive request before queued background ones
+* merges queued fields into one aliased document and sends identical
+  documents once
+* waits out Retry-After on 429 and re-sends instead of failing
+* never sends a request whose caller timed out waiting for it
+* holds background work when X-RateLimit-Remaining reaches the reserve,
+  while interactive requests still go through
+
+Usage:
+    python testing/anilist_scheduler_check.py
+"""
+import json
+import os
+from concurrent.futures import TimeoutError
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from core.anilist_client import AniListClient
+from core.anilist_scheduler import BACKGROUND, INTERACTIVE, AniListScheduler, Field
+
+MEDIA_FIELD = "Media(id: $id) { id }"
+
+
+class StandIn:
+    gate = threading.Event()   # requests wait for this
+    log = []                   # (first alias or query name, number of fields)
+    remaining = 90
+    throttle = 0               # next N requests get 429
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        StandIn.gate.wait()
+        headers = {"X-RateLimit-Limit": "90", "X-RateLimit-Remaining": str(StandIn.remaining)}
+        if StandIn.throttle:
+            StandIn.throttle -= 1
+            body, status = json.dumps({"errors": [{"message": "Too Many Requests."}]}), 429
+            headers["Retry-After"] = "1"
+        else:
+            variables = request["variables"]
+            ids = [variables[name] for name in sorted(variables) if name.startswith("id_")]
+            if ids:
+                StandIn.log.append(("media", ids))
+                data = {f"f{i}": {"id": variables[f"id_{i}"]} for i in range(len(ids))}
+            else:
+                StandIn.log.append((variables.get("name"), []))
+                data = {"Viewer": {"name": variables.get("name")}}
+            body, status = json.dumps({"data": data}), 200
+        body = body.encode()
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def viewer(name):
+    return "query ($name: String) { Viewer { name } }", {"name": name}
+
+
+def main():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    client = AniListClient(url=f"http://127.0.0.1:{server.server_port}/")
+    scheduler = AniListScheduler(client=client, reserve=5)
+
+    # Hold the first request so the others queue up behind it
+    first = scheduler.submit(*viewer("first"), priority=BACKGROUND)
+    time.sleep(0.1)
+    fields = [scheduler.submit_field(Field("query", MEDIA_FIELD, {"id": i}, {"id": "Int"}))
+              for i in range(1, 5)]
+    duplicates = [scheduler.submit(*viewer("same"), priority=BACKGROUND) for _ in range(3)]
+    interactive = scheduler.submit(*viewer("interactive"), priority=INTERACTIVE)
+    StandIn.gate.set()
+    for future in [first, interactive, *fields, *duplicates]:
+        future.result(5)
+
+    assert StandIn.log[1] == ("interactive", []), StandIn.log
+    print("✅ interactive request jumped the background queue")
+    assert ("media", [1, 2, 3, 4]) in StandIn.log
+    assert [f.result().data for f in fields] == [{"id": i} for i in range(1, 5)]
+    assert StandIn.log.count(("same", [])) == 1
+    assert len({id(f.result()) for f in duplicates}) == 1
+    print(f"✅ {len(fields)} fields merged into one request, {len(duplicates)} identical "
+          f"requests sent once ({len(StandIn.log)} requests for {2 + len(fields) + len(duplicates)} calls)")
+
+    StandIn.throttle = 1
+    start = time.monotonic()
+    response = scheduler.request(*viewer("throttled"), priority=INTERACTIVE, timeout=5)
+    waited = time.monotonic() - start
+    assert response.data == {"Viewer": {"name": "throttled"}} and waited >= 1.0, waited
+    print(f"✅ 429 waited out ({waited:.1f}s, Retry-After 1) and re-sent")
+
+    # Held behind a pause longer than the caller is willing to wait
+    scheduler.paused_until = scheduler.clock() + 0.5
+    try:
+        scheduler.request(*viewer("impatient"), priority=INTERACTIVE, timeout=0.1)
+    except TimeoutError:
+        pass
+    else:
+        raise AssertionError("request should time out")
+    scheduler.request(*viewer("after pause"), priority=INTERACTIVE, timeout=5)
+    assert ("impatient", []) not in StandIn.log, StandIn.log
+    print("✅ timed-out request withdrawn, not sent after the pause")
+
+    StandIn.remaining = 3
+    scheduler.request(*viewer("low"), priority=INTERACTIVE, timeout=5)
+    held = scheduler.submit(*viewer("background"), priority=BACKGROUND)
+    time.sleep(0.3)
+    assert not held.done()
+    scheduler.request(*viewer("urgent"), priority=INTERACTIVE, timeout=5)
+    print("✅ background held at the reserve, interactive still sent")
+
+    scheduler.stop(1.0)
+    assert held.cancelled()
+    server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,39 @@
+"""Time full-screen and region grabs for every available capture backend.
+
+Usage:
+    python testing/capture_bench.py [x y width height]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from utils.capture import BACKENDS, create_backend
+
+ROUNDS = 20
+
+
+def average_ms(backend, region):
+    backend.grab(region)  # open the display connection outside the timing
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        backend.grab(region)
+    return (time.perf_counter() - start) * 1000 / ROUNDS
+
+
+def main():
+    region = tuple(int(v) for v in sys.argv[1:5]) if len(sys.argv) >= 5 else (0, 0, 400, 300)
+    for name in BACKENDS:
+        try:
+            backend = create_backend(name)
+            full = average_ms(backend, None)
+            part = average_ms(backend, region)
+        except Exception as e:
+            print(f"⚠️ {name}: unavailable ({e})")
+            continue
+        print(f"📷 {name}: full screen {full:.1f} ms, region {list(region)} {part:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
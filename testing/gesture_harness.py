@@ -0,0 +1,284 @@
+"""Deterministic harness for the gesture engine.
+
+Runs scripted scenarios, fuzzes every mode with random detection streams
+on a virtual clock and reports engine throughput. No camera, no Qt and
+no real waiting are involved, so a full run takes seconds.
+
+Usage:
+    python testing/gesture_harness.py                 # scenarios + fuzz + bench
+    python testing/gesture_harness.py --mode video --events 500000 --seed 7
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from utils.clock import VirtualClock
+from utils.config_loader import Config, ModeTable
+from utils.gestures import EventType, GestureEngine, replay
+
+EPSILON = 1e-9
+
+# Declared gestures exercised on top of the video mode. The chord uses
+# colors none of the mode's sequences use, so swapping red and yellow
+# cards (both visible for a frame) stays a sequence.
+DEMO_GESTURES = [
+    {"gesture": "double_tap", "color": "red", "window": 0.5,
+     "action": {"type": "keyboard", "key": "m"}},
+    {"gesture": "chord", "colors": ["green", "blue"],
+     "action": {"type": "keyboard", "key": "esc"}},
+]
+
+
+def gesture_demo_table(config):
+    """The video mode with DEMO_GESTURES added."""
+    return ModeTable.from_dict("gestures", dict(config.modes["video"], gestures=DEMO_GESTURES))
+
+
+def record(mode_table, detections, until=None):
+    """Run detections through a fresh engine and return the event list."""
+    engine = GestureEngine(mode_table)
+    events = []
+    engine.add_listener(events.append)
+    replay(engine, detections, until=until, clock=VirtualClock())
+    return events
+
+
+def summarize(events):
+    """Compact, comparable form of an event list."""
+    out = []
+    for e in events:
+        if e.type is EventType.SEQUENCE:
+            out.append(("sequence", round(e.time, 6), "→".join(e.sequence.pattern)))
+        elif e.type is EventType.CHORD:
+            out.append(("chord", round(e.time, 6), "+".join(e.gesture.colors)))
+        else:
+            out.append((e.type.value, round(e.time, 6), e.color))
+    return out
+
+
+def run_scenarios(config):
+    """Hand-written gestures with their exact expected events."""
+    video = config.get_mode_table("video")
+    demo = gesture_demo_table(config)
+    scenarios = [
+        ("hold repeats every hold_time", video,
+         [(0.0, "red"), (0.033, "red"), (4.5, None)], None,
+         [("press", 0.0, "red"), ("hold", 2.0, "red"), ("hold", 4.0, "red"),
+          ("release", 4.5, "red")]),
+        ("unambiguous sequence fires at once", video,
+         [(0.0, "red"), (0.3, "yellow")], 5.0,
+         [("press", 0.0, "red"), ("release", 0.3, "red"), ("press", 0.3, "yellow"),
+          ("sequence", 0.3, "red→yellow")]),
+        ("prefix waits for the longer pattern", video,
+         [(0.0, "yellow"), (0.3, "red")], 5.0,
+         [("press", 0.0, "yellow"), ("release", 0.3, "yellow"), ("press", 0.3, "red"),
+          ("sequence", 2.0, "yellow→red")]),
+        ("longer pattern wins", video,
+         [(0.0, "yellow"), (0.3, "red"), (0.6, "yellow")], 5.0,
+         [("press", 0.0, "yellow"), ("release", 0.3, "yellow"), ("press", 0.3, "red"),
+          ("release", 0.6, "red"), ("press", 0.6, "yellow"),
+          ("sequence", 0.6, "yellow→red→yellow")]),
+        ("losing the card doesn't break a sequence", video,
+         [(0.0, "red"), (0.2, None), (0.4, "yellow")], None,
+         [("press", 0.0, "red"), ("release", 0.2, "red"), ("press", 0.4, "yellow"),
+          ("sequence", 0.4, "red→yellow")]),
+        ("cards swapped with an overlap frame stay a sequence", video,
+         [(0.0, "red"), (0.3, {"red", "yellow"}), (0.333, "yellow")], 5.0,
+         [("press", 0.0, "red"), ("press", 0.3, "yellow"), ("release", 0.333, "red"),
+          ("sequence", 0.333, "red→yellow")]),
+        ("a color the mode doesn't use doesn't silence the card", video,
+         [(0.0, ("yellow", "green")), (2.5, None)], None,
+         [("press", 0.0, "green"), ("press", 0.0, "yellow"), ("hold", 2.0, "yellow"),
+          ("release", 2.5, "green"), ("release", 2.5, "yellow")]),
+        ("double-tap", demo,
+         [(0.0, "red"), (0.1, None), (0.3, "red"), (0.4, None)], 5.0,
+         [("press", 0.0, "red"), ("release", 0.1, "red"), ("press", 0.3, "red"),
+          ("double_tap", 0.3, "red"), ("release", 0.4, "red")]),
+        ("chord replaces holds and sequences", demo,
+         [(0.0, "green"), (0.1, {"green", "blue"}), (0.5, "blue"), (3.0, None)], 5.0,
+         [("press", 0.0, "green"), ("press", 0.1, "blue"), ("chord", 0.1, "green+blue"),
+          ("release", 0.5, "green"), ("release", 3.0, "blue")]),
+    ]
+    failures = 0
+    for name, table, detections, until, expected in scenarios:
+        got = summarize(record(table, detections, until))
+        if got != expected:
+            failures += 1
+            print(f"❌ {name}\n   expected {expected}\n   got      {got}")
+        else:
+            print(f"✅ {name}")
+    return failures
+
+
+def random_detections(colors, count, rng, start=0.0):
+    """Generate a camera-like stream: runs of one color at ~30 FPS,
+    with the occasional pair of cards shown together."""
+    choices = list(colors) + [None]
+    if len(colors) > 1:
+        choices.append(tuple(colors[:2]))
+    now = start
+    color = None
+    out = []
+    while len(out) < count:
+        if rng.random() < 0.3:
+            color = rng.choice(choices)
+        # Mostly quick flicks, sometimes long holds
+        run = rng.randint(1, 10) if rng.random() < 0.9 else rng.randint(30, 150)
+        for _ in range(min(run, count - len(out))):
+            out.append((now, color))
+            now += 1 / 30
+    return out
+
+
+def primary(mode_table, pressed):
+    """The color expected to drive holds and sequences while ``pressed``
+    (sorted, like the fuzzed detections) are shown."""
+    if len(pressed) <= 1:
+        return pressed[0] if pressed else None
+    used = set(mode_table.actions) | set(mode_table.gesture_index)
+    used.update(color for seq in mode_table.sequences for color in seq.pattern)
+    candidates = [c for c in pressed if c in used] or pressed
+    for gesture in mode_table.gestures:
+        if gesture.kind == "chord" and len(set(pressed) & set(gesture.colors)) > 1:
+            return None
+    return candidates[0]
+
+
+def check_invariants(mode_table, detections, events):
+    """Return a list of problems found in one fuzz run."""
+    problems = []
+    pressed = {}  # color -> press time
+    chorded = set()  # colors still held after completing a chord
+    lone = None  # the color that drives holds and sequences
+    lone_since = None
+    last_seen = None  # last lone color, deduplicated like the matcher
+    presses = []  # lone colors in order, as the matcher sees them
+    edge_time = None  # edges of one update share a timestamp
+    last_time = float("-inf")
+
+    def settle():
+        # Evaluate the lone color once every edge of an update is applied
+        nonlocal lone, lone_since, last_seen, edge_time
+        edge_time = None
+        current = primary(mode_table, sorted(pressed))
+        if current == lone:
+            return
+        lone, lone_since = current, last_time
+        if current is None:
+            return
+        if current not in chorded and current != last_seen:
+            presses.append(current)
+        last_seen = current
+
+    for e in events:
+        if e.time < last_time - EPSILON:
+            problems.append(f"time went backwards at {e}")
+        is_edge = e.type in (EventType.PRESS, EventType.RELEASE)
+        if edge_time is not None and (not is_edge or e.time != edge_time):
+            settle()
+        last_time = e.time
+        if e.type is EventType.PRESS:
+            if e.color in pressed:
+                problems.append(f"press without release at {e}")
+            pressed[e.color] = e.time
+            edge_time = e.time
+        elif e.type is EventType.RELEASE:
+            if pressed.pop(e.color, None) is None:
+                problems.append(f"release of {e.color} which isn't pressed")
+            chorded.discard(e.color)
+            edge_time = e.time
+        elif e.type is EventType.HOLD:
+            if lone != e.color:
+                problems.append(f"hold of {e.color} while {sorted(pressed)} are pressed")
+            hold_time = e.action.hold_time
+            if hold_time > 0:
+                periods = (e.time - lone_since) / hold_time
+                if periods < 1 - EPSILON or abs(periods - round(periods)) > 1e-6:
+                    problems.append(f"hold at {e.time} is not a multiple of {hold_time}s after press")
+        elif e.type is EventType.CHORD:
+            if not set(e.gesture.colors) <= set(pressed):
+                problems.append(f"chord {e.gesture.colors} while {sorted(pressed)} are pressed")
+            chorded.update(e.gesture.colors)
+            presses.clear()
+            last_seen = None
+        elif e.type is EventType.DOUBLE_TAP:
+            if e.color not in pressed:
+                problems.append(f"double-tap of {e.color} which isn't pressed")
+        elif e.type is EventType.SEQUENCE:
+            pattern = list(e.sequence.pattern)
+            n = len(pattern)
+            # Resolved on its last color, or on the color that abandoned it
+            if presses[-n:] != pattern and presses[-n - 1:-1] != pattern:
+                problems.append(f"sequence {pattern} doesn't match recent colors {presses[-n - 1:]}")
+    return problems
+
+
+def mode_colors(table):
+    """Colors a mode reacts to, sorted; the first two are shown together."""
+    return sorted(set(table.actions) | set(table.gesture_index)) or ["red", "yellow"]
+
+
+def fuzz(tables, runs, length, seed):
+    failures = 0
+    for mode, table in tables.items():
+        colors = mode_colors(table)
+        rng = random.Random(f"{seed}:{mode}")
+        for run in range(runs):
+            detections = random_detections(colors, length, rng)
+            events = record(table, detections, until=detections[-1][0] + 10)
+            problems = check_invariants(table, detections, events)
+            # The same input must always produce the same output
+            if summarize(events) != summarize(record(table, detections, detections[-1][0] + 10)):
+                problems.append("non-deterministic event stream")
+            if problems:
+                failures += 1
+                print(f"❌ {mode} run {run}: {problems[0]} (+{len(problems) - 1} more)")
+                break
+        else:
+            print(f"✅ {mode}: {runs} random streams of {length} detections")
+    return failures
+
+
+def bench(tables, count, seed):
+    rng = random.Random(seed)
+    for mode, table in tables.items():
+        colors = mode_colors(table)
+        detections = random_detections(colors, count, rng)
+        engine = GestureEngine(table)
+        emitted = [0]
+        engine.add_listener(lambda e: emitted.__setitem__(0, emitted[0] + 1))
+        start = time.perf_counter()
+        replay(engine, detections)
+        elapsed = time.perf_counter() - start
+        print(f"⏱️  {mode:8s} {count / elapsed:12,.0f} detections/s "
+              f"({emitted[0]:,} events, {count * 1 / 30 / 3600:.1f} h of camera input in {elapsed:.2f}s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--config", default=os.path.join(os.path.dirname(__file__), "..", "config"))
+    parser.add_argument("--mode", action="append", help="Mode to test (repeatable, default: all)")
+    parser.add_argument("--runs", type=int, default=200, help="Fuzz runs per mode")
+    parser.add_argument("--length", type=int, default=500, help="Detections per fuzz run")
+    parser.add_argument("--events", type=int, default=200000, help="Detections per benchmark")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    config = Config(args.config)
+    config.load_configs()
+    tables = {mode: config.get_mode_table(mode) for mode in args.mode or sorted(config.mode_tables)}
+    if not args.mode:
+        tables["gestures"] = gesture_demo_table(config)
+
+    failures = run_scenarios(config)
+    failures += fuzz(tables, args.runs, args.length, args.seed)
+    bench(tables, args.events, args.seed)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""Check the AniList mutation queue against a local GraphQL stand-in.
+
+The stand-in accepts SaveMediaListEntry mutations, can be switched
+"offline" (HTTP 503) and records what it received. The check verifies
+that the queue:
+
+* collapses several bumps of one show into a single mutation
+* keeps updates on disk while offline and retries with backoff
+* sends everything once the stand-in is back, merged into one request
+  by the scheduler, and leaves an empty queue
+* reloads pending updates after a restart
+* drops only the update AniList rejects when a merged mutation fails
+* keeps unsent bumps when the watching list is refreshed from AniList
+
+Usage:
+    python testing/mutation_queue_check.py
+"""
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from core.anilist_client import AniListClient, set_client
+from core.anilist_scheduler import AniListScheduler, set_scheduler
+from core.mutation_queue import MutationQueue, set_mutation_queue
+from core.progress_store import ProgressStore, set_progress_store
+from modules.anilist import refresh_anime_cache
+
+
+UNKNOWN_MEDIA = 999999
+
+
+class StandIn:
+    offline = False
+    received = []   # (mediaId, progress, authorization)
+    requests = []   # mutations per successful request
+    attempts = 0
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        StandIn.attempts += 1
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        if StandIn.offline:
+            body, status = b"unavailable", 503
+        else:
+            # Pending shows arrive merged: f0: SaveMediaListEntry(...) with $mediaId_0, ...
+            variables, data = request["variables"], {}
+            if "MediaListCollection" in request["query"]:
+                # AniList has not seen the queued bumps yet
+                entries = [{"progress": progress, "media": {
+                               "id": media_id, "title": {"romaji": f"Show {media_id}"},
+                               "siteUrl": "", "episodes": 12, "status": "RELEASING"}}
+                           for media_id, progress in ((178025, 8), (153800, 4))]
+                data = {"MediaListCollection": {"lists": [{"entries": entries}]}}
+                body = json.dumps({"data": data}).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                return
+            count = len(variables) // 2
+            if UNKNOWN_MEDIA in [variables[f"mediaId_{i}"] for i in range(count)]:
+                # Like AniList: 404, no data, and the error only names the
+                # field when the mutation holds a single one
+                path = ["f0"] if count == 1 else None
+                body = json.dumps({"data": None, "errors": [
+                    {"message": "Not Found.", "status": 404, "path": path}]}).encode()
+                self.send_response(404)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                return
+            StandIn.requests.append(count)
+            for i in range(count):
+                StandIn.received.append((variables[f"mediaId_{i}"], variables[f"progress_{i}"],
+                                         self.headers.get("Authorization")))
+                data[f"f{i}"] = {"id": i, "progress": variables[f"progress_{i}"]}
+            body = json.dumps({"data": data}).encode()
+            status = 200
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("timed out")
+        time.sleep(0.01)
+
+
+def main():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    client = AniListClient(url=f"http://127.0.0.1:{server.server_port}/", token="test-token")
+    scheduler = AniListScheduler(client=client)
+    path = os.path.join(tempfile.mkdtemp(), "anilist_mutations.json")
+
+    # Offline: bumps are recorded at once and collapsed
+    StandIn.offline = True
+    queue = MutationQueue(path, scheduler=scheduler, backoff=0.05, max_backoff=0.2)
+    start = time.perf_counter()
+    for episode in (5, 6, 7):
+        queue.enqueue_progress(178025, episode)
+    queue.enqueue_progress(153800, 4)
+    print(f"✅ 4 bumps queued in {(time.perf_counter() - start) * 1000:.1f}ms")
+    wait_until(lambda: queue.failures >= 3)
+    with open(path, encoding="utf-8") as f:
+        assert json.load(f)["pending"] == {"178025": 7, "153800": 4}
+    print(f"✅ offline: {StandIn.attempts} attempts with backoff, updates kept on disk")
+    queue.stop()
+
+    # Restart while still offline, then come back online
+    queue = MutationQueue(path, scheduler=scheduler, backoff=0.05, max_backoff=0.2)
+    assert queue.pending == {178025: 7, 153800: 4}
+    StandIn.offline = False
+    queue.start()
+    wait_until(lambda: not queue.pending)
+    assert sorted(StandIn.received) == [(153800, 4, "Bearer test-token"),
+                                        (178025, 7, "Bearer test-token")], StandIn.received
+    with open(path, encoding="utf-8") as f:
+        assert json.load(f)["pending"] == {}
+    assert StandIn.requests == [2], StandIn.requests
+    print(f"✅ reloaded after restart, synced {len(StandIn.received)} shows in one request")
+
+    queue.enqueue_progress(178025, 8)
+    wait_until(lambda: not queue.pending)
+    assert StandIn.received[-1][:2] == (178025, 8)
+    print("✅ online bump sent immediately")
+
+    # One unknown show in a merged mutation must not take the others with it
+    queue.stop()
+    for media_id, progress in ((1, 5), (2, 7), (UNKNOWN_MEDIA, 1)):
+        queue.pending[media_id] = progress
+    assert queue.flush()
+    assert queue.pending == {}
+    assert (1, 5, "Bearer test-token") in StandIn.received
+    assert (2, 7, "Bearer test-token") in StandIn.received
+    assert UNKNOWN_MEDIA not in [media_id for media_id, _, _ in StandIn.received]
+    print("✅ rejected show dropped alone, the rest of the merged mutation synced")
+
+    # A refresh that lands before the queue syncs must not undo local bumps
+    queue.pending[178025] = 10
+    set_client(client)
+    set_scheduler(scheduler)
+    set_mutation_queue(queue)
+    store = ProgressStore(os.path.join(os.path.dirname(path), "anime_progress.json"))
+    set_progress_store(store)
+    anime_list, _ = refresh_anime_cache("someone")
+    progress = {anime["id"]: anime["progress"] for anime in anime_list}
+    assert progress == {178025: 10, 153800: 4}, progress
+    assert store.get(178025)["progress"] == 10
+    print("✅ refresh kept the unsent bump (AniList 8, local 10)")
+
+    scheduler.stop()
+    server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,146 @@
+"""Check the crash-safe progress store against the files a crash leaves.
+
+Every case writes the snapshot and journal by hand, as an interrupted
+run would have left them, and reloads a ProgressStore from them. The
+check verifies that the store:
+
+* skips a torn last journal line and truncates it, so the next append
+  starts on a fresh line
+* ignores journal records of an older snapshot generation (a crash
+  between writing a snapshot and truncating the journal)
+* keeps journaling against the old snapshot when writing a new one
+  fails (disk full, read-only directory)
+* loads a legacy ``{"timestamp", "anime_list"}`` cache using
+  ``total_episodes`` and ids only found in the URL, and rewrites it in
+  the current schema
+
+Usage:
+    python testing/progress_store_check.py
+"""
+import json
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from core.progress_store import SCHEMA_VERSION, ProgressStore
+
+
+def snapshot(generation, progress):
+    return {
+        "version": SCHEMA_VERSION,
+        "generation": generation,
+        "timestamp": 1700000000.0,
+        "anime_list": [
+            {"id": 1, "title": "Frieren", "url": "https://anilist.co/anime/1",
+             "episodes": 28, "progress": progress, "status": "finished"},
+            {"id": 2, "title": "Dandadan", "url": "https://anilist.co/anime/2",
+             "episodes": 12, "progress": 3, "status": "airing"},
+        ],
+    }
+
+
+def write_files(path, data, journal):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    with open(f"{path}.journal", "wb") as f:
+        f.write(journal)
+
+
+def record(generation, key, progress):
+    return json.dumps({"gen": generation, "key": key, "progress": progress, "t": 0}) + "\n"
+
+
+def check_torn_line(directory):
+    path = os.path.join(directory, "torn.json")
+    journal = (record(4, 1, 6) + record(4, 2, 4)).encode() + b'{"gen": 4, "key": 1, "prog'
+    write_files(path, snapshot(4, 5), journal)
+
+    store = ProgressStore(path)
+    assert store.get(1)["progress"] == 6 and store.get(2)["progress"] == 4
+    with open(f"{path}.journal", "rb") as f:
+        assert f.read().endswith(b"\n")
+
+    store.set_progress(1, 7)
+    assert ProgressStore(path).get(1)["progress"] == 7
+    print("✅ torn last line skipped and cut off; the next append replays")
+
+
+def check_stale_generation(directory):
+    # Crash after writing the generation 5 snapshot, before truncating
+    # the generation 4 journal
+    path = os.path.join(directory, "stale.json")
+    write_files(path, snapshot(5, 10), (record(4, 1, 6) + record(4, 2, 1)).encode())
+
+    store = ProgressStore(path)
+    assert store.get(1)["progress"] == 10 and store.get(2)["progress"] == 3
+    store.set_progress(2, 4)
+    store = ProgressStore(path)
+    assert store.get(1)["progress"] == 10 and store.get(2)["progress"] == 4
+    print("✅ journal records of an older snapshot ignored, new ones replayed")
+
+
+def check_failed_compact(directory):
+    path = os.path.join(directory, "full.json")
+    write_files(path, snapshot(3, 5), b"")
+    store = ProgressStore(path, compact_every=2)
+    # A directory in the way of the temp file makes every snapshot write fail
+    os.mkdir(f"{path}.tmp")
+    try:
+        store.replace_all(store.anime_list())
+    except OSError:
+        pass
+    else:
+        raise AssertionError("replace_all should report the failed write")
+    assert store.generation == 3
+    store.set_progress(1, 6)
+    store.set_progress(2, 4)  # reaches compact_every, the compaction fails too
+    assert ProgressStore(path).get(1)["progress"] == 6
+    assert ProgressStore(path).get(2)["progress"] == 4
+
+    os.rmdir(f"{path}.tmp")
+    store.set_progress(1, 7)  # compacts now
+    store = ProgressStore(path)
+    assert store.generation == 4 and store.get(1)["progress"] == 7
+    print("✅ failed snapshot writes lose no journaled progress")
+
+
+def check_legacy_file(directory):
+    path = os.path.join(directory, "legacy.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"timestamp": 1600000000.0, "anime_list": [
+            {"title": "Mushishi", "url": "https://anilist.co/anime/457/Mushishi/",
+             "total_episodes": 26, "progress": 11},
+            {"title": "Unknown Show", "url": "", "total_episodes": "?", "progress": 2},
+        ]}, f)
+
+    store = ProgressStore(path)
+    assert store.timestamp == 1600000000.0
+    assert store.get(457) == {"id": 457, "title": "Mushishi",
+                              "url": "https://anilist.co/anime/457/Mushishi/",
+                              "episodes": 26, "progress": 11, "status": None}
+    assert store.find("unknown show")["episodes"] is None
+
+    assert store.set_progress(457, 12)
+    assert store.set_progress("title:unknown show", 3)
+    store.compact()
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    assert data["version"] == SCHEMA_VERSION
+    assert [entry["progress"] for entry in data["anime_list"]] == [12, 3]
+    assert all("total_episodes" not in entry for entry in data["anime_list"])
+    print("✅ legacy total_episodes cache loaded and rewritten in the current schema")
+
+
+def main():
+    directory = tempfile.mkdtemp()
+    check_torn_line(directory)
+    check_stale_generation(directory)
+    check_failed_compact(directory)
+    check_legacy_file(directory)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,61 @@
+"""Benchmark the cached template matcher against a plain full-screen match.
+
+Pastes each template at a random spot of a synthetic 1920x1080 screen
+and times the first search (coarse + refine), the repeat search (last
+hit region) and a single full-resolution cv2.matchTemplate, which is
+what pyautogui runs on every attempt.
+
+Usage:
+    python testing/template_match_bench.py [template.png ...]
+"""
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from utils.template_match import TemplateMatcher, to_gray
+
+DEFAULT_TEMPLATES = ["screenshots/close_btn.png", "screenshots/play_button.png"]
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def main():
+    paths = sys.argv[1:] or DEFAULT_TEMPLATES
+    rng = np.random.default_rng(0)
+    # Blurred noise is a harsher background than a real desktop
+    screen = cv2.GaussianBlur(rng.integers(0, 255, (1080, 1920, 3), dtype=np.uint8), (0, 0), 3)
+    placed = {}
+    for path in paths:
+        image = cv2.imread(path)
+        if image is None:
+            print(f"❌ Could not read {path}")
+            return 1
+        h, w = image.shape[:2]
+        x, y = int(rng.integers(0, 1920 - w)), int(rng.integers(0, 1080 - h))
+        screen[y:y + h, x:x + w] = image
+        placed[path] = (x, y)
+
+    gray = to_gray(screen)
+    matcher = TemplateMatcher()
+    for path in paths:
+        template = matcher.template(path)
+        first, first_ms = timed(matcher.find, path, gray, 0.8)
+        _, repeat_ms = timed(matcher.find, path, gray, 0.8)
+        _, full_ms = timed(cv2.matchTemplate, gray, template.full, cv2.TM_CCOEFF_NORMED)
+        found = first is not None and (first.x, first.y) == placed[path]
+        print(f"{'✅' if found else '❌'} {path}: first {first_ms:.1f} ms, "
+              f"repeat {repeat_ms:.2f} ms, full-resolution match {full_ms:.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
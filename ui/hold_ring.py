@@ -0,0 +1,74 @@
+"""
+Custom-painted ring showing how far a color hold has progressed.
+"""
+import time
+from PyQt6.QtWidgets import QWidget, QApplication
+from PyQt6.QtCore import Qt, QTimer, QRectF
+from PyQt6.QtGui import QPainter, QColor, QPen
+
+# Same colors as the overlay's color indicator
+RING_COLORS = {
+    "red": "#ff6b6b",
+    "yellow": "#ffd166",
+}
+
+class HoldRing(QWidget):
+    """A small ring that fills up while a color is held.
+
+    The widget samples a HoldProgress (see utils.gestures) from a timer
+    running at the display refresh rate and only repaints when the
+    progress moved, so the detector never has to notify it.
+    """
+
+    def __init__(self, size: int = 22, thickness: int = 3, parent=None):
+        super().__init__(parent)
+        self.setFixedSize(size, size)
+        self.thickness = thickness
+        self.source = None
+        self.clock = time.monotonic
+        self._value = None
+        self._color = None
+
+        self.sample_timer = QTimer(self)
+        self.sample_timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self.sample_timer.timeout.connect(self._sample)
+
+    def set_source(self, progress, clock=time.monotonic):
+        """Start sampling a HoldProgress, timestamped with ``clock``."""
+        self.source = progress
+        self.clock = clock
+        screen = self.screen() or QApplication.primaryScreen()
+        refresh_rate = screen.refreshRate() if screen else 60.0
+        self.sample_timer.start(max(1, int(1000 / (refresh_rate or 60.0))))
+
+    def _sample(self):
+        value = self.source.value(self.clock())
+        color = self.source.color
+        if value is None and self._value is None:
+            return  # idle: nothing to draw, nothing to clear
+        if value is not None and self._value is not None and color == self._color:
+            # Skip repaints smaller than one degree of arc
+            if abs(value - self._value) < 1 / 360:
+                return
+        self._value = value
+        self._color = color
+        self.update()
+
+    def paintEvent(self, event):
+        if self._value is None:
+            return
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        margin = self.thickness / 2 + 1
+        rect = QRectF(margin, margin, self.width() - 2 * margin, self.height() - 2 * margin)
+
+        # Track
+        painter.setPen(QPen(QColor(100, 100, 100, 160), self.thickness))
+        painter.drawEllipse(rect)
+
+        # Progress arc, clockwise from 12 o'clock (angles are in 1/16 degree)
+        pen = QPen(QColor(RING_COLORS.get(self._color, "#a0ffa0")), self.thickness)
+        pen.setCapStyle(Qt.PenCapStyle.RoundCap)
+        painter.setPen(pen)
+        painter.drawArc(rect, 90 * 16, -int(self._value * 360 * 16))
+        painter.end()
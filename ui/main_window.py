@@ -12,7 +12,7 @@ from ui.player_widget import PlayerWidget
 from core.vision_worker import VisionWorker
 from core.anilist_mgr import AniListManager
 from core.youtube_mgr import YouTubeManager
-from utils.config_loader import load_json, load_color_config
+from utils.config_snapshot import load_config_cached
 
 class DownloadWorker(QThread):
     """Worker to search and add torrents without freezing UI."""
@@ -54,13 +54,22 @@ class MainWindow(QMainWindow):
         self.resize(1280, 720)
         self.setStyleSheet("background-color: #1e1e1e; color: white;")
         
-        # Load Config
-        self.global_config = load_json("config/global.json")
-        self.color_config = load_color_config(self.global_config)
+        # Load Config (memory-mapped snapshot unless a source file changed)
+        self.config, color_table = load_config_cached()
+        self.global_config = self.config.global_config
+        self.color_config = self.config.color_config
         self.roi = self.global_config.get("roi", [100, 100, 200, 200])
         
+        # Vision Worker starts first so the remote responds as soon as the
+        # camera opens; detections are queued until the event loop runs,
+        # by which time the UI below exists
+        self.vision_worker = VisionWorker(self.roi, self.color_config, color_table=color_table)
+        self.vision_worker.color_detected.connect(self.handle_color_detection)
+        self.vision_worker.start()
+        
         # Data Managers
         self.anilist_mgr = AniListManager()
+        self.anilist_mgr.watching_list_changed.connect(self.handle_anime_list_changed)
         self.youtube_mgr = YouTubeManager()
         self.nyaa_mgr = NyaaManager()
         self.deluge_mgr = DelugeManager()
@@ -72,6 +81,7 @@ class MainWindow(QMainWindow):
         self.content_items = {} # Map tab index to list of widgets
         self.is_player_active = False
         self.active_downloads = {} # Map card_index to torrent_id
+        self.download_workers = {} # Map show title to its searching/adding DownloadWorker
         
         # UI Setup
         self.central_widget = QWidget()
@@ -105,16 +115,33 @@ class MainWindow(QMainWindow):
         # Initialize Tabs
         self.setup_tabs()
         
-        # Vision Worker
-        self.vision_worker = VisionWorker(self.roi, self.color_config)
-        self.vision_worker.color_detected.connect(self.handle_color_detection)
-        self.vision_worker.start()
+        # Config Hot-Reload Timer (mtime polling, no I/O beyond stat)
+        self.config.add_listener(self.apply_config_changes)
+        self.config_timer = QTimer()
+        self.config_timer.timeout.connect(self.config.poll_changes)
+        self.config_timer.start(1000)
+        
+        # AniList revalidation: the grid is filled from the cache, a stale
+        # cache is refreshed in the background
+        self.anilist_timer = QTimer()
+        self.anilist_timer.timeout.connect(self.anilist_mgr.revalidate_if_stale)
+        self.anilist_timer.start(60000) # Check every minute
         
         # Download Monitor Timer
         self.dl_timer = QTimer()
         self.dl_timer.timeout.connect(self.monitor_downloads)
         self.dl_timer.start(2000) # Check every 2s
 
+    def apply_config_changes(self, parts):
+        """Push reloaded configuration into the running vision worker."""
+        self.global_config = self.config.global_config
+        if "global" in parts:
+            self.roi = self.global_config.get("roi", [100, 100, 200, 200])
+            self.vision_worker.set_roi(self.roi)
+        if "colors" in parts:
+            self.color_config = self.config.color_config
+            self.vision_worker.set_color_config(self.color_config)
+
     def setup_header(self):
         header_layout = QHBoxLayout()
         
@@ -138,7 +165,7 @@ class MainWindow(QMainWindow):
     def setup_tabs(self):
         # Tab 0: Anime
         anime_widget = QWidget()
-        anime_layout = QGridLayout(anime_widget)
+        self.anime_layout = QGridLayout(anime_widget)
         anime_scroll = QScrollArea()
         anime_scroll.setWidgetResizable(True)
         anime_scroll.setWidget(anime_widget)
@@ -146,21 +173,8 @@ class MainWindow(QMainWindow):
         self.tabs.addTab(anime_scroll, "Anime")
         self.content_items[0] = []
         
-        anime_list = self.anilist_mgr.get_watching_list()
-        row, col = 0, 0
-        for anime in anime_list:
-            next_ep = anime['progress'] + 1
-            card = self.create_content_card(anime['title'], f"Next: Ep {next_ep}")
-            # Store metadata on the card for playback/download
-            card.setProperty("url", anime.get('url')) 
-            card.setProperty("type", "anime")
-            card.setProperty("title", anime['title'])
-            card.setProperty("episode", next_ep)
-            
-            anime_layout.addWidget(card, row, col)
-            self.content_items[0].append(card)
-            col += 1
-            if col >= 4: col=0; row+=1
+        # Served from the cache; never waits on the network
+        self.populate_anime_tab(self.anilist_mgr.get_watching_list())
             
         # Tab 1: YouTube
         yt_widget = QWidget()
@@ -189,6 +203,63 @@ class MainWindow(QMainWindow):
         # Highlight initial
         self.update_selection()
 
+    def populate_anime_tab(self, anime_list):
+        """(Re)build the anime cards, keeping downloads attached to their show."""
+        downloads = {self.content_items[0][i].property("title"): torrent_id
+                     for i, torrent_id in self.active_downloads.items()}
+        # Workers still searching report by title, so they find the new card
+        searching = {card.property("title"): card.findChild(QLabel, "subtitle").text()
+                     for card in self.content_items[0]
+                     if card.property("title") in self.download_workers}
+        for card in self.content_items[0]:
+            self.anime_layout.removeWidget(card)
+            card.deleteLater()
+        self.content_items[0] = []
+        self.active_downloads = {}
+        
+        row, col = 0, 0
+        for anime in anime_list:
+            next_ep = anime['progress'] + 1
+            card = self.create_content_card(anime['title'], f"Next: Ep {next_ep}")
+            # Store metadata on the card for playback/download
+            card.setProperty("anilist_id", anime.get('id'))
+            card.setProperty("url", anime.get('url')) 
+            card.setProperty("type", "anime")
+            card.setProperty("title", anime['title'])
+            card.setProperty("episode", next_ep)
+            
+            if anime['title'] in downloads:
+                self.active_downloads[len(self.content_items[0])] = downloads[anime['title']]
+                self.update_card_status(card, "Downloading...")
+            elif anime['title'] in searching:
+                self.update_card_status(card, searching[anime['title']])
+            self.anime_layout.addWidget(card, row, col)
+            self.content_items[0].append(card)
+            col += 1
+            if col >= 4: col=0; row+=1
+
+    @pyqtSlot(list, list)
+    def handle_anime_list_changed(self, anime_list, changed):
+        """Apply a revalidated AniList list to the anime grid."""
+        cards = self.content_items[0]
+        card_ids = [card.property("anilist_id") for card in cards]
+        if card_ids != [anime.get('id') for anime in anime_list]:
+            # Shows added, removed or reordered: rebuild the grid
+            self.populate_anime_tab(anime_list)
+        else:
+            # Same shows: only update the cards whose entry changed
+            by_id = {card.property("anilist_id"): (i, card) for i, card in enumerate(cards)}
+            for anime in changed:
+                index, card = by_id[anime.get('id')]
+                next_ep = anime['progress'] + 1
+                card.setProperty("url", anime.get('url'))
+                card.setProperty("episode", next_ep)
+                if (index not in self.active_downloads
+                        and anime['title'] not in self.download_workers):
+                    self.update_card_status(card, f"Next: Ep {next_ep}")
+        if self.current_tab_index == 0:
+            self.update_selection()
+
     def create_content_card(self, title, subtitle):
         frame = QFrame()
         frame.setFixedSize(200, 250)
@@ -227,22 +298,42 @@ class MainWindow(QMainWindow):
             else:
                 item.setStyleSheet("background-color: #2d2d2d; border-radius: 10px; border: none;")
 
+    def find_anime_card(self, title):
+        """Return the index of the anime card for ``title``, or None."""
+        for i, card in enumerate(self.content_items.get(0, [])):
+            if card.property("title") == title:
+                return i
+        return None
+
     def start_download(self, card_index):
         card = self.content_items[0][card_index]
         title = card.property("title")
         episode = card.property("episode")
+        if title in self.download_workers:
+            print(f"⚠️ Already searching for {title}.")
+            return
         
         # Update UI
         self.update_card_status(card, "Searching...")
         
-        # Start Worker
+        # Start Worker; it reports by title since the grid may be rebuilt
+        # (and card indexes change) while it runs
         worker = DownloadWorker(self.nyaa_mgr, self.deluge_mgr, title, episode)
-        worker.finished.connect(lambda status, msg: self.handle_download_update(card_index, status, msg))
-        # Keep reference to avoid GC
-        card.worker = worker 
+        worker.finished.connect(lambda status, msg: self.handle_download_update(title, status, msg))
+        # Keep reference to avoid GC (the card may be deleted meanwhile)
+        self.download_workers[title] = worker
         worker.start()
 
-    def handle_download_update(self, card_index, status, msg):
+    def handle_download_update(self, title, status, msg):
+        if status in ("started", "error"):
+            # Last report: run() returns right after emitting it
+            worker = self.download_workers.pop(title, None)
+            if worker is not None:
+                worker.wait()
+        card_index = self.find_anime_card(title)
+        if card_index is None:
+            print(f"⚠️ {title} left the list during its download ({status}: {msg})")
+            return
         card = self.content_items[0][card_index]
         if status == "started":
             torrent_id = msg
@@ -416,6 +507,10 @@ class MainWindow(QMainWindow):
                 self.open_player()
             
     def closeEvent(self, event):
+        self.anilist_timer.stop()
+        self.anilist_mgr.wait(2000)
+        for worker in self.download_workers.values():
+            worker.wait(2000)
         self.vision_worker.stop()
         self.player_widget.close()
         event.accept()
@@ -0,0 +1,113 @@
+"""Registry of action types.
+
+Each action ``type`` is implemented by a plugin module exposing
+``run(params, context)``. Modules are only imported the first time an
+action of their type runs, so a mode that never clicks images never
+loads pyautogui, and one that never sends keys never loads pynput.
+
+Projects can add their own types without touching perform_action::
+
+    register_action_type("notify", "my_plugins.notify",
+                         schema={"text": (str_validator, None)})
+
+The schema is merged into ``config_loader.ACTION_SCHEMAS`` right away so
+mode files using the new type validate before the module is loaded.
+"""
+import importlib
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# Action type -> plugin module. None marks types the controller handles
+# itself (they only carry data such as next_mode).
+_MODULES: Dict[str, Optional[str]] = {
+    "open_url": "utils.action_types.open_url",
+    "keyboard": "utils.action_types.keyboard",
+    "mouse_click": "utils.action_types.mouse_click",
+    "bookmarklet": "utils.action_types.bookmarklet",
+    "image_click": "utils.action_types.image_click",
+    "image_sequence": "utils.action_types.image_sequence",
+    "navigate": "utils.action_types.navigate",
+    "macro": "utils.action_types.macro",
+    "wait_for_window": "utils.action_types.wait_for_window",
+    "select": None,
+    "next_episode": None,
+    "switch_mode": None,
+}
+
+_handlers: Dict[str, Callable] = {}
+_lock = threading.Lock()
+
+
+class ActionContext:
+    """What an action's ``run`` gets besides its params."""
+
+    __slots__ = ("overlay", "anime_selector", "cancel")
+
+    def __init__(self, overlay=None, anime_selector=None, cancel: Optional[threading.Event] = None):
+        """
+        Args:
+            overlay: Optional OverlayWindow to update
+            anime_selector: Optional AnimeSelector for navigation actions
+            cancel: Optional threading.Event set when the action should stop
+        """
+        self.overlay = overlay
+        self.anime_selector = anime_selector
+        self.cancel = cancel
+
+    @property
+    def cancelled(self) -> bool:
+        return self.cancel is not None and self.cancel.is_set()
+
+    def wait(self, seconds: float) -> bool:
+        """Sleep for ``seconds``; return True if the action was cancelled meanwhile.
+
+        Waits go through the input backend, so a recording backend with
+        a virtual clock skips them.
+        """
+        from ..input_backend import get_input
+        return get_input().wait(seconds, self.cancel)
+
+
+def register_action_type(name: str, module: Optional[str],
+                         schema: Optional[Dict[str, Tuple[Callable, Any]]] = None) -> None:
+    """Register (or replace) the plugin module implementing an action type.
+
+    Args:
+        name: Value of the action's "type" field
+        module: Dotted module path exposing ``run(params, context)``, or
+            None for a type without behaviour of its own
+        schema: ``{field: (validator, default)}`` of the type's own fields.
+            Required for new types; omit it to keep an existing schema.
+    """
+    from ..config_loader import ACTION_SCHEMAS
+    if schema is not None:
+        ACTION_SCHEMAS[name] = dict(schema)
+    elif name not in ACTION_SCHEMAS:
+        raise ValueError(f"action type {name!r} needs a schema")
+    with _lock:
+        _MODULES[name] = module
+        _handlers.pop(name, None)
+
+
+def get_handler(a_type: str) -> Optional[Callable]:
+    """Return the ``run`` function of an action type, importing it on first use.
+
+    Raises:
+        KeyError: If no plugin is registered for ``a_type``
+    """
+    handler = _handlers.get(a_type)
+    if handler is not None:
+        return handler
+    with _lock:
+        module = _MODULES[a_type]
+        if module is None:
+            return None
+        handler = _handlers.get(a_type)
+        if handler is None:
+            handler = _handlers[a_type] = importlib.import_module(module).run
+    return handler
+
+
+def loaded_types() -> Tuple[str, ...]:
+    """Action types whose plugin module has been imported so far."""
+    return tuple(_handlers)
@@ -0,0 +1,6 @@
+"""bookmarklet: run a browser bookmarklet by name."""
+from input_simulator import trigger_bookmarklet
+
+
+def run(params, context):
+    trigger_bookmarklet(params["name"], context.cancel)
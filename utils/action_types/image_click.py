@@ -0,0 +1,7 @@
+"""image_click: find an image on screen and click it."""
+from input_simulator import click_image
+
+
+def run(params, context):
+    click_image(params["image_path"], params["confidence"], params["timeout"], context.cancel,
+                params["region"])
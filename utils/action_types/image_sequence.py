@@ -0,0 +1,6 @@
+"""image_sequence: click a series of on-screen images."""
+from input_simulator import click_image_sequence
+
+
+def run(params, context):
+    click_image_sequence(params["sequence"], params["timeout"], context.cancel)
@@ -0,0 +1,6 @@
+"""keyboard: press a key combination."""
+from input_simulator import press_keys
+
+
+def run(params, context):
+    press_keys(params["keys"])
@@ -0,0 +1,20 @@
+"""macro: replay recorded or hand-written input steps (see utils.macros)."""
+from input_simulator import run_macro
+from ..macros import compile_macro
+
+# id(steps) -> (steps, macro). Compiled Actions are immutable and shared,
+# so their steps compile once; keeping steps alive keeps the ids unique.
+_compiled = {}
+
+
+def _macro(steps):
+    entry = _compiled.get(id(steps))
+    if entry is None:
+        if len(_compiled) >= 64:
+            _compiled.clear()  # old config reloads
+        entry = _compiled[id(steps)] = (steps, compile_macro(steps))
+    return entry[1]
+
+
+def run(params, context):
+    run_macro(_macro(params["steps"]), context.cancel)
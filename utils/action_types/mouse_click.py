@@ -0,0 +1,6 @@
+"""mouse_click: click at a fixed screen position."""
+from input_simulator import mouse_click
+
+
+def run(params, context):
+    mouse_click(*params["position"])
@@ -0,0 +1,10 @@
+"""navigate: move the anime selection up or down."""
+
+
+def run(params, context):
+    selector = context.anime_selector
+    if selector and hasattr(selector, 'move_selection'):
+        direction = 1 if params["direction"] == "down" else -1
+        selector.move_selection(direction)
+        if context.overlay and hasattr(context.overlay, 'update_selection'):
+            context.overlay.update_selection(selector.selected_index)
@@ -0,0 +1,21 @@
+"""open_url: open a URL in the browser and optionally move its window."""
+from windows_mover import move_window_to_display
+from ..input_backend import get_input
+from ..window_service import get_window_service
+
+
+def run(params, context):
+    service = get_window_service()
+    before = service.windows() if service is not None else None
+    get_input().open_url(params["url"])
+    if service is None:
+        if context.wait(1):
+            return
+    else:
+        # Continue once the browser shows a new window or a new title
+        service.wait_for_window(params["window_title"], timeout=params["window_timeout"],
+                                since=before, cancel=context.cancel)
+        if context.cancelled:
+            return
+    if params["move_to_display"] is not None:
+        move_window_to_display(params["window_title"], params["move_to_display"])
@@ -0,0 +1,12 @@
+"""wait_for_window: pause until a window with a given title or class shows up."""
+from ..window_service import get_window_service
+
+
+def run(params, context):
+    service = get_window_service()
+    if service is None:
+        context.wait(params["timeout"])
+    elif service.wait_for_window(params["title"], params["wm_class"], params["timeout"],
+                                 cancel=context.cancel) is None:
+        print(f"⚠️ No window matching {params['title'] or params['wm_class']!r} "
+              f"within {params['timeout']:g}s")
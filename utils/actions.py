@@ -1,6 +1,5 @@
-import time, webbrowser
-from input_simulator import press_keys, mouse_click
-from windows_mover import move_window_to_display
+from utils.config_loader import Action
+from utils.action_types import ActionContext, get_handler
 
 def focus_window(window_title):
     """Focus a window by title."""
@@ -31,56 +30,38 @@ def focus_window(window_title):
         print(f"Error focusing window: {e}")
         return False
 
-def perform_action(action, overlay=None, anime_selector=None):
+def perform_action(action, overlay=None, anime_selector=None, cancel=None):
+    """Execute an action and return the mode it switches to, if any.
+
+    The action's type is looked up in the action type registry (see
+    utils.action_types), which imports its plugin on first use.
+    
+    Args:
+        action: A compiled Action, or a raw action dict from a mode file
+            (validated and normalized on the way in)
+        overlay: Optional OverlayWindow to update
+        anime_selector: Optional AnimeSelector for navigation actions
+        cancel: Optional threading.Event; once set, the action stops at
+            its next wait and returns None
+    """
+    if not isinstance(action, Action):
+        action = Action.from_dict(action)
+    context = ActionContext(overlay, anime_selector, cancel)
+
     # Focus window if requested
-    if "focus_window" in action:
-        focus_window(action["focus_window"])
-        time.sleep(0.2)  # Wait for focus
+    if action.focus_window:
+        focus_window(action.focus_window)
+        if context.wait(0.2):  # Wait for focus
+            return None
 
-    a_type = action.get("type")
-    if a_type == "open_url":
-        webbrowser.open(action["url"])
-        time.sleep(1)
-        if "move_to_display" in action:
-            move_window_to_display("Firefox", action["move_to_display"])
-    elif a_type == "keyboard":
-        keys = action.get("keys", [])
-        press_keys(keys)
-    elif a_type == "mouse_click":
-        mouse_click(*action["position"])
-    elif a_type == "bookmarklet":
-        from input_simulator import trigger_bookmarklet
-        trigger_bookmarklet(action["name"])
-    elif a_type == "image_click":
-        from input_simulator import click_image
-        image_path = action.get("image_path")
-        confidence = action.get("confidence", 0.8)
-        timeout = action.get("timeout", 5)
-        click_image(image_path, confidence, timeout)
-    elif a_type == "image_sequence":
-        from input_simulator import click_image
-        sequence = action.get("sequence", [])
-        for step in sequence:
-            image_path = step.get("image_path")
-            confidence = step.get("confidence", 0.8)
-            timeout = step.get("timeout", 5)
-            wait_after = step.get("wait_after", 0.5)
-            
-            if click_image(image_path, confidence, timeout):
-                time.sleep(wait_after)
-            else:
-                print(f"⚠️ Sequence interrupted. Could not find: {image_path}")
-                break
-    elif a_type == "navigate":
-        if anime_selector and hasattr(anime_selector, 'move_selection'):
-            direction = 1 if action.get("direction") == "down" else -1
-            anime_selector.move_selection(direction)
-            if overlay and hasattr(overlay, 'update_selection'):
-                overlay.update_selection(anime_selector.selected_index)
+    handler = get_handler(action.type)
+    if handler is not None:
+        handler(action.params, context)
+    if context.cancelled:
+        return None
     # Handle mode switching if specified in the action
-    if "next_mode" in action:
+    if action.next_mode:
         if overlay:
-            overlay.update_mode(action["next_mode"])
-        return action["next_mode"]
+            overlay.update_mode(action.next_mode)
+        return action.next_mode
     return None
-
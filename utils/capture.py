@@ -0,0 +1,268 @@
+"""Screen capture backends for the image-based actions.
+
+``pyautogui.screenshot`` grabs the whole display through a helper
+process on Linux (scrot/gnome-screenshot) or PIL, which costs tens to
+hundreds of milliseconds per poll. The backends here keep one
+connection to the display open and grab only the requested region:
+
+* ``mss``       - the ``mss`` package (XGetImage/BitBlt/CoreGraphics)
+* ``xlib``      - python-xlib ``get_image`` on the root window (Linux)
+* ``pyautogui`` - fallback that works wherever pyautogui does
+* ``FileCapture`` - serves an image from disk, for tests and benchmarks
+
+Every backend returns a grayscale ``Screenshot`` ready for
+``utils.template_match``, together with the screen position of its
+top-left corner so matches can be mapped back to click coordinates.
+"""
+import os
+import platform
+import threading
+from typing import Callable, Dict, Iterable, NamedTuple, Optional, Sequence, Tuple, Union
+
+import cv2
+import numpy as np
+
+from .template_match import to_gray
+
+# [x, y, width, height] in screen pixels, like the detector's roi
+Region = Sequence[int]
+
+
+class Screenshot(NamedTuple):
+    """A grayscale grab of (part of) the screen."""
+    image: np.ndarray
+    left: int
+    top: int
+
+    @property
+    def offset(self) -> Tuple[int, int]:
+        return self.left, self.top
+
+    def crop(self, region: Optional[Region]) -> "Screenshot":
+        """Return the part of this grab inside ``region`` (a view, no copy)."""
+        if region is None:
+            return self
+        x, y, w, h = region
+        h_img, w_img = self.image.shape[:2]
+        x0 = min(max(0, x - self.left), w_img)
+        y0 = min(max(0, y - self.top), h_img)
+        x1 = min(max(0, x + w - self.left), w_img)
+        y1 = min(max(0, y + h - self.top), h_img)
+        return Screenshot(self.image[y0:y1, x0:x1], self.left + x0, self.top + y0)
+
+
+def union(regions: Iterable[Optional[Region]]) -> Optional[Tuple[int, int, int, int]]:
+    """Bounding box of several regions; None (full screen) if any is None."""
+    x0 = y0 = x1 = y1 = None
+    for region in regions:
+        if region is None:
+            return None
+        x, y, w, h = region
+        x0 = x if x0 is None else min(x0, x)
+        y0 = y if y0 is None else min(y0, y)
+        x1 = x + w if x1 is None else max(x1, x + w)
+        y1 = y + h if y1 is None else max(y1, y + h)
+    if x0 is None:
+        return None
+    return x0, y0, x1 - x0, y1 - y0
+
+
+class CaptureBackend:
+    """Base class of the capture backends.
+
+    Subclasses implement ``_grab``. Display connections are not safe to
+    share between threads, so backends keep them per thread in
+    ``self._local`` and open them on first use.
+    """
+
+    name = "base"
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def grab(self, region: Optional[Region] = None) -> Screenshot:
+        """Capture ``region`` ([x, y, width, height]) or the whole screen."""
+        if region is not None and (region[2] <= 0 or region[3] <= 0):
+            raise ValueError(f"Empty capture region: {list(region)}")
+        return self._grab(region)
+
+    def _grab(self, region: Optional[Region]) -> Screenshot:
+        raise NotImplementedError
+
+
+class MssCapture(CaptureBackend):
+    """Capture through the ``mss`` package."""
+
+    name = "mss"
+
+    def __init__(self):
+        super().__init__()
+        import mss  # noqa: F401 - fail at construction if missing
+
+    def _grab(self, region: Optional[Region]) -> Screenshot:
+        sct = getattr(self._local, "sct", None)
+        if sct is None:
+            import mss
+            sct = self._local.sct = mss.mss()
+        if region is None:
+            monitor = sct.monitors[0]  # bounding box of all monitors
+        else:
+            x, y, w, h = region
+            monitor = {"left": x, "top": y, "width": w, "height": h}
+        shot = sct.grab(monitor)
+        return Screenshot(to_gray(np.asarray(shot)), monitor["left"], monitor["top"])
+
+
+class XlibCapture(CaptureBackend):
+    """Capture the X root window through python-xlib."""
+
+    name = "xlib"
+
+    def __init__(self):
+        super().__init__()
+        self._display()  # fail at construction if there is no X server
+
+    def _display(self):
+        disp = getattr(self._local, "display", None)
+        if disp is None:
+            from Xlib import display
+            disp = self._local.display = display.Display()
+        return disp
+
+    def _grab(self, region: Optional[Region]) -> Screenshot:
+        from Xlib import X
+        root = self._display().screen().root
+        if region is None:
+            geometry = root.get_geometry()
+            x, y, w, h = 0, 0, geometry.width, geometry.height
+        else:
+            x, y, w, h = region
+        raw = root.get_image(x, y, w, h, X.ZPixmap, 0xffffffff)
+        # 24/32-bit visuals arrive as BGRX, one 4-byte pixel per column
+        image = np.frombuffer(raw.data, dtype=np.uint8).reshape(h, w, 4)
+        return Screenshot(to_gray(image), x, y)
+
+
+class PyAutoGuiCapture(CaptureBackend):
+    """Capture through ``pyautogui.screenshot`` (slow, but portable)."""
+
+    name = "pyautogui"
+
+    def _grab(self, region: Optional[Region]) -> Screenshot:
+        import pyautogui
+        image = pyautogui.screenshot(region=tuple(region) if region is not None else None)
+        x, y = (region[0], region[1]) if region is not None else (0, 0)
+        return Screenshot(to_gray(np.asarray(image), rgb=True), x, y)
+
+
+class FileCapture(CaptureBackend):
+    """Serve an image file as the screen, for tests and benchmarks.
+
+    The file is re-read when it changes, so a test can swap what is "on
+    screen" by writing a new image to the same path, or by calling
+    ``set_image``.
+    """
+
+    name = "file"
+
+    def __init__(self, path: Union[str, os.PathLike, None] = None,
+                 image: Optional[np.ndarray] = None):
+        """
+        Args:
+            path: Image file to serve
+            image: Image array to serve instead (BGR or grayscale)
+        """
+        super().__init__()
+        self.path = path
+        self._mtime = None
+        self._screen: Optional[np.ndarray] = None
+        if image is not None:
+            self.set_image(image)
+        self.grabs = 0
+
+    def set_image(self, image: np.ndarray) -> None:
+        """Serve an in-memory image (BGR or grayscale) from now on."""
+        self.path = None
+        self._screen = to_gray(image)
+
+    def _load(self) -> np.ndarray:
+        if self.path is not None:
+            mtime = os.path.getmtime(self.path)
+            if mtime != self._mtime:
+                image = cv2.imread(str(self.path), cv2.IMREAD_GRAYSCALE)
+                if image is None:
+                    raise FileNotFoundError(f"Could not read screen image: {self.path}")
+                self._screen, self._mtime = image, mtime
+        if self._screen is None:
+            raise RuntimeError("FileCapture has no image to serve")
+        return self._screen
+
+    def _grab(self, region: Optional[Region]) -> Screenshot:
+        self.grabs += 1
+        return Screenshot(self._load(), 0, 0).crop(region)
+
+
+BACKENDS: Dict[str, Callable[[], CaptureBackend]] = {
+    "mss": MssCapture,
+    "xlib": XlibCapture,
+    "pyautogui": PyAutoGuiCapture,
+}
+
+CAPTURE_BACKEND_NAMES = ("auto",) + tuple(BACKENDS)
+
+
+def create_backend(name: str = "auto") -> CaptureBackend:
+    """Create a capture backend by name.
+
+    ``"auto"`` picks the fastest one that works here: mss, then Xlib on
+    Linux, then pyautogui.
+
+    Raises:
+        ValueError: If ``name`` is unknown
+        ImportError/Exception: If an explicitly requested backend can't start
+    """
+    if name != "auto":
+        if name not in BACKENDS:
+            raise ValueError(f"Unknown capture backend {name!r} (known: {', '.join(CAPTURE_BACKEND_NAMES)})")
+        return BACKENDS[name]()
+    candidates = ["mss"]
+    if platform.system() == "Linux":
+        candidates.append("xlib")
+    for candidate in candidates:
+        try:
+            return BACKENDS[candidate]()
+        except Exception:
+            continue
+    return PyAutoGuiCapture()
+
+
+_backend: Optional[CaptureBackend] = None
+_backend_lock = threading.Lock()
+
+
+def get_capture() -> CaptureBackend:
+    """Return the shared capture backend, creating the default one on first use."""
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = create_backend()
+            print(f"📷 Screen capture backend: {_backend.name}")
+        return _backend
+
+
+def set_capture(backend: Union[str, CaptureBackend]) -> CaptureBackend:
+    """Replace the shared capture backend.
+
+    Args:
+        backend: A backend instance (e.g. a FileCapture in tests) or a
+            name from CAPTURE_BACKEND_NAMES
+
+    Returns:
+        The backend now in use
+    """
+    global _backend
+    if isinstance(backend, str):
+        backend = create_backend(backend)
+    with _backend_lock:
+        _backend = backend
+    return backend
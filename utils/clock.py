@@ -0,0 +1,44 @@
+"""Clocks for the gesture and debounce logic.
+
+Anything that measures holds, sequence windows or cooldowns takes a
+``clock`` argument: a zero-argument callable returning seconds, such as
+``time.monotonic`` (the default everywhere). Tests and the gesture
+harness pass a ``VirtualClock`` instead, so scripted input runs as fast
+as the CPU allows and gives the same result on every run.
+"""
+from typing import Callable
+
+Clock = Callable[[], float]
+
+
+class VirtualClock:
+    """Manually advanced clock for deterministic runs.
+
+    Example:
+        clock = VirtualClock()
+        sim = ColorSimulator(mode_table, clock=clock)
+        sim.record_color("yellow")
+        clock.advance(0.4)
+        sim.record_color("red")
+    """
+
+    __slots__ = ("now",)
+
+    def __init__(self, start: float = 0.0):
+        self.now = float(start)
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> float:
+        """Move the clock forward and return the new time."""
+        if seconds < 0:
+            raise ValueError(f"Cannot move a clock backwards ({seconds}s)")
+        self.now += seconds
+        return self.now
+
+    def set(self, now: float) -> None:
+        """Jump to an absolute time, which must not be in the past."""
+        if now < self.now:
+            raise ValueError(f"Cannot move a clock backwards ({now} < {self.now})")
+        self.now = float(now)
@@ -1,14 +1,593 @@
 import json
 import os
-from typing import Dict, Any, Optional, List
+from types import MappingProxyType
+from typing import Dict, Any, Optional, List, Mapping, Tuple, Callable, Set
 from pathlib import Path
 
+from .sequences import SequenceAutomaton
+
+CALIBRATION_PATH = Path("calibration/results.json")
+
 
 class ConfigError(Exception):
     """Base exception for configuration errors."""
     pass
 
 
+class ConfigValidationError(ConfigError):
+    """A configuration value failed schema validation.
+    
+    Attributes:
+        location: Where the offending value lives, e.g.
+            ``modes/video.json: actions.red.keys[1]``
+    """
+
+    def __init__(self, location: str, message: str):
+        super().__init__(f"{location}: {message}")
+        self.location = location
+
+
+_REQUIRED = object()
+
+
+def _child(loc: str, field: str) -> str:
+    """Return the location of ``field`` inside the value at ``loc``."""
+    return f"{loc} {field}" if loc.endswith(":") else f"{loc}.{field}"
+
+
+def _string(value: Any, loc: str) -> str:
+    if not isinstance(value, str) or not value.strip():
+        raise ConfigValidationError(loc, f"expected a non-empty string, got {value!r}")
+    return value.strip()
+
+
+def _int(value: Any, loc: str) -> int:
+    if isinstance(value, bool) or not isinstance(value, int):
+        raise ConfigValidationError(loc, f"expected an integer, got {value!r}")
+    return value
+
+
+def _number(value: Any, loc: str) -> float:
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or value < 0:
+        raise ConfigValidationError(loc, f"expected a non-negative number, got {value!r}")
+    return float(value)
+
+
+def _positive(value: Any, loc: str) -> float:
+    value = _number(value, loc)
+    if value == 0:
+        raise ConfigValidationError(loc, "expected a positive number, got 0")
+    return value
+
+
+def _boolean(value: Any, loc: str) -> bool:
+    if not isinstance(value, bool):
+        raise ConfigValidationError(loc, f"expected true or false, got {value!r}")
+    return value
+
+
+def _confidence(value: Any, loc: str) -> float:
+    value = _number(value, loc)
+    if value > 1:
+        raise ConfigValidationError(loc, f"expected a value between 0 and 1, got {value!r}")
+    return value
+
+
+def _int_list(length: int, low: int = None, high: int = None):
+    def validate(value: Any, loc: str) -> Tuple[int, ...]:
+        if not isinstance(value, list) or len(value) != length:
+            raise ConfigValidationError(loc, f"expected a list of {length} integers, got {value!r}")
+        items = tuple(_int(v, f"{loc}[{i}]") for i, v in enumerate(value))
+        if low is not None and high is not None:
+            expected = f"{low}..{high}"
+        else:
+            expected = f">= {low}" if low is not None else f"<= {high}"
+        for i, v in enumerate(items):
+            if (low is not None and v < low) or (high is not None and v > high):
+                raise ConfigValidationError(f"{loc}[{i}]", f"expected {expected}, got {v}")
+        return items
+    return validate
+
+
+_region_ints = _int_list(4, 0)
+
+
+def _region(value: Any, loc: str) -> Tuple[int, ...]:
+    # [x, y, width, height]; an empty area can never be captured
+    region = _region_ints(value, loc)
+    for i, name in ((2, "width"), (3, "height")):
+        if region[i] < 1:
+            raise ConfigValidationError(f"{loc}[{i}]", f"expected a {name} >= 1, got {region[i]}")
+    return region
+
+
+def _keys(value: Any, loc: str) -> Tuple[str, ...]:
+    if not isinstance(value, list) or not value:
+        raise ConfigValidationError(loc, f"expected a non-empty list of key names, got {value!r}")
+    return tuple(_string(k, f"{loc}[{i}]") for i, k in enumerate(value))
+
+
+def _direction(value: Any, loc: str) -> str:
+    if value not in ("up", "down"):
+        raise ConfigValidationError(loc, f"expected 'up' or 'down', got {value!r}")
+    return value
+
+
+def _one_of(*options: str):
+    def validate(value: Any, loc: str) -> str:
+        if value not in options:
+            expected = ", ".join(repr(o) for o in options)
+            raise ConfigValidationError(loc, f"expected one of {expected}, got {value!r}")
+        return value
+    return validate
+
+
+def _macro_steps(value: Any, loc: str) -> Any:
+    if not isinstance(value, list) or not value:
+        raise ConfigValidationError(loc, f"expected a non-empty list of macro steps, got {value!r}")
+    # Import here to avoid circular dependency
+    from .macros import MacroError, compile_macro
+    try:
+        compile_macro(value)
+    except (MacroError, TypeError, ValueError) as e:
+        raise ConfigValidationError(loc, str(e))
+    return value
+
+
+def _image_steps(value: Any, loc: str) -> Tuple[Mapping[str, Any], ...]:
+    if not isinstance(value, list) or not value:
+        raise ConfigValidationError(loc, f"expected a non-empty list of steps, got {value!r}")
+    return tuple(
+        MappingProxyType(_check_fields(step, _IMAGE_STEP_FIELDS, f"{loc}[{i}]"))
+        for i, step in enumerate(value)
+    )
+
+
+def _check_fields(data: Any, schema: Mapping[str, Tuple[Callable, Any]],
+                  loc: str) -> Dict[str, Any]:
+    """Validate a JSON object against ``{field: (validator, default)}``.
+    
+    Unknown fields are rejected, missing optional fields get their
+    default and every value is normalized by its validator.
+    """
+    if not isinstance(data, dict):
+        raise ConfigValidationError(loc, f"expected an object, got {type(data).__name__}")
+    for field in data:
+        if field not in schema:
+            allowed = ", ".join(sorted(schema))
+            raise ConfigValidationError(
+                _child(loc, field), f"unknown field (allowed: {allowed})")
+    result = {}
+    for field, (validate, default) in schema.items():
+        if field in data:
+            result[field] = validate(data[field], _child(loc, field))
+        elif default is _REQUIRED:
+            raise ConfigValidationError(_child(loc, field), "missing required field")
+        else:
+            result[field] = default
+    return result
+
+
+_IMAGE_STEP_FIELDS = {
+    "image_path": (_string, _REQUIRED),
+    "confidence": (_confidence, 0.8),
+    "timeout": (_number, 5.0),
+    "wait_after": (_number, 0.5),
+    "region": (_region, None),
+}
+
+_COMMON_ACTION_FIELDS = {
+    "type": (_string, _REQUIRED),
+    "hold_time": (_number, 0.0),
+    "next_mode": (_string, None),
+    "focus_window": (_string, None),
+    "description": (_string, None),
+}
+
+# Type-specific fields of every action type, after normalization
+ACTION_SCHEMAS: Dict[str, Dict[str, Tuple[Callable, Any]]] = {
+    "open_url": {
+        "url": (_string, _REQUIRED),
+        "move_to_display": (_int, None),
+        "window_title": (_string, "Firefox"),  # browser window to wait for
+        "window_timeout": (_positive, 5.0),
+    },
+    "keyboard": {"keys": (_keys, _REQUIRED)},
+    "mouse_click": {"position": (_int_list(2), _REQUIRED)},
+    "bookmarklet": {"name": (_string, _REQUIRED)},
+    "image_click": {
+        "image_path": (_string, _REQUIRED),
+        "confidence": (_confidence, 0.8),
+        "timeout": (_number, 5.0),
+        "region": (_region, None),  # [x, y, width, height] to search
+    },
+    "image_sequence": {
+        "sequence": (_image_steps, _REQUIRED),
+        "timeout": (_number, None),  # default: sum of the step timeouts
+    },
+    "navigate": {"direction": (_direction, _REQUIRED)},
+    "select": {},
+    "next_episode": {"bookmarklet_name": (_string, "next episode")},
+    "switch_mode": {},
+    "macro": {"steps": (_macro_steps, _REQUIRED)},
+    "wait_for_window": {
+        "title": (_string, None),
+        "wm_class": (_string, None),
+        "timeout": (_positive, 5.0),
+    },
+}
+
+_SEQUENCE_FIELDS = {
+    "pattern": (_keys, _REQUIRED),
+    "time_window": (_positive, 2.0),
+    "action": (lambda v, loc: v, _REQUIRED),
+}
+
+GESTURE_KINDS = ("tap", "double_tap", "long_press", "chord")
+
+
+def _gesture_kind(value: Any, loc: str) -> str:
+    if value not in GESTURE_KINDS:
+        raise ConfigValidationError(loc, f"expected one of {', '.join(GESTURE_KINDS)}, got {value!r}")
+    return value
+
+
+_GESTURE_FIELDS = {
+    "gesture": (_gesture_kind, _REQUIRED),
+    "color": (_string, None),
+    "colors": (_keys, None),
+    "max_tap": (_positive, 0.35),
+    "min_hold": (_positive, 1.0),
+    "window": (_positive, 0.4),
+    "action": (lambda v, loc: v, _REQUIRED),
+}
+
+_MODE_FIELDS = {
+    "mode_name": (_string, None),
+    "description": (_string, None),
+    "actions": (lambda v, loc: v, {}),
+    "sequences": (lambda v, loc: v, []),
+    "gestures": (lambda v, loc: v, []),
+}
+
+_HSV = _int_list(3, 0, 255)
+
+_COLOR_FIELDS = {"lower": (_HSV, _REQUIRED), "upper": (_HSV, _REQUIRED)}
+
+_GLOBAL_FIELDS = {
+    "youtube_playlist_url": (_string, None),
+    "use_calibrated": (_boolean, False),
+    "roi": (_int_list(4, 0), None),
+    "fps": (_positive, None),
+    "capture_backend": (_one_of("auto", "mss", "xlib", "pyautogui"), None),
+}
+
+
+def normalize_action(data: Any, loc: str) -> Dict[str, Any]:
+    """Validate an action and rewrite it into its canonical form.
+    
+    Accepted shorthands:
+    
+    * ``"key": "shift+n"`` on keyboard actions becomes ``"keys": ["shift", "n"]``
+    * ``bookmarklet_sequence`` with ``bookmarklet_name`` becomes a
+      ``bookmarklet`` action with ``name``
+    * an action without ``type`` that only sets ``next_mode`` becomes
+      ``switch_mode``
+    
+    Args:
+        data: Raw action object from a mode file
+        loc: Location used in error messages
+        
+    Returns:
+        Flat dict holding every common and type-specific field
+        
+    Raises:
+        ConfigValidationError: If the action is invalid
+    """
+    if not isinstance(data, dict):
+        raise ConfigValidationError(loc, f"expected an object, got {type(data).__name__}")
+    data = dict(data)
+    if "type" not in data and "next_mode" in data:
+        data["type"] = "switch_mode"
+    a_type = data.get("type")
+    if a_type == "keyboard" and "key" in data:
+        if "keys" in data:
+            raise ConfigValidationError(_child(loc, "key"), "use either 'key' or 'keys', not both")
+        key = _string(data.pop("key"), _child(loc, "key"))
+        data["keys"] = [k.strip() for k in key.split("+")]
+    elif a_type == "bookmarklet_sequence":
+        data["type"] = "bookmarklet"
+        if "bookmarklet_name" in data:
+            data["name"] = data.pop("bookmarklet_name")
+
+    if "type" not in data:
+        raise ConfigValidationError(_child(loc, "type"), "missing required field")
+    a_type = _string(data["type"], _child(loc, "type"))
+    if a_type not in ACTION_SCHEMAS:
+        known = ", ".join(sorted(ACTION_SCHEMAS))
+        raise ConfigValidationError(_child(loc, "type"), f"unknown action type {a_type!r} (known: {known})")
+    result = _check_fields(data, {**_COMMON_ACTION_FIELDS, **ACTION_SCHEMAS[a_type]}, loc)
+    if a_type == "wait_for_window" and result["title"] is None and result["wm_class"] is None:
+        raise ConfigValidationError(loc, "wait_for_window needs a 'title' or a 'wm_class'")
+    return result
+
+
+def normalize_color(data: Any, loc: str) -> Dict[str, Any]:
+    """Validate one color's HSV range (``hsv_lower``/``hsv_upper`` as
+    written by the calibration tool are accepted as aliases)."""
+    if isinstance(data, dict) and ("hsv_lower" in data or "hsv_upper" in data):
+        data = dict(data)
+        for alias, field in (("hsv_lower", "lower"), ("hsv_upper", "upper")):
+            if alias in data:
+                if field in data:
+                    raise ConfigValidationError(_child(loc, alias), f"duplicates '{field}'")
+                data[field] = data.pop(alias)
+    return _check_fields(data, _COLOR_FIELDS, loc)
+
+
+def normalize_global(data: Any, loc: str) -> Dict[str, Any]:
+    """Validate ``global.json``, dropping unset optional settings."""
+    result = _check_fields(data, _GLOBAL_FIELDS, loc)
+    return {k: v for k, v in result.items() if v is not None}
+
+
+def _freeze(value: Any) -> Any:
+    """Recursively convert JSON containers into read-only equivalents."""
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def _thaw(value: Any) -> Any:
+    """Inverse of ``_freeze`` for read-only mappings (used for pickling)."""
+    if isinstance(value, MappingProxyType):
+        return {k: _thaw(v) for k, v in value.items()}
+    if isinstance(value, tuple):
+        return tuple(_thaw(v) for v in value)
+    return value
+
+
+def _restore_frozen(cls: type, state: Dict[str, Any]) -> Any:
+    """Rebuild a ``_Frozen`` object from pickled slot values."""
+    obj = cls.__new__(cls)
+    for name, value in state.items():
+        object.__setattr__(obj, name, _freeze(value))
+    return obj
+
+
+class _Frozen:
+    """Mixin that rejects attribute assignment after construction."""
+
+    __slots__ = ()
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __reduce__(self):
+        # Restore slots directly so compiled state (e.g. automata) is
+        # not rebuilt when loading a config snapshot
+        state = {name: _thaw(getattr(self, name)) for name in self.__slots__}
+        return _restore_frozen, (type(self), state)
+
+
+class Action(_Frozen):
+    """A precompiled, immutable action bound to a color or sequence.
+
+    The fields every action type shares are attributes; type-specific
+    fields (``url``, ``keys``, ``position`` ...) live in ``params`` with
+    every default already filled in, so dispatch never needs fallbacks.
+    """
+
+    __slots__ = ("type", "hold_time", "next_mode", "focus_window", "description", "params")
+
+    def __init__(
+        self,
+        type: str,
+        hold_time: float = 0.0,
+        next_mode: Optional[str] = None,
+        focus_window: Optional[str] = None,
+        description: Optional[str] = None,
+        params: Optional[Mapping[str, Any]] = None,
+    ):
+        object.__setattr__(self, "type", type)
+        object.__setattr__(self, "hold_time", float(hold_time))
+        object.__setattr__(self, "next_mode", next_mode)
+        object.__setattr__(self, "focus_window", focus_window)
+        object.__setattr__(self, "description", description)
+        object.__setattr__(self, "params", _freeze(dict(params or {})))
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any], location: str = "action") -> "Action":
+        """Validate and compile a raw JSON action mapping.
+
+        Args:
+            data: Action mapping as found in a mode file
+            location: Location used in validation error messages
+
+        Returns:
+            The compiled Action
+
+        Raises:
+            ConfigValidationError: If the action is invalid
+        """
+        fields = normalize_action(data, location)
+        common = {k: fields.pop(k) for k in _COMMON_ACTION_FIELDS}
+        return cls(params=fields, **common)
+
+    def __repr__(self) -> str:
+        return f"Action(type={self.type!r}, next_mode={self.next_mode!r})"
+
+
+class Sequence(_Frozen):
+    """A compiled color sequence and the action it triggers."""
+
+    __slots__ = ("pattern", "time_window", "action")
+
+    def __init__(self, pattern: Tuple[str, ...], time_window: float, action: Action):
+        object.__setattr__(self, "pattern", tuple(pattern))
+        object.__setattr__(self, "time_window", float(time_window))
+        object.__setattr__(self, "action", action)
+
+    def __repr__(self) -> str:
+        return f"Sequence({'→'.join(self.pattern)}, {self.time_window}s)"
+
+
+class Gesture(_Frozen):
+    """A compiled tap, double-tap, long-press or chord gesture.
+
+    ``colors`` holds the single color of a tap, double-tap or long-press
+    and every color of a chord. ``max_tap`` is the longest press that
+    still counts as a tap, ``window`` the longest gap between the two
+    taps of a double-tap and ``min_hold`` the duration of a long-press.
+    """
+
+    __slots__ = ("kind", "colors", "max_tap", "min_hold", "window", "action")
+
+    def __init__(self, kind: str, colors: Tuple[str, ...], action: Action,
+                 max_tap: float = 0.35, min_hold: float = 1.0, window: float = 0.4):
+        object.__setattr__(self, "kind", kind)
+        object.__setattr__(self, "colors", tuple(colors))
+        object.__setattr__(self, "max_tap", float(max_tap))
+        object.__setattr__(self, "min_hold", float(min_hold))
+        object.__setattr__(self, "window", float(window))
+        object.__setattr__(self, "action", action)
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any], location: str = "gesture") -> "Gesture":
+        """Validate and compile a raw gesture declaration.
+
+        Args:
+            data: Gesture mapping from a mode's ``gestures`` list
+            location: Location used in validation error messages
+
+        Returns:
+            The compiled Gesture
+
+        Raises:
+            ConfigValidationError: If the gesture is invalid
+        """
+        fields = _check_fields(data, _GESTURE_FIELDS, location)
+        kind = fields["gesture"]
+        if kind == "chord":
+            if fields["color"] is not None:
+                raise ConfigValidationError(_child(location, "color"), "chords take 'colors'")
+            colors = fields["colors"]
+            if colors is None:
+                raise ConfigValidationError(_child(location, "colors"), "missing required field")
+            if len(set(colors)) != len(colors) or len(colors) < 2:
+                raise ConfigValidationError(_child(location, "colors"), "a chord needs at least two different colors")
+        else:
+            if fields["colors"] is not None:
+                raise ConfigValidationError(_child(location, "colors"), f"{kind} takes a single 'color'")
+            if fields["color"] is None:
+                raise ConfigValidationError(_child(location, "color"), "missing required field")
+            colors = (fields["color"],)
+        action = Action.from_dict(fields["action"], _child(location, "action"))
+        return cls(kind, colors, action, fields["max_tap"], fields["min_hold"], fields["window"])
+
+    def __repr__(self) -> str:
+        return f"Gesture({self.kind}, {'+'.join(self.colors)})"
+
+
+class ModeTable(_Frozen):
+    """Precompiled dispatch tables for one mode.
+
+    ``actions`` maps a color straight to its compiled Action,
+    ``automaton`` recognises the mode's color sequences and
+    ``gesture_index`` maps a color to the gestures it takes part in, so
+    nothing on the per-frame path touches the raw JSON.
+    """
+
+    __slots__ = ("name", "actions", "sequences", "automaton", "gestures", "gesture_index")
+
+    def __init__(self, name: str, actions: Mapping[str, Action],
+                 sequences: Tuple[Sequence, ...], gestures: Tuple[Gesture, ...] = ()):
+        object.__setattr__(self, "name", name)
+        object.__setattr__(self, "actions", MappingProxyType(dict(actions)))
+        object.__setattr__(self, "sequences", tuple(sequences))
+        object.__setattr__(self, "automaton", SequenceAutomaton(self.sequences))
+        object.__setattr__(self, "gestures", tuple(gestures))
+        index: Dict[str, List[Gesture]] = {}
+        for gesture in self.gestures:
+            for color in gesture.colors:
+                index.setdefault(color, []).append(gesture)
+        object.__setattr__(self, "gesture_index",
+                           MappingProxyType({c: tuple(g) for c, g in index.items()}))
+
+    @classmethod
+    def from_dict(cls, name: str, data: Mapping[str, Any],
+                  location: Optional[str] = None) -> "ModeTable":
+        """Validate and compile a raw mode configuration.
+
+        Args:
+            name: Name of the mode
+            data: Mode mapping as found in ``config/modes/<name>.json``
+            location: Location used in validation error messages
+
+        Returns:
+            The compiled ModeTable
+
+        Raises:
+            ConfigValidationError: If the mode is invalid
+        """
+        loc = location or f"modes/{name}.json:"
+        fields = _check_fields(data, _MODE_FIELDS, loc)
+        if not isinstance(fields["actions"], dict):
+            raise ConfigValidationError(_child(loc, "actions"), "expected an object mapping colors to actions")
+        if not isinstance(fields["sequences"], list):
+            raise ConfigValidationError(_child(loc, "sequences"), "expected a list")
+        if not isinstance(fields["gestures"], list):
+            raise ConfigValidationError(_child(loc, "gestures"), "expected a list")
+        actions = {color: Action.from_dict(action, _child(loc, f"actions.{color}"))
+                   for color, action in fields["actions"].items()}
+        sequences = []
+        for i, seq in enumerate(fields["sequences"]):
+            seq_loc = _child(loc, f"sequences[{i}]")
+            seq = _check_fields(seq, _SEQUENCE_FIELDS, seq_loc)
+            if len(seq["pattern"]) < 2:
+                raise ConfigValidationError(_child(seq_loc, "pattern"), "a sequence needs at least two colors")
+            for j in range(1, len(seq["pattern"])):
+                if seq["pattern"][j] == seq["pattern"][j - 1]:
+                    raise ConfigValidationError(
+                        _child(seq_loc, f"pattern[{j}]"),
+                        "repeats the previous color; sequences match color changes")
+            sequences.append(Sequence(seq["pattern"], seq["time_window"],
+                                      Action.from_dict(seq["action"], _child(seq_loc, "action"))))
+        gestures = []
+        declared = set()
+        for i, gesture in enumerate(fields["gestures"]):
+            gesture_loc = _child(loc, f"gestures[{i}]")
+            gesture = Gesture.from_dict(gesture, gesture_loc)
+            key = (gesture.kind, frozenset(gesture.colors))
+            if key in declared:
+                raise ConfigValidationError(gesture_loc, f"duplicate {gesture.kind} for {'+'.join(gesture.colors)}")
+            declared.add(key)
+            gestures.append(gesture)
+        return cls(name, actions, tuple(sequences), tuple(gestures))
+
+    def iter_actions(self):
+        """Yield ``(location, action)`` for every action in the mode."""
+        for color, action in self.actions.items():
+            yield f"actions.{color}", action
+        for i, seq in enumerate(self.sequences):
+            yield f"sequences[{i}].action", seq.action
+        for i, gesture in enumerate(self.gestures):
+            yield f"gestures[{i}].action", gesture.action
+
+    @classmethod
+    def empty(cls, name: str) -> "ModeTable":
+        """Return a mode table with no actions, sequences or gestures."""
+        return cls(name, {}, ())
+
+    def __repr__(self) -> str:
+        return f"ModeTable({self.name!r}, colors={sorted(self.actions)})"
+
+
 class Config:
     """Configuration manager for the color sensor remote controller."""
     
@@ -23,35 +602,56 @@ class Config:
         self.modes: Dict[str, Dict[str, Any]] = {}
         self.current_mode: str = "main"
         self.color_config: Dict[str, Any] = {}
+        self.mode_tables: Mapping[str, ModeTable] = MappingProxyType({})
+        self._mtimes: Dict[Path, int] = {}
+        self._listeners: List[Callable[[Set[str]], None]] = []
         
     def load_configs(self) -> None:
-        """Load all configuration files."""
+        """Load all configuration files and compile the mode tables."""
         self._load_global_config()
         self._load_color_config()
         self._load_modes()
+        self._compile_modes()
+        self._mtimes = self.scan_sources()
         
     def _load_global_config(self) -> None:
         """Load the global configuration."""
         global_config_path = self.config_dir / "global.json"
         try:
-            self.global_config = self._load_json(global_config_path)
+            self.global_config = normalize_global(
+                self._load_json(global_config_path), "global.json:")
         except FileNotFoundError:
             raise ConfigError(f"Global config not found at {global_config_path}")
             
     def _load_color_config(self) -> None:
         """Load color configurations."""
-        if self.global_config.get("use_calibrated", False):
-            calib_path = Path("calibration/results.json")
-            if calib_path.exists():
-                self.color_config = self._load_json(calib_path)
-                return
+        self.color_config = self._read_color_config(self.global_config)
+
+    def _uses_calibration(self, global_config: Dict[str, Any]) -> bool:
+        """Return True if colors come from the calibration results."""
+        return bool(global_config.get("use_calibrated", False)) and CALIBRATION_PATH.exists()
+
+    def _read_color_config(self, global_config: Dict[str, Any]) -> Dict[str, Any]:
+        """Read color ranges from calibration results or ``colors/``."""
+        if self._uses_calibration(global_config):
+            results = self._load_json(CALIBRATION_PATH)
+            if not isinstance(results, dict):
+                raise ConfigValidationError(str(CALIBRATION_PATH), "expected an object mapping colors to ranges")
+            return {
+                name: normalize_color(data, f"{CALIBRATION_PATH}: {name}")
+                for name, data in results.items()
+            }
                 
         # Fall back to default color configs
         color_dir = self.config_dir / "colors"
-        self.color_config = {}
-        for color_file in color_dir.glob("*.json"):
-            color_name = color_file.stem
-            self.color_config[color_name] = self._load_json(color_file)
+        return {
+            color_file.stem: self._read_color_file(color_file)
+            for color_file in color_dir.glob("*.json")
+        }
+
+    def _read_color_file(self, path: Path) -> Dict[str, Any]:
+        """Read and validate one ``colors/<name>.json`` file."""
+        return normalize_color(self._load_json(path), f"colors/{path.name}:")
     
     def _load_modes(self) -> None:
         """Load all mode configurations."""
@@ -67,6 +667,144 @@ class Config:
                 self.modes[mode_name].setdefault("mode_name", mode_name)
             except json.JSONDecodeError as e:
                 raise ConfigError(f"Error parsing {mode_file}: {e}")
+
+    def _compile_modes(self) -> None:
+        """Validate and compile every loaded mode into a ModeTable."""
+        tables = {
+            name: ModeTable.from_dict(name, data)
+            for name, data in self.modes.items()
+        }
+        self._check_mode_links(tables)
+        self.mode_tables = MappingProxyType(tables)
+
+    @staticmethod
+    def _check_mode_links(tables: Mapping[str, ModeTable]) -> None:
+        """Reject ``next_mode`` values that name a mode that doesn't exist."""
+        for name, table in tables.items():
+            for loc, action in table.iter_actions():
+                if action.next_mode and action.next_mode not in tables:
+                    raise ConfigValidationError(
+                        f"modes/{name}.json: {loc}.next_mode",
+                        f"unknown mode {action.next_mode!r} (known: {', '.join(sorted(tables))})")
+    
+    def add_listener(self, callback: Callable[[Set[str]], None]) -> None:
+        """Register a callback invoked after a hot reload.
+        
+        Args:
+            callback: Called with the names of the parts that changed,
+                e.g. ``{"global", "colors", "mode:video"}``
+        """
+        self._listeners.append(callback)
+
+    def poll_changes(self) -> Set[str]:
+        """Reload whatever changed on disk since the last poll.
+        
+        Only ``stat`` calls are made when nothing changed. Changed color
+        files are reloaded individually and only the affected mode tables
+        are recompiled. New state is published by replacing attributes
+        in one assignment each, so readers on other threads always see
+        either the old or the new configuration.
+        
+        Returns:
+            Names of the parts that changed (empty if nothing did)
+        """
+        current = self.scan_sources()
+        if current == self._mtimes:
+            return set()
+        changed = {
+            path for path in current.keys() | self._mtimes.keys()
+            if current.get(path) != self._mtimes.get(path)
+        }
+        try:
+            parts = self._reload(changed)
+        except (ConfigError, json.JSONDecodeError, OSError, KeyError, TypeError) as e:
+            # Typically a file caught mid-save; retry on the next poll
+            print(f"⚠️ Config reload skipped: {e}")
+            return set()
+        self._mtimes = current
+        if parts:
+            print(f"🔄 Config reloaded: {', '.join(sorted(parts))}")
+            for listener in list(self._listeners):
+                listener(parts)
+        return parts
+
+    def scan_sources(self) -> Dict[Path, int]:
+        """Return the modification time (ns) of every configuration source."""
+        mtimes: Dict[Path, int] = {}
+        for path in (self.config_dir / "global.json", CALIBRATION_PATH):
+            try:
+                mtimes[path] = path.stat().st_mtime_ns
+            except FileNotFoundError:
+                pass
+        for sub in ("colors", "modes"):
+            try:
+                with os.scandir(self.config_dir / sub) as entries:
+                    for entry in entries:
+                        if entry.name.endswith(".json"):
+                            mtimes[Path(entry.path)] = entry.stat().st_mtime_ns
+            except FileNotFoundError:
+                pass
+        return mtimes
+
+    def _reload(self, changed: Set[Path]) -> Set[str]:
+        """Parse and compile the changed sources, then swap them in.
+        
+        Everything is parsed before anything is assigned, so a failure
+        leaves the running configuration untouched.
+        """
+        parts: Set[str] = set()
+        global_path = self.config_dir / "global.json"
+        colors_dir = self.config_dir / "colors"
+        modes_dir = self.config_dir / "modes"
+
+        global_config = self.global_config
+        if global_path in changed:
+            global_config = normalize_global(self._load_json(global_path), "global.json:")
+            parts.add("global")
+
+        color_config = self.color_config
+        color_paths = [p for p in changed if p.parent == colors_dir]
+        calibrated = self._uses_calibration(global_config)
+        if ("global" in parts or (calibrated and CALIBRATION_PATH in changed)
+                or calibrated != self._uses_calibration(self.global_config)):
+            color_config = self._read_color_config(global_config)
+            parts.add("colors")
+        elif color_paths and not calibrated:
+            # Unchanged entries keep their identity so detector tables can
+            # reuse their compiled form
+            color_config = dict(color_config)
+            for path in color_paths:
+                if path.exists():
+                    color_config[path.stem] = self._read_color_file(path)
+                else:
+                    color_config.pop(path.stem, None)
+            parts.add("colors")
+
+        modes = self.modes
+        mode_tables = self.mode_tables
+        mode_paths = [p for p in changed if p.parent == modes_dir]
+        if mode_paths:
+            modes = dict(modes)
+            tables = dict(mode_tables)
+            for path in mode_paths:
+                name = path.stem
+                if path.exists():
+                    data = self._load_json(path)
+                    data.setdefault("mode_name", name)
+                    modes[name] = data
+                    tables[name] = ModeTable.from_dict(name, data)
+                else:
+                    modes.pop(name, None)
+                    tables.pop(name, None)
+                parts.add(f"mode:{name}")
+            self._check_mode_links(tables)
+            mode_tables = MappingProxyType(tables)
+
+        self.global_config = global_config
+        self.color_config = color_config
+        self.modes = modes
+        self.mode_tables = mode_tables
+        return parts
     
     def get_mode_config(self, mode_name: Optional[str] = None) -> Dict[str, Any]:
         """Get configuration for the specified mode or current mode if None.
@@ -82,6 +820,24 @@ class Config:
             raise ConfigError(f"Unknown mode: {mode}")
         return self.modes[mode]
     
+    def get_mode_table(self, mode_name: Optional[str] = None) -> ModeTable:
+        """Get the compiled dispatch tables for a mode.
+        
+        Args:
+            mode_name: Name of the mode, or None for current mode
+            
+        Returns:
+            The mode's ModeTable
+            
+        Raises:
+            ConfigError: If the mode is not found
+        """
+        mode = mode_name or self.current_mode
+        try:
+            return self.mode_tables[mode]
+        except KeyError:
+            raise ConfigError(f"Unknown mode: {mode}") from None
+    
     def get_action(self, color: str, mode_name: Optional[str] = None) -> Optional[Dict[str, Any]]:
         """Get the action configuration for a color in the specified mode.
         
@@ -175,7 +931,4 @@ def load_color_config(global_config: Dict[str, Any]) -> Dict[str, Any]:
     Returns:
         Color configuration dictionary
     """
-    config = Config()
-    config.global_config = global_config
-    config._load_color_config()
-    return config.color_config
+    return Config()._read_color_config(global_config)
@@ -0,0 +1,203 @@
+"""Binary snapshot of the compiled configuration for fast startup.
+
+Parsing, validating and compiling every JSON file takes longer than
+opening the camera. The fully compiled state (mode tables, normalized
+configs and the detector's HSV bounds) is therefore written to a single
+file that is memory-mapped on the next launch and only rebuilt when a
+source file actually changed.
+
+File layout::
+
+    MAGIC | u32 header length | header JSON | u32 payload length |
+    pickle payload | uint8 HSV bounds (colors x 2 x 3)
+"""
+import hashlib
+import json
+import mmap
+import os
+import pickle
+import struct
+from pathlib import Path
+from types import MappingProxyType
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .config_loader import Config
+from .vision import ColorEntry, ColorTable, compile_color_table
+
+SNAPSHOT_PATH = Path(".cache/config.snapshot")
+
+# Bump whenever the pickled classes or the layout change
+SNAPSHOT_VERSION = 7
+
+_MAGIC = b"CSRCSNAP"
+_U32 = struct.Struct("<I")
+
+
+def _file_hash(path: Path) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def _describe_sources(mtimes: Dict[Path, int]) -> List[List]:
+    """Return ``[path, mtime_ns, sha1]`` for every source file."""
+    return [[str(path), mtime, _file_hash(path)]
+            for path, mtime in sorted(mtimes.items())]
+
+
+def _sources_match(recorded: List[List], mtimes: Dict[Path, int]) -> bool:
+    """Check recorded sources against the files currently on disk.
+
+    Matching mtimes are trusted; files whose mtime moved (checkout,
+    touch, editor save without edits) are hashed before the snapshot is
+    declared stale. load_snapshot rewrites a snapshot that matched by
+    hash, so those files are not hashed again on every launch.
+    """
+    if {entry[0] for entry in recorded} != {str(p) for p in mtimes}:
+        return False
+    for path, mtime, digest in recorded:
+        if mtimes[Path(path)] != mtime and _file_hash(Path(path)) != digest:
+            return False
+    return True
+
+
+def save_snapshot(config: Config, color_table: ColorTable,
+                  path: Path = SNAPSHOT_PATH) -> None:
+    """Write the compiled configuration atomically.
+
+    Args:
+        config: A fully loaded Config
+        color_table: Detector table compiled from ``config.color_config``
+        path: Destination file
+    """
+    names = [entry.name for entry in color_table]
+    bounds = np.array([[entry.lower, entry.upper] for entry in color_table],
+                      dtype=np.uint8).reshape(len(names), 2, 3)
+    header = json.dumps({
+        "version": SNAPSHOT_VERSION,
+        "config_dir": str(config.config_dir),
+        "sources": _describe_sources(config.scan_sources()),
+        "colors": names,
+    }).encode("utf-8")
+    payload = pickle.dumps({
+        "global_config": config.global_config,
+        "color_config": config.color_config,
+        "modes": config.modes,
+        "mode_tables": dict(config.mode_tables),
+    }, protocol=pickle.HIGHEST_PROTOCOL)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(_MAGIC)
+        f.write(_U32.pack(len(header)))
+        f.write(header)
+        f.write(_U32.pack(len(payload)))
+        f.write(payload)
+        f.write(bounds.tobytes())
+    os.replace(tmp_path, path)
+
+
+def load_snapshot(config_dir: str = "config",
+                  path: Path = SNAPSHOT_PATH) -> Optional[Tuple[Config, ColorTable]]:
+    """Load a snapshot if it is still valid for the files on disk.
+
+    The HSV bounds are numpy views straight into the memory map, so the
+    detector table costs no parsing at all.
+
+    Args:
+        config_dir: Configuration directory the snapshot must belong to
+        path: Snapshot file
+
+    Returns:
+        ``(config, color_table)``, or None if there is no usable snapshot
+    """
+    try:
+        f = open(path, "rb")
+    except FileNotFoundError:
+        return None
+    with f:
+        try:
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file
+            return None
+
+    try:
+        if buf[:len(_MAGIC)] != _MAGIC:
+            return None
+        offset = len(_MAGIC)
+        (header_len,) = _U32.unpack_from(buf, offset)
+        offset += _U32.size
+        header = json.loads(bytes(buf[offset:offset + header_len]))
+        offset += header_len
+        if (header.get("version") != SNAPSHOT_VERSION
+                or header.get("config_dir") != str(Path(config_dir))):
+            return None
+
+        config = Config(config_dir)
+        mtimes = config.scan_sources()
+        if not _sources_match(header["sources"], mtimes):
+            return None
+
+        (payload_len,) = _U32.unpack_from(buf, offset)
+        offset += _U32.size
+        state = pickle.loads(buf[offset:offset + payload_len])
+        offset += payload_len
+        names = header["colors"]
+        bounds = np.frombuffer(buf, dtype=np.uint8, count=len(names) * 6,
+                               offset=offset).reshape(len(names), 2, 3)
+    except (ValueError, KeyError, struct.error, pickle.UnpicklingError,
+            EOFError, AttributeError, ImportError) as e:
+        print(f"⚠️ Ignoring unreadable config snapshot: {e}")
+        return None
+
+    config.global_config = state["global_config"]
+    config.color_config = state["color_config"]
+    config.modes = state["modes"]
+    config.mode_tables = MappingProxyType(state["mode_tables"])
+    config._mtimes = mtimes
+    refresh = any(mtimes[Path(source)] != mtime for source, mtime, _ in header["sources"])
+    if refresh:
+        # Copy the bounds out so the map can be closed and replaced
+        bounds = bounds.copy()
+        buf.close()
+    color_table = tuple(
+        ColorEntry(name, bounds[i, 0], bounds[i, 1], config.color_config[name])
+        for i, name in enumerate(names)
+    )
+    if refresh:
+        # Contents matched by hash: record the new mtimes
+        try:
+            save_snapshot(config, color_table, path)
+        except OSError as e:
+            print(f"⚠️ Could not refresh config snapshot: {e}")
+    return config, color_table
+
+
+def load_config_cached(config_dir: str = "config",
+                       path: Path = SNAPSHOT_PATH) -> Tuple[Config, ColorTable]:
+    """Load the compiled configuration, from the snapshot when possible.
+
+    Args:
+        config_dir: Base directory containing configuration files
+        path: Snapshot file
+
+    Returns:
+        ``(config, color_table)`` ready for the vision loop
+
+    Raises:
+        ConfigError: If the configuration has to be rebuilt and is invalid
+    """
+    cached = load_snapshot(config_dir, path)
+    if cached is not None:
+        return cached
+
+    config = Config(config_dir)
+    config.load_configs()
+    color_table = compile_color_table(config.color_config)
+    try:
+        save_snapshot(config, color_table, path)
+    except OSError as e:
+        print(f"⚠️ Could not write config snapshot: {e}")
+    return config, color_table
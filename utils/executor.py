@@ -0,0 +1,168 @@
+"""Background execution of actions.
+
+Actions sleep while windows take focus, pages load or images appear on
+screen. ``ActionExecutor`` runs them one at a time on a dedicated worker
+thread so the detection loop and the overlay keep running meanwhile.
+"""
+import collections
+import threading
+from concurrent.futures import CancelledError, Future
+from typing import Any, Callable, Deque, Hashable, Optional
+
+from .actions import perform_action
+
+
+class _Job:
+    __slots__ = ("key", "fn", "args", "future", "cancel")
+
+    def __init__(self, key: Optional[Hashable], fn: Callable, args: tuple):
+        self.key = key
+        self.fn = fn
+        self.args = args
+        self.future: Future = Future()
+        self.cancel = threading.Event()
+
+
+class ActionExecutor:
+    """Runs actions in order on a single worker thread.
+
+    * The queue is bounded: when it is full the oldest waiting job is
+      dropped (its future is cancelled), since the newest input is what
+      the user wants now.
+    * Submitting a job whose key is already waiting in the queue returns
+      the waiting job's future instead of queueing a duplicate, so a
+      burst of repeated holds runs its action once. Compiled Actions are
+      immutable and shared, so the Action itself is the key.
+    * ``cancel_all`` drops every waiting job and asks the running one to
+      stop. Jobs receive a ``cancel`` Event and should return early
+      once it is set; perform_action checks it at every wait.
+
+    Futures complete with the job's return value, or raise
+    ``CancelledError`` if the job was dropped or stopped early.
+    Callbacks added to them run on the worker thread.
+    """
+
+    def __init__(self, maxsize: int = 8, name: str = "action-executor"):
+        """Start the worker thread.
+
+        Args:
+            maxsize: Maximum number of jobs waiting to run
+            name: Name of the worker thread
+        """
+        self.maxsize = maxsize
+        self._queue: Deque[_Job] = collections.deque()
+        self._waiting = {}  # key -> queued job
+        self._running: Optional[_Job] = None
+        self._lock = threading.Condition()
+        self._stopped = False
+        self._thread = threading.Thread(target=self._work, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, action: Any, on_done: Optional[Callable[[Future], None]] = None,
+               **kwargs) -> Future:
+        """Queue ``perform_action(action, **kwargs)``.
+
+        An action that switches mode first cancels everything queued or
+        running, since it all belongs to the mode being left.
+
+        Args:
+            action: Compiled Action to run
+            on_done: Optional callback receiving the finished Future
+            **kwargs: Extra arguments for perform_action (overlay,
+                anime_selector). They must be safe to use off the UI thread.
+
+        Returns:
+            Future resolving to the mode the action switches to, if any
+        """
+        if getattr(action, "next_mode", None):
+            self.cancel_all()
+        return self.call(_run_action, action, kwargs, key=action, on_done=on_done)
+
+    def call(self, fn: Callable, *args, key: Optional[Hashable] = None,
+             on_done: Optional[Callable[[Future], None]] = None) -> Future:
+        """Queue ``fn(*args, cancel=event)``.
+
+        Args:
+            fn: Function to run on the worker thread
+            *args: Positional arguments for ``fn``
+            key: Jobs with the same key are coalesced while waiting
+            on_done: Optional callback receiving the finished Future
+
+        Returns:
+            Future resolving to the return value of ``fn``
+        """
+        with self._lock:
+            if self._stopped:
+                raise RuntimeError("ActionExecutor has been shut down")
+            job = self._waiting.get(key) if key is not None else None
+            if job is None:
+                job = _Job(key, fn, args)
+                if len(self._queue) >= self.maxsize:
+                    self._drop(self._queue.popleft())
+                self._queue.append(job)
+                if key is not None:
+                    self._waiting[key] = job
+                self._lock.notify()
+        if on_done is not None:
+            job.future.add_done_callback(on_done)
+        return job.future
+
+    def cancel_all(self) -> None:
+        """Drop every waiting job and signal the running one to stop."""
+        with self._lock:
+            while self._queue:
+                self._drop(self._queue.popleft())
+            if self._running is not None:
+                self._running.cancel.set()
+
+    def busy(self) -> bool:
+        """Return True while a job is running or waiting."""
+        with self._lock:
+            return self._running is not None or bool(self._queue)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Cancel outstanding work and stop the worker thread."""
+        with self._lock:
+            self._stopped = True
+            self._lock.notify()
+        self.cancel_all()
+        if wait:
+            self._thread.join()
+
+    def _drop(self, job: _Job) -> None:
+        # Caller holds the lock
+        if self._waiting.get(job.key) is job:
+            del self._waiting[job.key]
+        job.cancel.set()
+        job.future.cancel()
+
+    def _work(self) -> None:
+        while True:
+            with self._lock:
+                while not self._queue and not self._stopped:
+                    self._lock.wait()
+                if self._stopped and not self._queue:
+                    return
+                job = self._queue.popleft()
+                if self._waiting.get(job.key) is job:
+                    del self._waiting[job.key]
+                if not job.future.set_running_or_notify_cancel():
+                    continue
+                self._running = job
+
+            try:
+                result = job.fn(*job.args, cancel=job.cancel)
+            except BaseException as e:
+                job.future.set_exception(e)
+            else:
+                if job.cancel.is_set():
+                    job.future.set_exception(CancelledError())
+                else:
+                    job.future.set_result(result)
+            finally:
+                with self._lock:
+                    self._running = None
+
+
+def _run_action(action: Any, kwargs: dict, cancel: threading.Event) -> Optional[str]:
+    return perform_action(action, cancel=cancel, **kwargs)
@@ -0,0 +1,474 @@
+"""Event-driven gesture engine for the color sensor remote controller.
+
+The detector reports a color, None, or a set of colors for every frame,
+but nothing interesting happens between changes. ``GestureEngine`` only acts
+on press and release edges; hold deadlines and pending sequence matches
+are scheduled on a heap and fired by whoever drives the engine (a
+precise Qt timer in the app, a virtual clock in tests) at exactly the
+time they are due, independent of the camera frame rate.
+
+Events are delivered to listeners as ``GestureEvent`` tuples.
+"""
+import heapq
+from enum import Enum
+from typing import (Any, Callable, Dict, FrozenSet, Iterable, List, NamedTuple,
+                    Optional, Set, Tuple, Union)
+
+from .sequences import SequenceMatcher
+
+
+class EventType(Enum):
+    """Kinds of events emitted by the gesture engine."""
+    PRESS = "press"            # a color appeared
+    RELEASE = "release"        # a color disappeared
+    HOLD = "hold"              # a color was held for its action's hold_time
+    SEQUENCE = "sequence"      # a color sequence resolved
+    TAP = "tap"                # a short press and release
+    DOUBLE_TAP = "double_tap"  # a second tap soon after the first
+    LONG_PRESS = "long_press"  # a press held for the gesture's min_hold
+    CHORD = "chord"            # several colors shown at the same time
+
+
+class GestureEvent(NamedTuple):
+    """A single gesture event.
+
+    Attributes:
+        type: What happened
+        time: When it happened (deadline time for scheduled events)
+        color: Color involved; None for sequence and chord events
+        action: Action to run, for every event type except PRESS/RELEASE
+        sequence: The matched Sequence for SEQUENCE events
+        gesture: The declared Gesture for TAP, DOUBLE_TAP, LONG_PRESS
+            and CHORD events
+    """
+    type: EventType
+    time: float
+    color: Optional[str] = None
+    action: Optional[Any] = None
+    sequence: Optional[Any] = None
+    gesture: Optional[Any] = None
+
+
+_NOTHING: FrozenSet[str] = frozenset()
+
+# Timer kinds kept on the deadline heap
+_HOLD = 0
+_SEQUENCE = 1
+_TAP = 2
+_LONG_PRESS = 3
+
+_GESTURE_EVENTS = {
+    "tap": EventType.TAP,
+    "double_tap": EventType.DOUBLE_TAP,
+    "long_press": EventType.LONG_PRESS,
+    "chord": EventType.CHORD,
+}
+
+
+class HoldProgress:
+    """Progress of the hold currently running, for display.
+
+    The engine writes ``span`` as a single tuple assignment whenever a
+    hold starts, repeats or is cancelled; the UI reads it whenever it
+    repaints. Nothing is pushed per frame, and a reader on another
+    thread always sees a consistent start/deadline pair.
+    """
+
+    __slots__ = ("span",)
+
+    def __init__(self):
+        self.span: Optional[Tuple[float, float, str]] = None
+
+    def value(self, now: float) -> Optional[float]:
+        """Return how far the hold is at ``now`` (0.0-1.0), or None if idle."""
+        span = self.span
+        if span is None:
+            return None
+        start, deadline, _ = span
+        if deadline <= start:
+            return 1.0
+        return min(1.0, max(0.0, (now - start) / (deadline - start)))
+
+    @property
+    def color(self) -> Optional[str]:
+        """Color being held, or None if idle."""
+        span = self.span
+        return span[2] if span is not None else None
+
+
+def _colors_used(mode_table: Any) -> FrozenSet[str]:
+    """Colors a mode's actions, sequences or gestures refer to."""
+    colors = set(mode_table.actions) | set(mode_table.gesture_index)
+    for sequence in mode_table.sequences:
+        colors.update(sequence.pattern)
+    return frozenset(colors)
+
+
+def _find(gestures: Tuple[Any, ...], kind: str) -> Optional[Any]:
+    for gesture in gestures:
+        if gesture.kind == kind:
+            return gesture
+    return None
+
+
+class GestureEngine:
+    """Turns per-frame color detections into typed gesture events.
+
+    A detection is a color name, None, or a set of colors for detectors
+    that report every color in the ROI. Each color gets its own press
+    and release edges.
+
+    One color at a time drives the mode's ``actions`` and
+    ``sequences``: the color shown, or, when several are detected, the
+    first one the mode uses (colors it doesn't use, like a background
+    matching a second color range, are ignored). Two colors of one of
+    the mode's chords shown together drive neither. Holding a color fires its action after
+    ``hold_time`` seconds and then repeats every ``hold_time`` for as
+    long as the color is held, like the frame-polling loop it replaces.
+    Actions with ``hold_time`` 0 fire once, on press. Holds are
+    suppressed while a sequence match is pending, since the colors
+    belong to the gesture in progress.
+
+    The mode's declared ``gestures`` are recognised from the same
+    edges:
+
+    * tap: released within ``max_tap``. If the color also has a
+      double-tap, the tap is held back for the double-tap ``window``.
+    * double_tap: pressed again within ``window`` of a tap's release,
+      with no other color in between.
+    * long_press: held for ``min_hold``; fires once, while still held.
+    * chord: every color of the chord shown at once.
+
+    A press that completed a double-tap, long-press or chord produces
+    no tap when released. Only the gestures indexed under the colors of
+    an edge are examined, so the cost of an edge is bounded by the
+    number of gestures that color takes part in.
+
+    The engine never reads a clock: every call takes ``now``. Call
+    ``update`` for each detection and ``advance`` when ``next_deadline``
+    is reached.
+    """
+
+    def __init__(self, mode_table: Any):
+        """Create an engine for a mode.
+
+        Args:
+            mode_table: Compiled ModeTable whose actions, sequences and
+                gestures apply
+        """
+        self.mode_table = mode_table
+        self.sequences = SequenceMatcher(mode_table.automaton)
+        self._mode_colors = _colors_used(mode_table)
+        self.color: Optional[str] = None
+        self.active: FrozenSet[str] = _NOTHING
+        self.progress = HoldProgress()
+        self._last_input: Any = None
+        self._heap: List[Tuple[float, int, int, Any]] = []
+        self._live: Set[int] = set()
+        self._counter = 0
+        self._hold_token: Optional[int] = None
+        self._sequence_token: Optional[int] = None
+        self._sequence_deadline: Optional[float] = None
+        # Per-color gesture state
+        self._pressed_at: Dict[str, float] = {}
+        self._consumed: Set[str] = set()
+        self._tap_release: Dict[str, float] = {}
+        self._tap_tokens: Dict[str, int] = {}
+        self._long_tokens: Dict[str, int] = {}
+        self._chords: Set[Any] = set()
+        self._chorded: Set[str] = set()
+        self._listeners: List[Callable[[GestureEvent], None]] = []
+
+    def add_listener(self, callback: Callable[[GestureEvent], None]) -> None:
+        """Register a callback invoked with every GestureEvent."""
+        self._listeners.append(callback)
+
+    def set_mode_table(self, mode_table: Any) -> None:
+        """Switch to another mode, dropping partial gestures and timers.
+
+        The colors currently shown are treated as already pressed, so
+        keeping a card up across a mode switch doesn't trigger the new
+        mode's action for it until the card is shown again.
+        """
+        self.mode_table = mode_table
+        self._mode_colors = _colors_used(mode_table)
+        self.sequences.set_automaton(mode_table.automaton)
+        self.sequences.last_color = self.color
+        self._heap.clear()
+        self._live.clear()
+        self._hold_token = None
+        self.progress.span = None
+        self._sequence_token = None
+        self._pressed_at.clear()
+        self._tap_release.clear()
+        self._tap_tokens.clear()
+        self._long_tokens.clear()
+        # Nothing shown now may complete a gesture in the new mode
+        self._consumed = set(self.active)
+        self._chords.clear()
+        self._chorded.clear()
+
+    def next_deadline(self) -> Optional[float]:
+        """Return the time of the earliest scheduled event, or None."""
+        heap = self._heap
+        while heap and heap[0][1] not in self._live:
+            heapq.heappop(heap)  # cancelled
+        return heap[0][0] if heap else None
+
+    def update(self, colors: Union[None, str, Iterable[str]], now: float) -> None:
+        """Process one detection.
+
+        Repeating the previous detection is a single comparison.
+
+        Args:
+            colors: Detected color, None if nothing was detected, or
+                every color detected (a tuple in detection order, or a
+                set, taken in sorted order)
+            now: Timestamp of the detection in seconds
+        """
+        if colors == self._last_input:
+            return
+        self._last_input = colors
+        if colors is None:
+            active = _NOTHING
+        elif isinstance(colors, str):
+            active = frozenset((colors,))
+        else:
+            active = frozenset(colors)
+        if active == self.active:
+            return
+        # Deadlines that passed before this edge fire first, in order
+        self.advance(now)
+
+        table = self.mode_table
+        released = sorted(self.active - active)
+        pressed = sorted(active - self.active)
+        self.active = active
+        for color in released:
+            self._emit(GestureEvent(EventType.RELEASE, now, color))
+            self._released(color, now)
+            if self.mode_table is not table:
+                return  # a listener switched modes
+        for color in pressed:
+            self._emit(GestureEvent(EventType.PRESS, now, color))
+            self._pressed(color, now)
+            if self.mode_table is not table:
+                return
+        if len(active) > 1:
+            self._check_chords(pressed, now)
+            if self.mode_table is not table:
+                return
+
+        color = self._primary(colors, active)
+        if color != self.color:
+            self._primary_changed(color, now)
+
+    def advance(self, now: float) -> None:
+        """Fire every scheduled event due at or before ``now``."""
+        heap = self._heap
+        while heap and heap[0][0] <= now:
+            deadline, token, kind, payload = heapq.heappop(heap)
+            if token not in self._live:
+                continue
+            self._live.discard(token)
+            if kind == _HOLD:
+                self._hold_token = None
+                self.progress.span = None
+                if self.sequences.pending is not None:
+                    continue
+                action = payload
+                # Repeat for as long as the color stays up
+                self._hold_token = self._push(deadline + action.hold_time, _HOLD, action)
+                self.progress.span = (deadline, deadline + action.hold_time, self.color)
+                self._emit(GestureEvent(EventType.HOLD, deadline, self.color, action))
+            elif kind == _SEQUENCE:
+                self._sequence_token = None
+                matched = self.sequences.poll(deadline)
+                if matched is not None:
+                    self._emit_sequence(matched, deadline)
+            elif kind == _TAP:
+                color, gesture = payload
+                del self._tap_tokens[color]
+                self._tap_release.pop(color, None)
+                self._emit_gesture(gesture, deadline, color)
+            elif kind == _LONG_PRESS:
+                color, gesture = payload
+                del self._long_tokens[color]
+                self._consumed.add(color)
+                self._emit_gesture(gesture, deadline, color)
+
+    # Single-color actions and sequences
+
+    def _primary(self, colors: Any, active: FrozenSet[str]) -> Optional[str]:
+        """Pick the color that drives actions and sequences, if any."""
+        if len(active) <= 1:
+            return next(iter(active), None)
+        ordered = colors if isinstance(colors, (tuple, list)) else sorted(active)
+        # Like detect_color, the first match wins; colors this mode has
+        # no use for don't count
+        candidates = [c for c in ordered if c in self._mode_colors] or ordered
+        index = self.mode_table.gesture_index
+        for color in candidates:
+            for gesture in index.get(color, ()):
+                if gesture.kind == "chord" and len(active.intersection(gesture.colors)) > 1:
+                    return None  # (part of) a chord is shown
+        return candidates[0]
+
+    def _primary_changed(self, color: Optional[str], now: float) -> None:
+        self.color = color
+        self._cancel(self._hold_token)
+        self._hold_token = None
+        self.progress.span = None
+        if color is None:
+            return
+        if color in self._chorded:
+            # What's left of a chord is neither a sequence step nor a hold
+            self.sequences.last_color = color
+            return
+
+        matched = self.sequences.feed(color, now)
+        self._schedule_sequence()
+        if matched is not None:
+            # The completing color belongs to the sequence, not to a hold
+            self._emit_sequence(matched, now)
+            return
+
+        action = self.mode_table.actions.get(color)
+        if action is None or self.sequences.pending is not None:
+            return
+        if action.hold_time <= 0:
+            self._emit(GestureEvent(EventType.HOLD, now, color, action))
+        else:
+            self._hold_token = self._push(now + action.hold_time, _HOLD, action)
+            self.progress.span = (now, now + action.hold_time, color)
+
+    def _schedule_sequence(self) -> None:
+        # Re-arm the pending-sequence timer when the matcher's deadline moves
+        deadline = self.sequences.deadline
+        if deadline is None:
+            self._cancel(self._sequence_token)
+            self._sequence_token = None
+        elif self._sequence_token is None or self._sequence_deadline != deadline:
+            self._cancel(self._sequence_token)
+            self._sequence_token = self._push(deadline, _SEQUENCE, None)
+            self._sequence_deadline = deadline
+
+    # Declared gestures
+
+    def _pressed(self, color: str, now: float) -> None:
+        if self._tap_release:
+            # Another color in between breaks a double-tap
+            self._tap_release = {c: t for c, t in self._tap_release.items() if c == color}
+        gestures = self.mode_table.gesture_index.get(color)
+        if not gestures:
+            return
+        self._pressed_at[color] = now
+        self._consumed.discard(color)
+
+        last_tap = self._tap_release.pop(color, None)
+        double_tap = _find(gestures, "double_tap")
+        if double_tap is not None and last_tap is not None and now - last_tap <= double_tap.window:
+            # The held-back first tap is part of this double-tap
+            self._cancel(self._tap_tokens.pop(color, None))
+            self._consumed.add(color)
+            self._emit_gesture(double_tap, now, color)
+            return
+
+        long_press = _find(gestures, "long_press")
+        if long_press is not None:
+            self._long_tokens[color] = self._push(
+                now + long_press.min_hold, _LONG_PRESS, (color, long_press))
+
+    def _released(self, color: str, now: float) -> None:
+        if self._chords:
+            self._chords = {chord for chord in self._chords if color not in chord.colors}
+        self._chorded.discard(color)
+        self._cancel(self._long_tokens.pop(color, None))
+        start = self._pressed_at.pop(color, None)
+        if start is None:
+            return
+        if color in self._consumed:
+            self._consumed.discard(color)
+            return
+
+        gestures = self.mode_table.gesture_index[color]
+        duration = now - start
+        tap = _find(gestures, "tap")
+        double_tap = _find(gestures, "double_tap")
+        if double_tap is not None and duration <= double_tap.max_tap:
+            # Might be the first half of a double-tap
+            self._tap_release[color] = now
+            if tap is not None and duration <= tap.max_tap:
+                self._tap_tokens[color] = self._push(
+                    now + double_tap.window, _TAP, (color, tap))
+        elif tap is not None and duration <= tap.max_tap:
+            self._emit_gesture(tap, now, color)
+
+    def _check_chords(self, pressed: List[str], now: float) -> None:
+        active = self.active
+        for color in pressed:
+            for gesture in self.mode_table.gesture_index.get(color, ()):
+                if (gesture.kind == "chord" and gesture not in self._chords
+                        and active.issuperset(gesture.colors)):
+                    self._chords.add(gesture)
+                    self._chorded.update(gesture.colors)
+                    self.sequences.reset()
+                    self._schedule_sequence()
+                    for member in gesture.colors:
+                        self._consumed.add(member)
+                        self._cancel(self._long_tokens.pop(member, None))
+                    self._emit_gesture(gesture, now)
+
+    # Plumbing
+
+    def _push(self, deadline: float, kind: int, payload: Any) -> int:
+        self._counter += 1
+        heapq.heappush(self._heap, (deadline, self._counter, kind, payload))
+        self._live.add(self._counter)
+        return self._counter
+
+    def _cancel(self, token: Optional[int]) -> None:
+        if token is not None:
+            self._live.discard(token)
+
+    def _emit_sequence(self, matched: Any, now: float) -> None:
+        self._emit(GestureEvent(EventType.SEQUENCE, now, None, matched.action, matched))
+
+    def _emit_gesture(self, gesture: Any, now: float, color: Optional[str] = None) -> None:
+        self._emit(GestureEvent(_GESTURE_EVENTS[gesture.kind], now, color,
+                                gesture.action, None, gesture))
+
+    def _emit(self, event: GestureEvent) -> None:
+        for callback in self._listeners:
+            callback(event)
+
+
+def replay(engine: GestureEngine, detections: Iterable[Tuple[float, Any]],
+           until: Optional[float] = None, clock: Optional[Any] = None) -> None:
+    """Drive an engine from timestamped detections without a real timer.
+
+    Scheduled deadlines between two detections fire at their exact
+    times, as the Qt timer would fire them in the app.
+
+    Args:
+        engine: Engine to drive
+        detections: ``(time, colors)`` pairs in time order, where colors
+            is anything ``GestureEngine.update`` accepts
+        until: Keep firing deadlines up to this time after the last detection
+        clock: Optional VirtualClock kept in step, for listeners that read it
+    """
+    def run_deadlines(limit: float) -> None:
+        deadline = engine.next_deadline()
+        while deadline is not None and deadline <= limit:
+            if clock is not None:
+                clock.set(deadline)
+            engine.advance(deadline)
+            deadline = engine.next_deadline()
+
+    for now, color in detections:
+        run_deadlines(now)
+        if clock is not None:
+            clock.set(now)
+        engine.update(color, now)
+    if until is not None:
+        run_deadlines(until)
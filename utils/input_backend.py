@@ -0,0 +1,233 @@
+"""Where synthetic input goes.
+
+``input_simulator`` sends every key, click and URL through the shared
+``InputBackend`` and waits through it too, so the same code can drive
+the real desktop or run headless:
+
+* ``SystemInputBackend`` - pynput for keys, pyautogui for the mouse and
+  the ``webbrowser`` module for URLs; waits really sleep.
+* ``RecordingInputBackend`` - logs timestamped ``InputEvent``s in memory.
+  With a ``VirtualClock`` its waits only advance the clock, so an
+  action's full timing can be measured (and tested) in microseconds
+  without a display.
+"""
+import threading
+import time
+import webbrowser
+from typing import Callable, List, NamedTuple, Optional, Tuple, Union
+
+from .clock import Clock, VirtualClock
+
+# Event kinds
+PRESS = "press"
+RELEASE = "release"
+TYPE = "type"
+MOVE = "move"
+CLICK = "click"
+OPEN_URL = "open_url"
+WAIT = "wait"
+
+
+class InputEvent(NamedTuple):
+    """One synthetic input event recorded by RecordingInputBackend."""
+    time: float
+    kind: str
+    value: object
+
+
+class InputBackend:
+    """Base class of the input backends.
+
+    Key arguments are key names as written in mode files ("ctrl", "f");
+    backends translate them to whatever their library needs.
+    """
+
+    name = "base"
+    clock: Clock = time.monotonic
+
+    def press(self, key: str) -> None:
+        raise NotImplementedError
+
+    def release(self, key: str) -> None:
+        raise NotImplementedError
+
+    def type(self, char: str) -> None:
+        raise NotImplementedError
+
+    def move(self, x: int, y: int) -> None:
+        raise NotImplementedError
+
+    def click(self, position: Optional[Tuple[int, int]] = None) -> None:
+        """Left-click at ``position``, or where the pointer is."""
+        raise NotImplementedError
+
+    def open_url(self, url: str) -> None:
+        raise NotImplementedError
+
+    def wait(self, seconds: float, cancel: Optional[threading.Event] = None) -> bool:
+        """Wait ``seconds``; return True if ``cancel`` was set meanwhile."""
+        if cancel is None:
+            time.sleep(seconds)
+            return False
+        return cancel.wait(seconds)
+
+
+class SystemInputBackend(InputBackend):
+    """Drive the real desktop.
+
+    pynput and pyautogui are imported on first use, since loading them
+    is slow and needs a display.
+    """
+
+    name = "system"
+
+    def __init__(self):
+        self._keyboard = None
+        self._special_keys = None
+
+    def _controller(self):
+        if self._keyboard is None:
+            from pynput.keyboard import Controller, Key
+            self._keyboard = Controller()
+            self._special_keys = {
+                'space': Key.space,
+                'enter': Key.enter,
+                'esc': Key.esc,
+                'shift': Key.shift,
+                'ctrl': Key.ctrl,
+                'alt': Key.alt,
+                'tab': Key.tab,
+                'up': Key.up,
+                'down': Key.down,
+                'left': Key.left,
+                'right': Key.right
+            }
+        return self._keyboard
+
+    def _key(self, name: str):
+        self._controller()
+        key = self._special_keys.get(name.lower())
+        if key is None and len(name) > 1:
+            # Other named keys (f5, backspace, page_down, ...) as recorded
+            from pynput.keyboard import Key
+            key = getattr(Key, name.lower(), None)
+        return key if key is not None else name
+
+    def press(self, key: str) -> None:
+        self._controller().press(self._key(key))
+
+    def release(self, key: str) -> None:
+        self._controller().release(self._key(key))
+
+    def type(self, char: str) -> None:
+        self._controller().type(char)
+
+    def move(self, x: int, y: int) -> None:
+        import pyautogui
+        pyautogui.moveTo(x, y)
+
+    def click(self, position: Optional[Tuple[int, int]] = None) -> None:
+        import pyautogui
+        if position is None:
+            pyautogui.click()
+        else:
+            pyautogui.click(position)
+
+    def open_url(self, url: str) -> None:
+        webbrowser.open(url)
+
+
+class RecordingInputBackend(InputBackend):
+    """Record input as timestamped events instead of sending it.
+
+    Example:
+        rec = RecordingInputBackend()          # virtual clock
+        set_input(rec)
+        press_keys(["ctrl", "b"])
+        rec.elapsed()                          # 0.3: the time it would take
+        [e.value for e in rec.events if e.kind == PRESS]  # ['ctrl', 'b']
+    """
+
+    name = "recording"
+
+    def __init__(self, clock: Optional[Clock] = None,
+                 on_open_url: Optional[Callable[[str], None]] = None):
+        """
+        Args:
+            clock: Time source. Defaults to a new VirtualClock, which
+                waits advance instead of sleeping; pass time.monotonic
+                to wait for real.
+            on_open_url: Optional hook called with every opened URL, e.g.
+                to open a window in a FakeWindowBackend
+        """
+        self.clock = clock if clock is not None else VirtualClock()
+        self.on_open_url = on_open_url
+        self.events: List[InputEvent] = []
+        self.start = self.clock()
+        self._lock = threading.Lock()
+
+    def _record(self, kind: str, value: object) -> None:
+        with self._lock:
+            self.events.append(InputEvent(self.clock(), kind, value))
+
+    def press(self, key: str) -> None:
+        self._record(PRESS, key)
+
+    def release(self, key: str) -> None:
+        self._record(RELEASE, key)
+
+    def type(self, char: str) -> None:
+        self._record(TYPE, char)
+
+    def move(self, x: int, y: int) -> None:
+        self._record(MOVE, (x, y))
+
+    def click(self, position: Optional[Tuple[int, int]] = None) -> None:
+        self._record(CLICK, position)
+
+    def open_url(self, url: str) -> None:
+        self._record(OPEN_URL, url)
+        if self.on_open_url is not None:
+            self.on_open_url(url)
+
+    def wait(self, seconds: float, cancel: Optional[threading.Event] = None) -> bool:
+        self._record(WAIT, seconds)
+        if isinstance(self.clock, VirtualClock):
+            self.clock.advance(max(0.0, seconds))
+            return cancel is not None and cancel.is_set()
+        return super().wait(seconds, cancel)
+
+    def elapsed(self) -> float:
+        """Time passed on the backend's clock since creation or ``clear``."""
+        return self.clock() - self.start
+
+    def clear(self) -> None:
+        """Forget recorded events and restart ``elapsed``."""
+        with self._lock:
+            self.events.clear()
+            self.start = self.clock()
+
+
+_backend: Optional[InputBackend] = None
+_backend_lock = threading.Lock()
+
+
+def get_input() -> InputBackend:
+    """Return the shared input backend (the real desktop by default)."""
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = SystemInputBackend()
+        return _backend
+
+
+def set_input(backend: Union[InputBackend, None]) -> Optional[InputBackend]:
+    """Replace the shared input backend; None restores the default.
+
+    Returns:
+        The previous backend
+    """
+    global _backend
+    with _backend_lock:
+        previous, _backend = _backend, backend
+    return previous
@@ -0,0 +1,223 @@
+"""Record real input and store it as a compact macro action.
+
+Writing keyboard/mouse_click actions by hand means guessing screen
+coordinates. ``MacroRecorder`` captures a short input sequence with
+pynput listeners, ``compress`` turns the raw event log into a few macro
+steps (see utils.macros), and ``save_macro`` stores them in a mode file
+as a ``"type": "macro"`` action.
+
+Compression keeps what matters for replay and drops the rest:
+
+* pointer moves are dropped; clicks carry their own position
+* modifiers are folded into chords ("ctrl+b"), typed characters into
+  ``text`` steps
+* pauses shorter than ``min_gap`` (typing and reaction time) are
+  dropped, since the macro timings already leave a minimal delay
+* longer pauses are kept, but capped at ``max_gap`` so idle time spent
+  thinking during the recording is not replayed
+
+Usage:
+    python -m utils.macro_recorder MODE COLOR [--stop-key esc] [--duration 30]
+"""
+import argparse
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .input_backend import CLICK, MOVE, PRESS, RELEASE, InputEvent
+
+MODIFIERS = ("ctrl", "alt", "shift", "cmd")
+
+
+def key_name(key: Any) -> Optional[str]:
+    """Translate a pynput key into the key names used by mode files."""
+    char = getattr(key, "char", None)
+    if char is not None:
+        return char
+    name = getattr(key, "name", None)
+    if name is None:
+        return None
+    for suffix in ("_l", "_r", "_gr"):
+        if name.endswith(suffix):
+            name = name[:-len(suffix)]
+    return name
+
+
+class MacroRecorder:
+    """Capture keyboard and mouse input with pynput listeners.
+
+    Events are stored as ``InputEvent``s (PRESS/RELEASE with key names,
+    MOVE and CLICK with positions) timestamped with ``clock``.
+    """
+
+    def __init__(self, stop_key: str = "esc", clock=time.monotonic):
+        """
+        Args:
+            stop_key: Key that ends the recording (not recorded itself)
+            clock: Time source for event timestamps
+        """
+        self.stop_key = stop_key
+        self.clock = clock
+        self.events: List[InputEvent] = []
+        self.stopped = threading.Event()
+        self._listeners = []
+        self._lock = threading.Lock()
+
+    def _record(self, kind: str, value: Any) -> None:
+        with self._lock:
+            self.events.append(InputEvent(self.clock(), kind, value))
+
+    def _on_press(self, key) -> Optional[bool]:
+        name = key_name(key)
+        if name == self.stop_key:
+            self.stopped.set()
+            return False
+        if name is not None:
+            self._record(PRESS, name)
+        return None
+
+    def _on_release(self, key) -> None:
+        name = key_name(key)
+        if name is not None and name != self.stop_key:
+            self._record(RELEASE, name)
+
+    def _on_move(self, x: int, y: int) -> None:
+        self._record(MOVE, (int(x), int(y)))
+
+    def _on_click(self, x: int, y: int, button, pressed: bool) -> None:
+        # Only left clicks can be replayed
+        if pressed and getattr(button, "name", "") == "left":
+            self._record(CLICK, (int(x), int(y)))
+
+    def start(self) -> None:
+        """Start listening to the keyboard and the mouse."""
+        from pynput import keyboard, mouse
+        self._listeners = [
+            keyboard.Listener(on_press=self._on_press, on_release=self._on_release),
+            mouse.Listener(on_move=self._on_move, on_click=self._on_click),
+        ]
+        for listener in self._listeners:
+            listener.start()
+
+    def stop(self) -> List[InputEvent]:
+        """Stop listening and return the recorded events."""
+        for listener in self._listeners:
+            listener.stop()
+        self._listeners = []
+        self.stopped.set()
+        with self._lock:
+            return list(self.events)
+
+    def record(self, duration: Optional[float] = None) -> List[InputEvent]:
+        """Record until the stop key is pressed or ``duration`` seconds passed."""
+        self.start()
+        self.stopped.wait(duration)
+        return self.stop()
+
+
+def compress(events: List[InputEvent], min_gap: float = 0.2,
+             max_gap: float = 1.0) -> List[Dict[str, Any]]:
+    """Turn raw recorded events into compact macro steps.
+
+    Args:
+        events: Recorded events in time order
+        min_gap: Pauses shorter than this are dropped
+        max_gap: Longer pauses are kept but capped at this
+
+    Returns:
+        JSON-ready macro steps for ``utils.macros.compile_macro``
+    """
+    steps: List[Dict[str, Any]] = []
+    held: List[str] = []        # modifiers currently down
+    used: set = set()           # modifiers that were part of a chord
+    last_time: Optional[float] = None
+
+    def add(step: Dict[str, Any], when: float) -> None:
+        nonlocal last_time
+        if last_time is not None:
+            gap = when - last_time
+            if gap >= min_gap:
+                steps.append({"wait": round(min(gap, max_gap), 2)})
+        last_time = when
+        if "text" in step and steps and "text" in steps[-1]:
+            steps[-1]["text"] += step["text"]
+        else:
+            steps.append(step)
+
+    for event in events:
+        if event.kind == PRESS:
+            if event.value in MODIFIERS:
+                if event.value not in held:
+                    held.append(event.value)
+                continue
+            chord = [m for m in held if m != "shift"] if len(event.value) == 1 else list(held)
+            used.update(held)
+            if not chord and len(event.value) == 1:
+                # Shifted characters arrive already shifted ("A", "?")
+                add({"text": event.value}, event.time)
+            else:
+                add({"keys": "+".join(held + [event.value])}, event.time)
+        elif event.kind == RELEASE:
+            if event.value in held:
+                held.remove(event.value)
+                if event.value not in used:
+                    add({"keys": event.value}, event.time)  # a modifier tapped alone
+                used.discard(event.value)
+        elif event.kind == CLICK:
+            add({"click": list(event.value)}, event.time)
+        # MOVE: dropped, clicks carry their position
+    return steps
+
+
+def save_macro(mode_file: Path, color: str, steps: List[Dict[str, Any]]) -> None:
+    """Store ``steps`` as the macro action of ``color`` in a mode file.
+
+    Settings of an existing action that apply to every type (hold_time,
+    next_mode, focus_window, description) are kept.
+    """
+    with open(mode_file, "r", encoding="utf-8") as f:
+        mode = json.load(f)
+    actions = mode.setdefault("actions", {})
+    old = actions.get(color, {})
+    kept = {k: old[k] for k in ("hold_time", "next_mode", "focus_window", "description") if k in old}
+    actions[color] = {"type": "macro", "steps": steps, **kept}
+    with open(mode_file, "w", encoding="utf-8") as f:
+        json.dump(mode, f, indent=4, ensure_ascii=False)
+        f.write("\n")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Record a macro into a mode's color action.")
+    parser.add_argument("mode", help="mode name, e.g. youtube")
+    parser.add_argument("color", help="color whose action is replaced, e.g. red")
+    parser.add_argument("--stop-key", default="esc", help="key that ends the recording")
+    parser.add_argument("--duration", type=float, default=30.0, help="longest recording in seconds")
+    parser.add_argument("--min-gap", type=float, default=0.2, help="drop pauses shorter than this")
+    parser.add_argument("--max-gap", type=float, default=1.0, help="cap longer pauses at this")
+    parser.add_argument("--config-dir", default="config")
+    args = parser.parse_args()
+
+    mode_file = Path(args.config_dir) / "modes" / f"{args.mode}.json"
+    if not mode_file.exists():
+        print(f"❌ Mode file not found: {mode_file}")
+        return 1
+
+    print(f"🔴 Recording... press '{args.stop_key}' to stop")
+    events = MacroRecorder(args.stop_key).record(args.duration)
+    steps = compress(events, args.min_gap, args.max_gap)
+    if not steps:
+        print("⚠️ Nothing recorded")
+        return 1
+
+    # Validate before touching the mode file
+    from .config_loader import Action
+    Action.from_dict({"type": "macro", "steps": steps})
+    save_macro(mode_file, args.color, steps)
+    print(f"✅ Saved {len(steps)} steps ({len(events)} raw events) to {mode_file}: {args.color}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
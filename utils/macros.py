@@ -0,0 +1,200 @@
+"""Keystroke macros compiled into a flat, timed event stream.
+
+Chaining ``press_keys``/``type_text`` calls pays a fixed sleep after
+every key (100 ms per key, 50 ms per character) whether the target
+application needs it or not. A macro is instead written once as a list
+of steps::
+
+    [
+        {"keys": "ctrl+b", "settle": 0.15},   # chord, then let the UI react
+        {"text": "next episode"},             # typed with char_delay
+        "tab",                                # shorthand for {"keys": "tab"}
+        {"wait": 0.1},
+        {"wait_for": some_condition, "timeout": 2.0},
+        {"wait_for_window": "Firefox", "timeout": 2.0},
+        {"click": [2352, 589]},               # or null for the pointer position
+        {"move": [100, 200]},
+    ]
+
+and compiled into a tuple of ``MacroEvent``s. Every event carries the
+delay to observe after it, so the runner
+(``input_simulator.run_macro``) executes the whole macro in one loop
+and adjacent waits collapse into a single sleep. Only steps that ask
+for a ``settle`` time wait longer than the minimal ``MacroTiming``
+delays, and ``wait_for`` steps poll a condition (e.g. a window title)
+instead of sleeping for a worst-case time.
+"""
+import functools
+from typing import Any, Iterable, List, Mapping, NamedTuple, Tuple, Union
+
+# Event kinds
+PRESS = "press"
+RELEASE = "release"
+TYPE = "type"
+MOVE = "move"
+CLICK = "click"
+WAIT = "wait"
+WAIT_FOR = "wait_for"
+
+
+class MacroTiming(NamedTuple):
+    """Minimal delays between synthetic events, in seconds."""
+    key_delay: float = 0.02    # after each key stroke or chord
+    char_delay: float = 0.005  # between typed characters
+    poll_interval: float = 0.02  # between wait_for checks
+
+
+class MacroEvent(NamedTuple):
+    """One synthetic input event and the pause that follows it.
+
+    ``value`` is a key name for PRESS/RELEASE, a character for TYPE,
+    an ``(x, y)`` position for MOVE and CLICK (None clicks where the
+    pointer is), a ``(condition, timeout, interval)`` tuple for
+    WAIT_FOR and None for WAIT (only used for a wait at the very start
+    of a macro).
+    """
+    kind: str
+    value: Any
+    delay: float = 0.0
+
+
+Macro = Tuple[MacroEvent, ...]
+MacroStep = Union[str, Mapping[str, Any]]
+
+
+class MacroError(ValueError):
+    """Raised when a macro step can't be compiled."""
+
+
+def _split_keys(keys: Union[str, Iterable[str]]) -> List[str]:
+    if isinstance(keys, str):
+        keys = keys.split("+")
+    names = [k.strip() for k in keys]
+    if not names or not all(names):
+        raise MacroError(f"invalid key combination: {keys!r}")
+    return names
+
+
+def _position(value: Any, i: int, field: str) -> Tuple[int, int]:
+    if (not isinstance(value, (list, tuple)) or len(value) != 2
+            or not all(isinstance(v, int) and not isinstance(v, bool) for v in value)):
+        raise MacroError(f"step {i}: '{field}' must be [x, y], got {value!r}")
+    return int(value[0]), int(value[1])
+
+
+def _seconds(step: Mapping[str, Any], field: str, default: float, i: int) -> float:
+    try:
+        value = float(step.get(field, default))
+    except (TypeError, ValueError):
+        raise MacroError(f"step {i}: '{field}' must be a number of seconds, got {step[field]!r}")
+    if value <= 0:
+        raise MacroError(f"step {i}: '{field}' must be positive, got {value!r}")
+    return value
+
+
+def _window_condition(title: str):
+    def window_exists() -> bool:
+        # Import here to avoid circular dependency
+        from .window_service import get_window_service
+        service = get_window_service()
+        return service is None or service.find(title=title) is not None
+    return window_exists
+
+
+def compile_macro(steps: Iterable[MacroStep], timing: MacroTiming = MacroTiming()) -> Macro:
+    """Compile macro steps into a flat event stream.
+
+    Args:
+        steps: Macro steps (see module docstring). A step may add a
+            ``settle`` time that is waited after it.
+        timing: Minimal delays to use between events
+
+    Returns:
+        Tuple of MacroEvents with waits merged into the preceding event
+
+    Raises:
+        MacroError: If a step is malformed
+    """
+    events: List[MacroEvent] = []
+    pending_wait = 0.0  # a wait before the first event
+
+    def wait(seconds: float) -> None:
+        nonlocal pending_wait
+        if seconds <= 0:
+            return
+        if events:
+            last = events[-1]
+            events[-1] = last._replace(delay=last.delay + seconds)
+        else:
+            pending_wait += seconds
+
+    for i, step in enumerate(steps):
+        if isinstance(step, (str, list, tuple)):
+            step = {"keys": step}
+        if not isinstance(step, Mapping):
+            raise MacroError(f"step {i}: expected a key string or an object, got {step!r}")
+        if "keys" in step:
+            names = _split_keys(step["keys"])
+            events.extend(MacroEvent(PRESS, k) for k in names)
+            events.extend(MacroEvent(RELEASE, k) for k in reversed(names))
+            wait(timing.key_delay)
+        elif "text" in step:
+            text = step["text"]
+            if not isinstance(text, str):
+                raise MacroError(f"step {i}: 'text' must be a string, got {text!r}")
+            for char in text:
+                events.append(MacroEvent(TYPE, char, timing.char_delay))
+        elif "wait" in step:
+            wait(float(step["wait"]))
+        elif "click" in step:
+            position = step["click"]
+            if position is not None:
+                position = _position(position, i, "click")
+            events.append(MacroEvent(CLICK, position))
+            wait(timing.key_delay)
+        elif "move" in step:
+            events.append(MacroEvent(MOVE, _position(step["move"], i, "move")))
+        elif "wait_for" in step or "wait_for_window" in step:
+            if "wait_for" in step:
+                condition = step["wait_for"]
+                if not callable(condition):
+                    raise MacroError(f"step {i}: 'wait_for' must be callable, got {condition!r}")
+            else:
+                title = step["wait_for_window"]
+                if not isinstance(title, str) or not title:
+                    raise MacroError(f"step {i}: 'wait_for_window' must be a window title, got {title!r}")
+                condition = _window_condition(title)
+            timeout = _seconds(step, "timeout", 2.0, i)
+            interval = _seconds(step, "interval", timing.poll_interval, i)
+            events.append(MacroEvent(WAIT_FOR, (condition, timeout, interval)))
+        else:
+            raise MacroError(f"step {i}: expected one of keys, text, click, move, wait, "
+                             f"wait_for, wait_for_window: {dict(step)!r}")
+        wait(float(step.get("settle", 0.0)))
+
+    if pending_wait:
+        events.insert(0, MacroEvent(WAIT, None, pending_wait))
+    return tuple(events)
+
+
+def macro_duration(macro: Macro) -> float:
+    """Time the macro spends in fixed delays (excluding wait_for polling)."""
+    return sum(event.delay for event in macro)
+
+
+@functools.lru_cache(maxsize=None)
+def bookmarklet_macro(name: str) -> Macro:
+    """Macro that runs a Firefox bookmarklet from the bookmarks sidebar.
+
+    Ctrl+B opens the sidebar with its search box focused; typing the
+    name filters the bookmarks, Tab moves to the results, Up selects
+    the first one and Enter runs it before Ctrl+B closes the sidebar.
+    """
+    return compile_macro([
+        {"keys": "ctrl+b", "settle": 0.15},  # sidebar opens
+        {"text": name, "settle": 0.1},       # results filter
+        "tab",
+        "up",
+        {"keys": "enter", "settle": 0.05},
+        "ctrl+b",
+    ])
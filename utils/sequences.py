@@ -0,0 +1,248 @@
+"""Color sequence automaton for the color sensor remote controller.
+
+Every mode's ``sequences`` are compiled once into an Aho-Corasick
+automaton over color transitions. Each transition is a single table
+lookup, so recognising a pattern never rescans the detection history.
+``SequenceMatcher`` drives the automaton from per-frame detections.
+"""
+from collections import deque
+from typing import Any, Dict, Iterable, List, Optional, Sequence as SeqType, Tuple
+
+
+ROOT = 0
+
+
+class SequenceAutomaton:
+    """Immutable Aho-Corasick automaton built from a mode's sequences.
+
+    States are small integers. ``step`` moves from one state to the next
+    on a color transition, and ``match`` returns the longest sequence
+    that ends in a state, if any.
+    """
+
+    __slots__ = ("_delta", "_outputs", "_depth", "_extensible", "_horizon",
+                 "max_length")
+
+    def __init__(self, sequences: Iterable[Any]):
+        """Build the automaton.
+
+        Args:
+            sequences: Objects exposing a ``pattern`` tuple of color names
+        """
+        goto: List[Dict[str, int]] = [{}]
+        depth: List[int] = [0]
+        terminal: List[Optional[Any]] = [None]
+
+        for seq in sequences:
+            state = ROOT
+            for color in seq.pattern:
+                nxt = goto[state].get(color)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][color] = nxt
+                    goto.append({})
+                    depth.append(depth[state] + 1)
+                    terminal.append(None)
+                state = nxt
+            # The first declaration wins when a pattern is repeated
+            if state != ROOT and terminal[state] is None:
+                terminal[state] = seq
+
+        # Longest time_window of any pattern strictly extending a state.
+        # Children are always created after their parent, so one reverse
+        # pass sees every subtree before its root.
+        horizon = [0.0] * len(goto)
+        for state in range(len(goto) - 1, -1, -1):
+            for child in goto[state].values():
+                below = horizon[child]
+                if terminal[child] is not None:
+                    below = max(below, terminal[child].time_window)
+                horizon[state] = max(horizon[state], below)
+
+        alphabet = {color for edges in goto for color in edges}
+        fail = [ROOT] * len(goto)
+        outputs: List[Tuple[Any, ...]] = [()] * len(goto)
+        delta: List[Dict[str, int]] = [dict() for _ in goto]
+
+        # Breadth-first so every failure target is complete before use
+        queue = deque()
+        for color in alphabet:
+            nxt = goto[ROOT].get(color, ROOT)
+            delta[ROOT][color] = nxt
+            if nxt != ROOT:
+                queue.append(nxt)
+        while queue:
+            state = queue.popleft()
+            own = (terminal[state],) if terminal[state] is not None else ()
+            outputs[state] = own + outputs[fail[state]]
+            for color in alphabet:
+                nxt = goto[state].get(color)
+                if nxt is None:
+                    delta[state][color] = delta[fail[state]][color]
+                else:
+                    fail[nxt] = delta[fail[state]][color]
+                    delta[state][color] = nxt
+                    queue.append(nxt)
+
+        self._delta: Tuple[Dict[str, int], ...] = tuple(delta)
+        self._outputs: Tuple[Tuple[Any, ...], ...] = tuple(outputs)
+        self._depth: Tuple[int, ...] = tuple(depth)
+        self._extensible: Tuple[bool, ...] = tuple(bool(g) for g in goto)
+        self._horizon: Tuple[float, ...] = tuple(horizon)
+        self.max_length: int = max(depth)
+
+    def step(self, state: int, color: str) -> int:
+        """Return the state reached from ``state`` on ``color``."""
+        return self._delta[state].get(color, ROOT)
+
+    def match(self, state: int) -> Optional[Any]:
+        """Return the longest sequence ending in ``state``, or None."""
+        outputs = self._outputs[state]
+        return outputs[0] if outputs else None
+
+    def outputs(self, state: int) -> Tuple[Any, ...]:
+        """Return every sequence ending in ``state``, longest first."""
+        return self._outputs[state]
+
+    def depth(self, state: int) -> int:
+        """Return the number of colors consumed to reach ``state``."""
+        return self._depth[state]
+
+    def is_extensible(self, state: int) -> bool:
+        """Return True if a longer pattern continues from ``state``."""
+        return self._extensible[state]
+
+    def horizon(self, state: int) -> float:
+        """Return the longest ``time_window`` of a pattern extending ``state``."""
+        return self._horizon[state]
+
+    def run(self, colors: SeqType[str]) -> int:
+        """Feed a whole color transition list and return the final state."""
+        state = ROOT
+        for color in colors:
+            state = self.step(state, color)
+        return state
+
+
+class SequenceMatcher:
+    """Incrementally matches color transitions against an automaton.
+
+    Consecutive detections of the same color count as one transition,
+    and frames with no color are ignored, so holding a card or briefly
+    losing it doesn't break a gesture. Patterns are ordered: red→yellow
+    and yellow→red are different sequences.
+
+    When a completed pattern is also the prefix of a longer one (e.g.
+    yellow→red and yellow→red→yellow), the match is held as ``pending``
+    until the longer pattern can no longer complete within its
+    ``time_window``, and then resolves to the longest match. Patterns
+    without a longer extension still fire on the transition that
+    completes them.
+
+    Only the timestamps of the last ``max_length`` transitions are kept,
+    in a bounded deque, which is all that is needed to check a match's
+    ``time_window``. Each call to ``feed`` costs O(1).
+    """
+
+    __slots__ = ("automaton", "state", "last_color", "times", "pending",
+                 "deadline")
+
+    def __init__(self, automaton: SequenceAutomaton):
+        self.automaton = automaton
+        self.state = ROOT
+        self.last_color: Optional[str] = None
+        self.times: deque = deque(maxlen=max(automaton.max_length, 1))
+        self.pending: Optional[Any] = None
+        self.deadline: Optional[float] = None
+
+    def set_automaton(self, automaton: SequenceAutomaton) -> None:
+        """Switch to another mode's automaton and forget partial input."""
+        self.automaton = automaton
+        if self.times.maxlen != max(automaton.max_length, 1):
+            self.times = deque(maxlen=max(automaton.max_length, 1))
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget all partial input, including a pending match."""
+        self._restart()
+        self.last_color = None
+
+    def _restart(self) -> None:
+        # Start a new gesture; the color currently shown stays "seen" so
+        # holding it doesn't count as a fresh transition
+        self.state = ROOT
+        self.times.clear()
+        self.pending = None
+        self.deadline = None
+
+    def _commit(self, seq: Any) -> Any:
+        self._restart()
+        return seq
+
+    def poll(self, now: float) -> Optional[Any]:
+        """Resolve a pending match whose deadline has passed.
+
+        Args:
+            now: Current timestamp in seconds
+
+        Returns:
+            The pending sequence if it is now final, otherwise None
+        """
+        if self.pending is not None and now >= self.deadline:
+            return self._commit(self.pending)
+        return None
+
+    def feed(self, color: Optional[str], now: float) -> Optional[Any]:
+        """Process one detection.
+
+        Args:
+            color: Detected color, or None if nothing was detected
+            now: Timestamp of the detection in seconds
+
+        Returns:
+            The sequence resolved by this detection, or None. This is
+            either a pattern completed within its ``time_window`` that
+            no longer pattern can extend, or an earlier pending match
+            that has expired or been ruled out. The matcher restarts
+            after every match.
+        """
+        if color is None or color == self.last_color:
+            return self.poll(now)
+        self.last_color = color
+
+        expired = self.poll(now)
+        if expired is not None:
+            # Patterns have at least two colors, so this one can't match
+            self.state = self.automaton.step(ROOT, color)
+            self.times.append(now)
+            return expired
+
+        automaton = self.automaton
+        depth = automaton.depth(self.state)
+        self.state = automaton.step(self.state, color)
+        self.times.append(now)
+        extended = automaton.depth(self.state) == depth + 1
+
+        if self.pending is not None and not extended:
+            # The longer pattern was abandoned: the held match stands
+            pending = self._commit(self.pending)
+            self.state = automaton.step(ROOT, color)
+            self.times.append(now)
+            return pending
+
+        for seq in automaton.outputs(self.state):
+            # times[-n] is when the first color of this pattern arrived
+            if now - self.times[-len(seq.pattern)] <= seq.time_window:
+                self.pending = seq
+                break
+
+        if self.pending is None:
+            return None
+        if automaton.is_extensible(self.state):
+            # Wait as long as the longest continuation could still finish
+            start = self.times[-automaton.depth(self.state)]
+            deadline = start + automaton.horizon(self.state)
+            if now < deadline:
+                self.deadline = deadline
+                return None
+        return self._commit(self.pending)
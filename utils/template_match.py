@@ -0,0 +1,229 @@
+"""Fast on-screen template matching for image-based actions.
+
+``pyautogui.locateCenterOnScreen`` re-reads the template and runs a
+full-resolution match over the whole screen on every attempt. The
+matcher here keeps every template preprocessed (grayscale, at several
+scales) and finds it in three steps, cheapest first:
+
+1. the region where the template was last found, at full resolution
+2. a coarse match of a downscaled screenshot against the matching
+   template scale, which yields a few candidate positions
+3. a full-resolution refinement in a small window around each candidate
+
+Scores are ``cv2.TM_CCOEFF_NORMED`` on grayscale images, compared with
+the action's ``confidence`` like pyautogui does.
+"""
+import os
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import cv2
+import numpy as np
+
+# Downscale factors tried for the coarse pass, largest first
+PYRAMID_LEVELS = (4, 2)
+
+# A template needs this many pixels on its short side to be matched
+# reliably at a coarse level
+MIN_COARSE_SIZE = 12
+
+# Coarse scores are blurred by the downscale; candidates this far below
+# the requested confidence are still refined
+COARSE_SLACK = 0.2
+
+MAX_CANDIDATES = 3
+
+
+class Match(NamedTuple):
+    """Where a template was found on screen."""
+    x: int
+    y: int
+    width: int
+    height: int
+    score: float
+
+    @property
+    def center(self) -> Tuple[int, int]:
+        return self.x + self.width // 2, self.y + self.height // 2
+
+
+class Template(NamedTuple):
+    """A template image preprocessed for matching."""
+    path: str
+    mtime: float
+    levels: Dict[int, np.ndarray]  # downscale factor -> grayscale image
+
+    @property
+    def full(self) -> np.ndarray:
+        return self.levels[1]
+
+
+def to_gray(image: np.ndarray, rgb: bool = False) -> np.ndarray:
+    """Convert a screenshot to grayscale the way templates are loaded.
+
+    Args:
+        image: 2D gray, 3-channel or 4-channel image
+        rgb: True for RGB(A) channel order (PIL/pyautogui screenshots),
+            False for OpenCV's BGR(A)
+    """
+    if image.ndim == 2:
+        return image
+    if image.shape[2] == 4:
+        code = cv2.COLOR_RGBA2GRAY if rgb else cv2.COLOR_BGRA2GRAY
+    else:
+        code = cv2.COLOR_RGB2GRAY if rgb else cv2.COLOR_BGR2GRAY
+    return cv2.cvtColor(image, code)
+
+
+def downscale(image: np.ndarray, factor: int) -> np.ndarray:
+    """Shrink an image by an integer factor with area averaging."""
+    if factor == 1:
+        return image
+    h, w = image.shape[:2]
+    return cv2.resize(image, (max(1, w // factor), max(1, h // factor)),
+                      interpolation=cv2.INTER_AREA)
+
+
+class TemplateMatcher:
+    """Finds cached templates in screenshots.
+
+    One instance is shared by every image action (see ``MATCHER``), so
+    templates are loaded once and the last hit of every template is
+    remembered across actions.
+    """
+
+    def __init__(self):
+        self._templates: Dict[str, Template] = {}
+        self._last_hits: Dict[str, Match] = {}
+
+    def template(self, path: str) -> Template:
+        """Return the preprocessed template, reloading it if the file changed.
+
+        Raises:
+            FileNotFoundError: If the image can't be read
+        """
+        mtime = os.path.getmtime(path)
+        cached = self._templates.get(path)
+        if cached is not None and cached.mtime == mtime:
+            return cached
+        image = cv2.imread(path, cv2.IMREAD_GRAYSCALE)
+        if image is None:
+            raise FileNotFoundError(f"Could not read template image: {path}")
+        levels = {1: image}
+        for factor in PYRAMID_LEVELS:
+            if min(image.shape[:2]) // factor >= MIN_COARSE_SIZE:
+                levels[factor] = downscale(image, factor)
+        template = Template(path, mtime, levels)
+        self._templates[path] = template
+        self._last_hits.pop(path, None)
+        return template
+
+    def find(self, path: str, screen: np.ndarray, confidence: float = 0.8,
+             pyramid: Optional[Dict[int, np.ndarray]] = None,
+             offset: Tuple[int, int] = (0, 0)) -> Optional[Match]:
+        """Locate a template in a grayscale screenshot.
+
+        Args:
+            path: Template image path
+            screen: Grayscale screenshot (see ``to_gray``)
+            confidence: Minimum match score (0.0 to 1.0)
+            pyramid: Downscaled copies of ``screen`` by factor, shared
+                when several templates are matched against one screenshot
+                (see ``build_pyramid``)
+            offset: Screen position of ``screen``'s top-left corner, for
+                screenshots of a region
+
+        Returns:
+            The best Match in screen coordinates, or None
+        """
+        template = self.template(path)
+        th, tw = template.full.shape[:2]
+        sh, sw = screen.shape[:2]
+        if th > sh or tw > sw:
+            return None
+        ox, oy = offset
+
+        # 1. Where it was last seen
+        last = self._last_hits.get(path)
+        if last is not None:
+            match = self._match_window(template.full, screen, last.x - ox, last.y - oy, margin=8)
+            if match is not None and match.score >= confidence:
+                return self._hit(path, match, offset)
+
+        # 2. Coarse candidates, 3. refined at full resolution
+        factor = next((f for f in PYRAMID_LEVELS if f in template.levels), None)
+        if factor is None or min(sh, sw) // factor < MIN_COARSE_SIZE:
+            match = self._match_window(template.full, screen, 0, 0, margin=max(sh, sw))
+            if match is not None and match.score >= confidence:
+                return self._hit(path, match, offset)
+            return None
+
+        small = (pyramid or {}).get(factor)
+        if small is None:
+            small = downscale(screen, factor)
+        coarse = template.levels[factor]
+        if coarse.shape[0] > small.shape[0] or coarse.shape[1] > small.shape[1]:
+            return None
+        scores = cv2.matchTemplate(small, coarse, cv2.TM_CCOEFF_NORMED)
+
+        best = None
+        for cx, cy, score in self._candidates(scores, coarse.shape, confidence - COARSE_SLACK):
+            match = self._match_window(template.full, screen, cx * factor, cy * factor,
+                                       margin=2 * factor)
+            if match is not None and (best is None or match.score > best.score):
+                best = match
+            if best is not None and best.score >= confidence:
+                break
+        if best is not None and best.score >= confidence:
+            return self._hit(path, best, offset)
+        return None
+
+    def forget(self, path: Optional[str] = None) -> None:
+        """Drop the remembered hit for one template, or for all of them."""
+        if path is None:
+            self._last_hits.clear()
+        else:
+            self._last_hits.pop(path, None)
+
+    def _hit(self, path: str, match: Match, offset: Tuple[int, int]) -> Match:
+        match = match._replace(x=match.x + offset[0], y=match.y + offset[1])
+        self._last_hits[path] = match
+        return match
+
+    @staticmethod
+    def _candidates(scores: np.ndarray, shape: Tuple[int, ...],
+                    threshold: float) -> List[Tuple[int, int, float]]:
+        """Return up to MAX_CANDIDATES peaks above ``threshold``, best first."""
+        scores = scores.copy()
+        th, tw = shape[:2]
+        found = []
+        for _ in range(MAX_CANDIDATES):
+            _, score, _, (x, y) = cv2.minMaxLoc(scores)
+            if score < threshold:
+                break
+            found.append((x, y, score))
+            # Suppress this peak before looking for the next one
+            scores[max(0, y - th // 2):y + th // 2 + 1, max(0, x - tw // 2):x + tw // 2 + 1] = -1
+        return found
+
+    @staticmethod
+    def _match_window(template: np.ndarray, screen: np.ndarray, x: int, y: int,
+                      margin: int) -> Optional[Match]:
+        """Match ``template`` near (x, y) in ``screen`` at full resolution."""
+        th, tw = template.shape[:2]
+        sh, sw = screen.shape[:2]
+        x0, y0 = max(0, x - margin), max(0, y - margin)
+        x1, y1 = min(sw, x + tw + margin), min(sh, y + th + margin)
+        if x1 - x0 < tw or y1 - y0 < th:
+            return None
+        scores = cv2.matchTemplate(screen[y0:y1, x0:x1], template, cv2.TM_CCOEFF_NORMED)
+        _, score, _, (mx, my) = cv2.minMaxLoc(scores)
+        return Match(x0 + mx, y0 + my, tw, th, float(score))
+
+
+def build_pyramid(screen: np.ndarray) -> Dict[int, np.ndarray]:
+    """Precompute the downscaled screenshots used by coarse matching."""
+    return {factor: downscale(screen, factor) for factor in PYRAMID_LEVELS}
+
+
+# Shared by every image action so caches survive between actions
+MATCHER = TemplateMatcher()
@@ -1,8 +1,9 @@
 import cv2
 import numpy as np
-import json
 import time
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, NamedTuple, Tuple, Union
+
+from core.progress_store import get_progress_store
 
 # Try to import the anilist module
 try:
@@ -11,14 +12,54 @@ try:
 except ImportError:
     ANILIST_AVAILABLE = False
 
-def detect_color(frame, roi, color_config):
+class ColorEntry(NamedTuple):
+    """Precompiled HSV bounds for one color."""
+    name: str
+    lower: np.ndarray
+    upper: np.ndarray
+    source: Dict[str, Any]
+
+
+ColorTable = Tuple[ColorEntry, ...]
+
+
+def compile_color_table(color_config: Dict[str, Any],
+                        previous: Optional[ColorTable] = None) -> ColorTable:
+    """Precompute the numpy HSV bounds used by ``detect_color``.
+    
+    Args:
+        color_config: Dictionary mapping color names to their HSV ranges
+        previous: Table from an earlier compile; entries whose source
+            mapping is the very same object are reused as-is, so a hot
+            reload only recompiles the colors that changed
+    
+    Returns:
+        Tuple of ColorEntry in configuration order
+    """
+    reuse = {entry.name: entry for entry in previous or ()}
+    table = []
+    for color_name, color_range in color_config.items():
+        entry = reuse.get(color_name)
+        if entry is None or entry.source is not color_range:
+            entry = ColorEntry(
+                color_name,
+                np.array(color_range["lower"], dtype=np.uint8),
+                np.array(color_range["upper"], dtype=np.uint8),
+                color_range,
+            )
+        table.append(entry)
+    return tuple(table)
+
+
+def detect_color(frame, roi, color_config: Union[Dict[str, Any], ColorTable]):
     """
     Detect the dominant color in the Region of Interest (ROI).
     
     Args:
         frame: The full video frame from the webcam
         roi: Region of Interest as [x, y, width, height]
-        color_config: Dictionary mapping color names to their HSV ranges
+        color_config: Table from ``compile_color_table``, or a dictionary
+                     mapping color names to their HSV ranges
                      e.g., {"red": {"lower": [170, 195, 75], "upper": [180, 255, 255]}, ...}
     
     Returns:
@@ -30,13 +71,12 @@ def detect_color(frame, roi, color_config):
     if roi_frame.size == 0:
         return None
     
+    if isinstance(color_config, dict):
+        color_config = compile_color_table(color_config)
+    
     hsv = cv2.cvtColor(roi_frame, cv2.COLOR_BGR2HSV)
-    detected_color = None
-    max_pixels = 0
     
-    for color_name, color_range in color_config.items():
-        lower = np.array(color_range["lower"])
-        upper = np.array(color_range["upper"])
+    for color_name, lower, upper, _ in color_config:
         mask = cv2.inRange(hsv, lower, upper)
         count = cv2.countNonZero(mask)
         
@@ -48,6 +88,39 @@ def detect_color(frame, roi, color_config):
     return None
 
 
+def detect_colors(frame, roi, color_config: Union[Dict[str, Any], ColorTable]) -> Tuple[str, ...]:
+    """
+    Detect every configured color present in the Region of Interest (ROI).
+    
+    Unlike ``detect_color`` this doesn't stop at the first match, so two
+    cards shown together (a chord) are both reported.
+    
+    Args:
+        frame: The full video frame from the webcam
+        roi: Region of Interest as [x, y, width, height]
+        color_config: Table from ``compile_color_table``, or a dictionary
+                     mapping color names to their HSV ranges
+    
+    Returns:
+        Detected color names in color table order, so the first one is
+        what ``detect_color`` would return (empty if none match)
+    """
+    x, y, w, h = roi
+    roi_frame = frame[y:y+h, x:x+w]
+    
+    if roi_frame.size == 0:
+        return ()
+    
+    if isinstance(color_config, dict):
+        color_config = compile_color_table(color_config)
+    
+    hsv = cv2.cvtColor(roi_frame, cv2.COLOR_BGR2HSV)
+    return tuple(
+        color_name for color_name, lower, upper, _ in color_config
+        if cv2.countNonZero(cv2.inRange(hsv, lower, upper)) > 50  # Minimum threshold
+    )
+
+
 def load_anime_progress(use_cache: bool = True) -> List[Dict[str, Any]]:
     """Load the anime progress from AniList API or cache.
     
@@ -76,12 +149,10 @@ def load_anime_progress(use_cache: bool = True) -> List[Dict[str, Any]]:
         return _load_local_anime_data()
 
 def _load_local_anime_data() -> List[Dict[str, Any]]:
-    """Fallback function to load anime data from local JSON file."""
+    """Fallback function to load anime data from the local progress store."""
     try:
-        with open("anime_progress.json", "r") as f:
-            data = json.load(f)
-            return data.get("anime_list", [])
-    except (FileNotFoundError, json.JSONDecodeError) as e:
+        return get_progress_store().anime_list()
+    except OSError as e:
         print(f"⚠️  Error loading local anime data: {e}")
         return []
 
@@ -91,7 +162,7 @@ def draw_anime_list(frame: np.ndarray, anime_list: List[Dict[str, Any]], start_y
     
     Args:
         frame: The frame to draw on
-        anime_list: List of anime dictionaries with title, progress, and total_episodes
+        anime_list: List of anime dictionaries with title, progress, and episodes
         start_y: Y-coordinate to start drawing the list
     """
     if not anime_list:
@@ -118,15 +189,15 @@ def draw_anime_list(frame: np.ndarray, anime_list: List[Dict[str, Any]], start_y
         cv2.rectangle(frame, (bar_x, bar_y), (bar_x + bar_width, bar_y + 10), (100, 100, 100), -1)
         
         # Draw progress
-        if anime.get('total_episodes', 0) > 0:
+        total_eps = anime.get('episodes') or 0
+        if total_eps > 0:
             progress = anime.get('progress', 0)
-            progress_ratio = progress / anime['total_episodes']
+            progress_ratio = min(progress / total_eps, 1.0)
             progress_width = int(bar_width * progress_ratio)
             cv2.rectangle(frame, (bar_x, bar_y), (bar_x + progress_width, bar_y + 10), (0, 200, 0), -1)
         
         # Draw text
         title = anime.get('title', 'Unknown')[0:25]  # Limit title length
-        total_eps = anime.get('total_episodes', 0)
         progress_text = f"{anime.get('progress', 0)}/{total_eps if total_eps > 0 else '?'}"
         
         cv2.putText(frame, f"{i+1}. {title}", (20, y + 15),
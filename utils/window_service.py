@@ -0,0 +1,486 @@
+"""Cached window and monitor topology for moving windows between displays.
+
+Moving a window used to run ``wmctrl -l``, ``xrandr --query`` and two
+more ``wmctrl`` processes and parse their text output every time. The
+``WindowService`` here keeps the window list and the monitor layout in
+memory and only re-reads them when they changed:
+
+* ``XlibWindowBackend`` talks to the X server directly through
+  python-xlib. It listens for ``_NET_CLIENT_LIST``/title property
+  changes and RandR screen changes, so the cache is invalidated by X
+  events and a lookup normally costs no round trip at all.
+* ``WmctrlWindowBackend`` is the old wmctrl/xrandr path, used when
+  python-xlib is missing. It can't see events, so its cache simply
+  expires after ``poll_interval`` seconds.
+* ``FakeWindowBackend`` keeps windows and monitors in memory for
+  tests and records every move.
+"""
+import platform
+import select
+import shutil
+import subprocess
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+# Change kinds reported by WindowBackend.pending_changes
+WINDOWS = "windows"
+MONITORS = "monitors"
+
+
+class WindowInfo(NamedTuple):
+    """A top-level window as listed by the window manager."""
+    id: int
+    title: str
+    wm_class: str = ""
+
+
+class Monitor(NamedTuple):
+    """A monitor's area in the virtual screen."""
+    x: int
+    y: int
+    width: int
+    height: int
+
+
+def _matches(window: WindowInfo, title: Optional[str], wm_class: Optional[str]) -> bool:
+    if title is not None and title.lower() not in window.title.lower():
+        return False
+    if wm_class is not None and wm_class.lower() not in window.wm_class.lower():
+        return False
+    return True
+
+
+class WindowBackend:
+    """Base class of the window-manager backends."""
+
+    name = "base"
+    # True if pending_changes reports every change, so caches never expire
+    event_driven = False
+
+    def list_windows(self) -> List[WindowInfo]:
+        raise NotImplementedError
+
+    def list_monitors(self) -> List[Monitor]:
+        raise NotImplementedError
+
+    def move_resize(self, window_id: int, monitor: Monitor) -> None:
+        raise NotImplementedError
+
+    def activate(self, window_id: int) -> None:
+        raise NotImplementedError
+
+    def pending_changes(self) -> Set[str]:
+        """Return which caches went stale (WINDOWS, MONITORS) since the last call."""
+        return set()
+
+    def wait_for_event(self, timeout: float) -> None:
+        """Block up to ``timeout`` seconds or until a change may have happened."""
+        time.sleep(timeout)
+
+
+class XlibWindowBackend(WindowBackend):
+    """Direct X11 calls through python-xlib, invalidated by X events.
+
+    The display connection is not thread-safe; WindowService serializes
+    every call with its lock, except ``wait_for_event``, which runs
+    unlocked and therefore only waits on the connection's socket.
+    """
+
+    name = "xlib"
+    event_driven = True
+
+    def __init__(self):
+        from Xlib import X, display
+        self._X = X
+        self.display = display.Display()
+        self._fileno = self.display.fileno()
+        self.root = self.display.screen().root
+        atom = self.display.intern_atom
+        self._client_list = atom("_NET_CLIENT_LIST")
+        self._net_wm_name = atom("_NET_WM_NAME")
+        self._utf8 = atom("UTF8_STRING")
+        self._wm_name = atom("WM_NAME")
+        self._active_window = atom("_NET_ACTIVE_WINDOW")
+        self._moveresize = atom("_NET_MOVERESIZE_WINDOW")
+        self._watched: Set[int] = set()
+
+        self.root.change_attributes(event_mask=X.PropertyChangeMask | X.StructureNotifyMask)
+        self._randr = self.display.has_extension("RANDR")
+        if self._randr:
+            from Xlib.ext import randr
+            self.root.xrandr_select_input(randr.RRScreenChangeNotifyMask)
+        self.display.flush()
+
+    def list_windows(self) -> List[WindowInfo]:
+        X = self._X
+        prop = self.root.get_full_property(self._client_list, X.AnyPropertyType)
+        windows = []
+        for wid in (prop.value if prop else ()):
+            window = self.display.create_resource_object("window", wid)
+            try:
+                if wid not in self._watched:
+                    # Title changes arrive as PropertyNotify on the window
+                    window.change_attributes(event_mask=X.PropertyChangeMask)
+                    self._watched.add(wid)
+                name = window.get_full_property(self._net_wm_name, self._utf8)
+                if name is not None:
+                    title = name.value.decode("utf-8", "replace")
+                else:
+                    title = window.get_wm_name() or ""
+                    if isinstance(title, bytes):
+                        title = title.decode("latin-1")
+                wm_class = window.get_wm_class()
+            except Exception:
+                continue  # closed while we were reading it
+            windows.append(WindowInfo(int(wid), title, wm_class[1] if wm_class else ""))
+        self._watched.intersection_update(w.id for w in windows)
+        return windows
+
+    def list_monitors(self) -> List[Monitor]:
+        if self._randr:
+            try:
+                reply = self.root.xrandr_get_monitors(is_active=True)
+                return [Monitor(m.x, m.y, m.width_in_pixels, m.height_in_pixels)
+                        for m in reply.monitors]
+            except Exception:
+                # RandR < 1.5: one monitor per active CRTC
+                resources = self.root.xrandr_get_screen_resources()
+                monitors = []
+                for crtc in resources.crtcs:
+                    info = self.display.xrandr_get_crtc_info(crtc, resources.config_timestamp)
+                    if info.width and info.height:
+                        monitors.append(Monitor(info.x, info.y, info.width, info.height))
+                return monitors
+        geometry = self.root.get_geometry()
+        return [Monitor(0, 0, geometry.width, geometry.height)]
+
+    def _client_message(self, window_id: int, message_type: int, data: List[int]) -> None:
+        from Xlib.protocol import event
+        X = self._X
+        window = self.display.create_resource_object("window", window_id)
+        message = event.ClientMessage(window=window, client_type=message_type,
+                                      data=(32, data + [0] * (5 - len(data))))
+        self.root.send_event(message, event_mask=X.SubstructureRedirectMask | X.SubstructureNotifyMask)
+        self.display.flush()
+
+    def move_resize(self, window_id: int, monitor: Monitor) -> None:
+        # Same request wmctrl -e sends: gravity 0 with x, y, width and height set
+        flags = (1 << 8) | (1 << 9) | (1 << 10) | (1 << 11)
+        self._client_message(window_id, self._moveresize,
+                             [flags, monitor.x, monitor.y, monitor.width, monitor.height])
+
+    def activate(self, window_id: int) -> None:
+        # Source indication 2: a pager/tool acting on the user's behalf
+        self._client_message(window_id, self._active_window, [2, self._X.CurrentTime])
+
+    def pending_changes(self) -> Set[str]:
+        X = self._X
+        changes = set()
+        screen_change = getattr(self.display.extension_event, "ScreenChangeNotify", None)
+        while self.display.pending_events():
+            e = self.display.next_event()
+            if e.type == X.PropertyNotify:
+                if e.atom in (self._client_list, self._net_wm_name, self._wm_name):
+                    changes.add(WINDOWS)
+            elif e.type == X.ConfigureNotify and e.window == self.root:
+                changes.add(MONITORS)
+            elif screen_change is not None and e.type == screen_change:
+                changes.add(MONITORS)
+        return changes
+
+
+    def wait_for_event(self, timeout: float) -> None:
+        # Called without the service lock: don't touch the display object.
+        # Events already buffered by another call are picked up by the
+        # caller's next check, at most ``timeout`` later.
+        select.select([self._fileno], [], [], timeout)
+
+
+class WmctrlWindowBackend(WindowBackend):
+    """The wmctrl/xrandr command-line tools, for systems without python-xlib."""
+
+    name = "wmctrl"
+
+    def __init__(self):
+        if shutil.which("wmctrl") is None:
+            raise RuntimeError("wmctrl not available. Install it: sudo apt install wmctrl")
+
+    @staticmethod
+    def _run(args: List[str]) -> str:
+        proc = subprocess.run(args, capture_output=True, text=True)
+        if proc.returncode != 0:
+            raise RuntimeError(f"{args[0]} failed: {proc.stderr.strip()}")
+        return proc.stdout
+
+    def list_windows(self) -> List[WindowInfo]:
+        windows = []
+        for line in self._run(["wmctrl", "-lx"]).splitlines():
+            parts = line.split(None, 4)
+            if len(parts) < 4:
+                continue
+            wid, _desktop, wm_class = parts[:3]
+            title = parts[4] if len(parts) == 5 else ""
+            windows.append(WindowInfo(int(wid, 16), title, wm_class.split(".")[-1]))
+        return windows
+
+    def list_monitors(self) -> List[Monitor]:
+        monitors = []
+        for line in self._run(["xrandr", "--query"]).splitlines():
+            if " connected" not in line:
+                continue
+            # Geometry token like 1920x1080+1920+0
+            for token in line.split():
+                if "x" in token and token.count("+") == 2:
+                    wh, xs, ys = token.split("+")
+                    w, h = wh.split("x")
+                    monitors.append(Monitor(int(xs), int(ys), int(w), int(h)))
+                    break
+        return monitors
+
+    def move_resize(self, window_id: int, monitor: Monitor) -> None:
+        geometry = f"0,{monitor.x},{monitor.y},{monitor.width},{monitor.height}"
+        self._run(["wmctrl", "-i", "-r", hex(window_id), "-e", geometry])
+
+    def activate(self, window_id: int) -> None:
+        self._run(["wmctrl", "-i", "-a", hex(window_id)])
+
+
+class FakeWindowBackend(WindowBackend):
+    """In-memory windows and monitors for tests.
+
+    Windows opened, renamed or closed through the helper methods are
+    reported as changes like X events would be. ``moves`` and
+    ``activations`` record what the service asked for, and
+    ``queries`` counts how often the lists were actually read.
+    """
+
+    name = "fake"
+    event_driven = True
+
+    def __init__(self, monitors: Tuple[Tuple[int, int, int, int], ...] = ((0, 0, 1920, 1080),)):
+        self.windows: Dict[int, WindowInfo] = {}
+        self.monitors = [Monitor(*m) for m in monitors]
+        self.moves: List[Tuple[int, Monitor]] = []
+        self.activations: List[int] = []
+        self.queries = 0
+        self._changes: Set[str] = set()
+        self._next_id = 0x1000001
+        self._lock = threading.Lock()
+        self._changed = threading.Event()
+
+    def open_window(self, title: str, wm_class: str = "") -> int:
+        with self._lock:
+            wid = self._next_id
+            self._next_id += 1
+            self.windows[wid] = WindowInfo(wid, title, wm_class)
+            self._changes.add(WINDOWS)
+            self._changed.set()
+        return wid
+
+    def set_title(self, window_id: int, title: str) -> None:
+        with self._lock:
+            self.windows[window_id] = self.windows[window_id]._replace(title=title)
+            self._changes.add(WINDOWS)
+            self._changed.set()
+
+    def close_window(self, window_id: int) -> None:
+        with self._lock:
+            self.windows.pop(window_id, None)
+            self._changes.add(WINDOWS)
+            self._changed.set()
+
+    def set_monitors(self, *monitors: Tuple[int, int, int, int]) -> None:
+        with self._lock:
+            self.monitors = [Monitor(*m) for m in monitors]
+            self._changes.add(MONITORS)
+            self._changed.set()
+
+    def list_windows(self) -> List[WindowInfo]:
+        with self._lock:
+            self.queries += 1
+            return list(self.windows.values())
+
+    def list_monitors(self) -> List[Monitor]:
+        with self._lock:
+            self.queries += 1
+            return list(self.monitors)
+
+    def move_resize(self, window_id: int, monitor: Monitor) -> None:
+        self.moves.append((window_id, monitor))
+
+    def activate(self, window_id: int) -> None:
+        self.activations.append(window_id)
+
+    def pending_changes(self) -> Set[str]:
+        with self._lock:
+            changes, self._changes = self._changes, set()
+            self._changed.clear()
+        return changes
+
+    def wait_for_event(self, timeout: float) -> None:
+        self._changed.wait(timeout)
+
+
+class WindowService:
+    """Window lookups and moves served from an in-memory cache.
+
+    All backend calls go through one lock, so the service can be used
+    from the UI thread and the action worker at the same time.
+    """
+
+    def __init__(self, backend: WindowBackend, poll_interval: float = 1.0,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            backend: Window-manager backend to use
+            poll_interval: How long cached lists stay valid for backends
+                that can't report changes
+            clock: Time source for the poll interval
+        """
+        self.backend = backend
+        self.poll_interval = poll_interval
+        self.clock = clock
+        self._lock = threading.RLock()
+        self._windows: Optional[Tuple[WindowInfo, ...]] = None  # None: stale
+        self._listed: Tuple[WindowInfo, ...] = ()  # last list read from the backend
+        self._monitors: Optional[Tuple[Monitor, ...]] = None
+        self._fetched_at = 0.0
+        # Bumped whenever the window list is re-read with different content
+        self.generation = 0
+
+    def _sync(self) -> None:
+        # Caller holds the lock
+        stale = self.backend.pending_changes()
+        if not self.backend.event_driven and self.clock() - self._fetched_at >= self.poll_interval:
+            stale = {WINDOWS, MONITORS}
+        if WINDOWS in stale:
+            self._windows = None
+        if MONITORS in stale:
+            self._monitors = None
+
+    def windows(self) -> Tuple[WindowInfo, ...]:
+        """Return the current top-level windows."""
+        with self._lock:
+            self._sync()
+            if self._windows is None:
+                windows = tuple(self.backend.list_windows())
+                if windows != self._listed:
+                    self.generation += 1
+                self._windows = self._listed = windows
+                self._fetched_at = self.clock()
+            return self._windows
+
+    def monitors(self) -> Tuple[Monitor, ...]:
+        """Return the monitors in the order the display server lists them."""
+        with self._lock:
+            self._sync()
+            if self._monitors is None:
+                self._monitors = tuple(self.backend.list_monitors())
+                self._fetched_at = self.clock()
+            return self._monitors
+
+    def find(self, title: Optional[str] = None,
+             wm_class: Optional[str] = None) -> Optional[WindowInfo]:
+        """Return the first window whose title and/or class contain the given text.
+
+        Matching is case-insensitive.
+        """
+        for window in self.windows():
+            if _matches(window, title, wm_class):
+                return window
+        return None
+
+    def wait_for_window(self, title: Optional[str] = None, wm_class: Optional[str] = None,
+                        timeout: float = 5.0, since: Optional[Iterable[WindowInfo]] = None,
+                        cancel: Optional[threading.Event] = None,
+                        interval: float = 0.05) -> Optional[WindowInfo]:
+        """Wait for a matching window to appear or change its title.
+
+        Event-driven backends wake up as soon as the window manager
+        reports a change; otherwise the cached list is polled, which only
+        costs a backend query every ``poll_interval``.
+
+        Args:
+            title: Text the window title must contain
+            wm_class: Text the window class must contain
+            timeout: Seconds to wait at most
+            since: Windows listed before the trigger (e.g. ``windows()``
+                taken before opening a URL). Only a window that is new,
+                or whose title differs from then, counts. If omitted any
+                matching window counts, including one that already exists.
+            cancel: Optional threading.Event that stops the wait
+            interval: Longest time between checks
+
+        Returns:
+            The matching window, or None on timeout or cancellation
+        """
+        before = set(since) if since is not None else set()
+        deadline = self.clock() + timeout
+        while True:
+            for window in self.windows():
+                if window not in before and _matches(window, title, wm_class):
+                    return window
+            remaining = deadline - self.clock()
+            if remaining <= 0 or (cancel is not None and cancel.is_set()):
+                return None
+            self.backend.wait_for_event(min(interval, remaining))
+
+    def invalidate(self) -> None:
+        """Forget the cached lists (e.g. after an external change)."""
+        with self._lock:
+            self._windows = None
+            self._monitors = None
+
+    def move_to_monitor(self, window: WindowInfo, display_index: int) -> bool:
+        """Move and resize ``window`` to fill a monitor, then raise it.
+
+        Returns:
+            False if there is no monitor with that index
+        """
+        monitors = self.monitors()
+        if display_index < 0 or display_index >= len(monitors):
+            print(f"Invalid display index {display_index}; available: 0..{len(monitors)-1}")
+            return False
+        with self._lock:
+            self.backend.move_resize(window.id, monitors[display_index])
+            self.backend.activate(window.id)
+        return True
+
+
+def create_window_backend() -> Optional[WindowBackend]:
+    """Pick the best window backend available here, or None."""
+    if platform.system() != "Linux":
+        return None
+    try:
+        return XlibWindowBackend()
+    except Exception:
+        pass
+    try:
+        return WmctrlWindowBackend()
+    except Exception:
+        return None
+
+
+_service: Optional[WindowService] = None
+_service_lock = threading.Lock()
+
+
+def get_window_service() -> Optional[WindowService]:
+    """Return the shared WindowService, or None if no backend works here."""
+    global _service
+    with _service_lock:
+        if _service is None:
+            backend = create_window_backend()
+            if backend is None:
+                return None
+            _service = WindowService(backend)
+            print(f"🪟 Window backend: {backend.name}")
+        return _service
+
+
+def set_window_service(service: Optional[WindowService]) -> None:
+    """Replace the shared WindowService (e.g. with a FakeWindowBackend in tests)."""
+    global _service
+    with _service_lock:
+        _service = service